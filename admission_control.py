@@ -0,0 +1,216 @@
+# Admission Control and Load Shedding
+# Per-endpoint priority classes and per-upstream concurrency budgets for aiXplain and Google Maps
+
+import contextvars
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+PRIORITY_CRITICAL = 0
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 2
+PRIORITY_LOW = 3
+PRIORITY_NAMES = ("critical", "high", "normal", "low")
+
+# How long a request of each priority may wait for an upstream slot before it is shed
+MAX_WAIT_SECONDS = {
+    PRIORITY_CRITICAL: 60.0,
+    PRIORITY_HIGH: 30.0,
+    PRIORITY_NORMAL: 10.0,
+    PRIORITY_LOW: 1.0
+}
+
+# Symptoms that should never wait behind routine traffic (English, Hinglish, Hindi)
+EMERGENCY_KEYWORDS = [
+    "chest pain", "heart attack", "can't breathe", "cannot breathe", "difficulty breathing",
+    "breathing difficulty", "shortness of breath", "unconscious", "fainted", "seizure",
+    "convulsion", "stroke", "paralysis", "severe bleeding", "heavy bleeding", "vomiting blood",
+    "coughing blood", "poison", "snake bite", "snakebite", "suicide", "overdose", "burns",
+    "not breathing", "choking", "labour pain", "labor pain",
+    "seene mein dard", "saans nahi", "saans lene mein", "behosh", "khoon aa raha",
+    "सीने में दर्द", "सांस नहीं", "सांस लेने में", "बेहोश", "दौरा", "खून की उल्टी", "सांप ने काटा", "ज़हर"
+]
+_EMERGENCY_RE = re.compile("|".join(re.escape(k) for k in EMERGENCY_KEYWORDS), re.IGNORECASE)
+
+current_priority: contextvars.ContextVar = contextvars.ContextVar("current_priority", default=PRIORITY_NORMAL)
+
+def is_emergency(text: str) -> bool:
+    """True when the text mentions an emergency symptom"""
+    return bool(text) and _EMERGENCY_RE.search(text) is not None
+
+@contextmanager
+def use_priority(priority: int):
+    """Run a block (and the upstream calls it makes) at the given priority"""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+class OverloadedError(Exception):
+    """Raised when a request is shed; carries the Retry-After hint in seconds"""
+
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class PriorityLimiter:
+    """
+    Concurrency budget for one upstream with a priority wait queue
+
+    Waiters are served strictly by (priority, arrival). The last `reserved`
+    slots are only handed to high and critical requests, so urgent work still
+    finds capacity when routine traffic has filled the rest.
+    """
+
+    def __init__(self, name: str, capacity: int, reserved: int = 0,
+                 max_wait: Optional[Dict[int, float]] = None):
+        self.name = name
+        self.capacity = capacity
+        self.reserved = min(reserved, max(capacity - 1, 0))
+        self.max_wait = dict(max_wait or MAX_WAIT_SECONDS)
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._admitted = [0] * len(PRIORITY_NAMES)
+        self._shed = [0] * len(PRIORITY_NAMES)
+        self._max_wait_seen = [0.0] * len(PRIORITY_NAMES)
+
+    def _limit(self, priority: int) -> int:
+        return self.capacity if priority <= PRIORITY_HIGH else self.capacity - self.reserved
+
+    def acquire(self, priority: int) -> None:
+        ticket = (priority, next(self._seq))
+        start = time.monotonic()
+        deadline = start + self.max_wait[priority]
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while self._waiters[0] != ticket or self._in_use >= self._limit(priority):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._shed[priority] += 1
+                        raise OverloadedError(f"{self.name} is overloaded, please retry shortly",
+                                              retry_after=max(1, int(self.max_wait[PRIORITY_LOW])))
+                    self._cond.wait(remaining)
+                self._in_use += 1
+                self._admitted[priority] += 1
+                self._max_wait_seen[priority] = max(self._max_wait_seen[priority], time.monotonic() - start)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify_all()
+
+    def utilization(self) -> float:
+        """(in use + waiting) / capacity"""
+        with self._cond:
+            return (self._in_use + len(self._waiters)) / self.capacity
+
+    def stats(self) -> Dict:
+        with self._cond:
+            waiting = [0] * len(PRIORITY_NAMES)
+            for priority, _ in self._waiters:
+                waiting[priority] += 1
+            return {
+                "capacity": self.capacity,
+                "reserved": self.reserved,
+                "in_use": self._in_use,
+                "waiting": dict(zip(PRIORITY_NAMES, waiting)),
+                "admitted": dict(zip(PRIORITY_NAMES, self._admitted)),
+                "shed": dict(zip(PRIORITY_NAMES, self._shed)),
+                "max_wait_seconds": dict(zip(PRIORITY_NAMES, (round(w, 3) for w in self._max_wait_seen)))
+            }
+
+class AdmissionController:
+    """
+    Decides which requests run, wait or get shed
+
+    Endpoints declare a priority class with @priority; upstream calls take a
+    slot from their limiter with slot(). Low-priority requests are rejected
+    before doing any work once an upstream is busier than shed_threshold.
+    """
+
+    def __init__(self, limiters: Dict[str, PriorityLimiter], shed_threshold: float = 0.8,
+                 retry_after: int = 5):
+        self.limiters = limiters
+        self.shed_threshold = shed_threshold
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._early_shed = [0] * len(PRIORITY_NAMES)
+
+    @contextmanager
+    def slot(self, upstream: str):
+        """Hold one concurrency slot of an upstream at the current priority"""
+        limiter = self.limiters[upstream]
+        limiter.acquire(current_priority.get())
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def load(self) -> float:
+        return max((limiter.utilization() for limiter in self.limiters.values()), default=0.0)
+
+    def check(self, priority: int) -> None:
+        """Shed low-priority requests early when upstreams are saturated"""
+        if priority < PRIORITY_LOW or self.load() < self.shed_threshold:
+            return
+        with self._lock:
+            self._early_shed[priority] += 1
+        raise OverloadedError("Server is busy, please retry shortly", retry_after=self.retry_after)
+
+    def priority(self, level: int, classify: Optional[Callable[[], Optional[int]]] = None):
+        """
+        Route decorator setting the request's priority class
+
+        classify may return a different level for a particular request (e.g.
+        critical for emergency symptoms) or None to keep the default.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                request_level = level
+                if classify is not None:
+                    classified = classify()
+                    request_level = level if classified is None else classified
+                self.check(request_level)
+                with use_priority(request_level):
+                    return view(*args, **kwargs)
+            wrapper.priority = level
+            return wrapper
+        return decorator
+
+    def stats(self) -> Dict:
+        with self._lock:
+            early_shed = dict(zip(PRIORITY_NAMES, self._early_shed))
+        return {
+            "load": round(self.load(), 3),
+            "shed_threshold": self.shed_threshold,
+            "early_shed": early_shed,
+            "upstreams": {name: limiter.stats() for name, limiter in self.limiters.items()}
+        }
+
+RESERVED_SLOTS = int(os.getenv("ADMISSION_RESERVED_SLOTS", "2"))
+
+admission_controller = AdmissionController(
+    {
+        "agent": PriorityLimiter("agent", int(os.getenv("ADMISSION_AGENT_CONCURRENCY", "8")), RESERVED_SLOTS),
+        "summarizer": PriorityLimiter("summarizer", int(os.getenv("ADMISSION_SUMMARIZER_CONCURRENCY", "8")),
+                                      RESERVED_SLOTS),
+        "maps": PriorityLimiter("maps", int(os.getenv("ADMISSION_MAPS_CONCURRENCY", "16")), RESERVED_SLOTS)
+    },
+    shed_threshold=float(os.getenv("ADMISSION_SHED_THRESHOLD", "0.8")),
+    retry_after=int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+)
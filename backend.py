@@ -1,105 +1,410 @@
 import os
-import requests
-import re
-import ast
+import time
+import logging
+import json
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from functools import partial
 from dotenv import load_dotenv
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Startup time per phase (seconds), logged and reported by /ready
+STARTUP_PHASES = {}
+_phase_started = time.perf_counter()
+
+def record_startup_phase(phase):
+    global _phase_started
+    now = time.perf_counter()
+    STARTUP_PHASES[phase] = round(now - _phase_started, 4)
+    _phase_started = now
+    logger.info(f"Startup phase '{phase}' took {STARTUP_PHASES[phase]:.3f}s")
+
 load_dotenv()
 TEAM_API_KEY = os.getenv("TEAM_API_KEY")
 os.environ["TEAM_API_KEY"] = TEAM_API_KEY
+record_startup_phase("load_env")
 
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from langdetect import detect
-from aixplain.factories import ModelFactory
+from admission_control import (
+    PRIORITY_CRITICAL, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL,
+    OverloadedError, admission_controller, is_emergency, use_priority
+)
+from channel_profiles import fit_to_profile, get_profile
+from conversation_memory import ConversationMemory
+from cowin_prefetch import cowin_prefetcher
+from cowin_session_index import session_index
+from language_detection import detect_language
+from faq_bank import faq_bank
+from government_health_integration import health_cache, search_vaccination_sessions
+from health_center_index import health_center_index
+from job_queue import JobQueue, QueueFullError
+from maps_integration import get_nearest_health_centers, rank_centers_by_travel_time, route_cache
+from model_registry import ModelRegistry
+from news_digest import NewsDigestStore
+from request_coalescing import SingleFlight
+from response_cache import ResponseCache, normalize_query
+from semantic_cache import SemanticCache
+from stage_metrics import StageMetrics
+from surveillance_store import surveillance_store
+from text_sanitizer import clean_news_response, repair_mojibake, sanitize, sanitize_model_text
+from vaccination_schedule import vaccination_engine, format_schedule_text
+record_startup_phase("imports")
 
-GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
+DOC_MODEL_ID = os.getenv("DOC_MODEL_ID")
+SUMM_MODEL_ID = os.getenv("SUMM_MODEL_ID")
+NEWS_MODEL_ID = os.getenv("NEWS_MODEL_ID")
+AGENT_MODEL_ID = os.getenv("AGENT_MODEL_ID")
 
-doc_model = ModelFactory.get(os.getenv("DOC_MODEL_ID"))
-summ_model = ModelFactory.get(os.getenv("SUMM_MODEL_ID"))
-news_model = ModelFactory.get(os.getenv("NEWS_MODEL_ID"))
-main_agent = ModelFactory.get(os.getenv("AGENT_MODEL_ID"))
+def load_aixplain_model(model_id):
+    # Imported here so the aiXplain SDK loads off the startup path
+    from aixplain.factories import ModelFactory
+    return ModelFactory.get(model_id)
+
+# Model handles resolve on first use; WARM_MODELS_ON_STARTUP loads them concurrently in the background.
+models = ModelRegistry(load_aixplain_model, retry_after=float(os.getenv("MODEL_RETRY_SECONDS", "30")))
+doc_model = models.register("doc", DOC_MODEL_ID)
+summ_model = models.register("summ", SUMM_MODEL_ID)
+news_model = models.register("news", NEWS_MODEL_ID)
+main_agent = models.register("agent", AGENT_MODEL_ID)
+if os.getenv("WARM_MODELS_ON_STARTUP", "true").lower() in ("1", "true", "yes"):
+    models.warm_up(background=True)
+record_startup_phase("model_registry")
 
 app = Flask(__name__)
 CORS(app)
 
-def remove_markdown(text):
-    text = re.sub(r'\*\*.*?\*\*', '', text)
-    text = re.sub(r'[\*\-] ', '', text)
-    text = re.sub(r'[#\*_\[\]()]', '', text)
-    text = re.sub(r'\n+', '\n', text).strip()
-    return text
-
-def format_text(text):
-    sections = text.split("\n")
-    return "\n\n".join(section.strip() for section in sections if section.strip())
-
-def clean_and_format_response(raw_response):
-    if "data=" in raw_response:
-        raw_response = raw_response.split("data=")[-1].strip()
-    raw_response = raw_response.strip("()'")
+# Per-stage latency histograms on /metrics; X-Debug-Timings: 1 returns the breakdown in X-Stage-Timings.
+stage_metrics = StageMetrics(
+    debug_header_enabled=os.getenv("DEBUG_TIMINGS_ENABLED", "true").lower() in ("1", "true", "yes")
+)
+stage_metrics.init_app(app)
+stage_timer = stage_metrics.stage_timer
+
+def error_response(e):
+    """JSON error body; shed requests get 503 with Retry-After instead of 500"""
+    if isinstance(e, OverloadedError):
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, 503
+    return jsonify({"error": str(e)}), 500
+
+@app.errorhandler(OverloadedError)
+def handle_overloaded(e):
+    return error_response(e)
+
+# Upstream model calls for streaming endpoints run here so the request thread
+# only relays events to the client while aiXplain is working.
+UPSTREAM_WORKERS = int(os.getenv("UPSTREAM_WORKERS", "16"))
+STREAM_KEEPALIVE_SECONDS = float(os.getenv("STREAM_KEEPALIVE_SECONDS", "10"))
+upstream_executor = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix="upstream")
+# /ask/batch fans out on its own pool so a large batch cannot starve the streaming endpoints.
+ASK_BATCH_MAX = int(os.getenv("ASK_BATCH_MAX", "100"))
+batch_executor = ThreadPoolExecutor(max_workers=int(os.getenv("ASK_BATCH_WORKERS", "8")), thread_name_prefix="ask-batch")
+
+# Model responses are cached per endpoint; TTLs are in seconds.
+RESPONSE_CACHE_TTLS = {
+    "ask": float(os.getenv("CACHE_TTL_ASK", "3600")),
+    "ask_summary": float(os.getenv("CACHE_TTL_ASK_SUMMARY", "3600")),
+    "chatbot_message": float(os.getenv("CACHE_TTL_CHATBOT_MESSAGE", "3600")),
+    "vaccination_schedule": float(os.getenv("CACHE_TTL_VACCINATION_SCHEDULE", "86400")),
+    "symptom_check": float(os.getenv("CACHE_TTL_SYMPTOM_CHECK", "1800"))
+}
+CACHE_BYPASS_HEADER = "X-Cache-Bypass"
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000")),
+    default_ttl=float(os.getenv("CACHE_TTL_DEFAULT", "3600")),
+    endpoint_ttls=RESPONSE_CACHE_TTLS
+)
+# Near-duplicate questions reuse a stored answer when cosine similarity passes the threshold.
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    max_entries_per_language=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "100000")),
+    ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "86400"))
+)
+# Slow endpoints can run as background jobs (opt-in per request) on a bounded pool.
+jobs = JobQueue(
+    max_workers=int(os.getenv("JOB_WORKERS", "8")),
+    max_pending=int(os.getenv("JOB_MAX_PENDING", "200")),
+    result_ttl=float(os.getenv("JOB_RESULT_TTL", "3600")),
+    webhook_allowed_hosts=[h.strip() for h in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if h.strip()]
+)
+JOB_RETRY_AFTER_SECONDS = 5
+# Recent /chatbot/message turns per (user_id, channel), so follow-ups keep their context
+conversation_memory = ConversationMemory(
+    max_conversations=int(os.getenv("CONVERSATION_MAX_USERS", "10000")),
+    max_turns=int(os.getenv("CONVERSATION_MAX_TURNS", "6")),
+    token_budget=int(os.getenv("CONVERSATION_TOKEN_BUDGET", "600")),
+    summary_tokens=int(os.getenv("CONVERSATION_SUMMARY_TOKENS", "150")),
+    idle_ttl=float(os.getenv("CONVERSATION_IDLE_TTL", "86400")),
+    spill_path=os.getenv("CONVERSATION_SPILL_DB") or None
+)
+# Identical upstream calls that overlap in time share one in-flight request.
+coalescer = SingleFlight()
+record_startup_phase("app_setup")
+
+def cache_bypass_requested():
+    """Clients can skip the response cache with X-Cache-Bypass: 1 or Cache-Control: no-cache"""
+    if request.headers.get(CACHE_BYPASS_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+def async_requested(data):
+    """Clients opt in with {"async": true} or a Prefer: respond-async header"""
+    if str(data.get("async", "")).lower() in ("1", "true", "yes"):
+        return True
+    return "respond-async" in request.headers.get("Prefer", "").lower()
+
+def submit_job(kind, fn, data):
+    """Queue fn as a background job and answer 202 with a link to poll"""
     try:
-        raw_response = ast.literal_eval(f"'''{raw_response}'''")
-    except Exception:
-        pass
-    match = re.search(r"https?://\S+\nSource:.*?\nDate: .*?\n\n", raw_response, re.DOTALL)
-    if match:
-        articles_part = raw_response[:match.end()].strip()
-        summary_part = raw_response[match.end():].strip()
-    else:
-        return raw_response.strip()
-    formatted_articles = re.sub(r"\n{3,}", "\n\n", articles_part)
-    formatted_summary = re.sub(r"\n{3,}", "\n\n", summary_part)
-    return f"{formatted_articles}\n\n{'-'*100}\n\n{formatted_summary}"
-
-def get_nearest_health_centers(latitude, longitude):
-    url = f"https://maps.googleapis.com/maps/api/place/nearbysearch/json?location={latitude},{longitude}&radius=5000&type=hospital&keyword=public%20health%20center&key={GOOGLE_MAPS_API_KEY}"
-    response = requests.get(url)
-    results = response.json().get("results", [])
-    if not results:
-        return {"error": "No health centers found nearby"}
-    return [
-        {
-            "name": place["name"],
-            "address": place.get("vicinity", "No address available"),
-            "latitude": place["geometry"]["location"]["lat"],
-            "longitude": place["geometry"]["location"]["lng"]
-        }
-        for place in results[:5]
-    ]
+        # The job keeps the priority the request was admitted with
+        job = jobs.submit(kind, partial(contextvars.copy_context().run, fn), data.get("callback_url"))
+    except QueueFullError as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = str(JOB_RETRY_AFTER_SECONDS)
+        return response, 503
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job["status_url"] = f"/jobs/{job['job_id']}"
+    response = jsonify(job)
+    response.headers["Location"] = job["status_url"]
+    return response, 202
+
+def call_upstream(upstream, fn, stage=None):
+    """Run an upstream call inside that upstream's concurrency budget, timing the wait and the call"""
+    start = time.perf_counter()
+    with admission_controller.slot(upstream):
+        stage_metrics.observe(f"{upstream}_wait", time.perf_counter() - start)
+        with stage_timer(stage or upstream):
+            return fn()
+
+def submit_upstream(fn, *args):
+    """Submit to upstream_executor, keeping the request's priority"""
+    return upstream_executor.submit(contextvars.copy_context().run, fn, *args)
+
+def run_agent(endpoint, prompt, language="", bypass_cache=False):
+    """Run main_agent through the response cache and return its output text"""
+    key = response_cache.make_key(endpoint, AGENT_MODEL_ID, prompt, language)
+    return response_cache.get_or_compute(
+        key,
+        lambda: coalescer.do(key, lambda: call_upstream("agent", lambda: main_agent.run(prompt)["data"]["output"])),
+        bypass=bypass_cache
+    )
+
+def run_summarizer(question, response_text, language, bypass_cache=False):
+    """Run summ_model through the response cache and return its raw data"""
+    payload = {"question": question, "response": response_text, "language": language}
+    key = response_cache.make_key("ask_summary", SUMM_MODEL_ID, f"{question}\n{response_text}", language)
+    return response_cache.get_or_compute(
+        key, lambda: coalescer.do(key, lambda: call_upstream("summarizer", lambda: summ_model.run(payload)["data"])),
+        bypass=bypass_cache
+    )
+
+def generate_agent_answer(question, output_language, bypass_cache=False):
+    formatted_query = f"{question} Response in {output_language}"
+    formatted_response = run_agent("ask", formatted_query, output_language, bypass_cache)
+    with stage_timer("format_answer"):
+        return sanitize(formatted_response)
+
+def generate_summary(question, agent_answer, output_language, bypass_cache=False):
+    safe_response = agent_answer.replace("\n", " ").replace('"', '\\"').replace("'", "\\'")
+    summ = run_summarizer(question, f"{safe_response}", output_language, bypass_cache)
+    with stage_timer("format_summary"):
+        return sanitize_model_text(summ, repair=True)
+
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
 
-def get_route(start_lat, start_lon, end_lat, end_lon):
-    url = f"https://maps.googleapis.com/maps/api/directions/json?origin={start_lat},{start_lon}&destination={end_lat},{end_lon}&mode=driving&key={GOOGLE_MAPS_API_KEY}"
-    response = requests.get(url)
-    data = response.json()
-    if "routes" not in data or not data["routes"]:
-        return {"error": "No route found"}
-    return {"route_polyline": data["routes"][0]["overview_polyline"]["points"]}
+def await_upstream(future):
+    """Wait for an upstream future, emitting SSE comments so slow links stay open"""
+    while True:
+        try:
+            return future.result(timeout=STREAM_KEEPALIVE_SECONDS)
+        except FutureTimeoutError:
+            yield ": keep-alive\n\n"
+
+def stream_ask_events(question, output_language, bypass_cache=False):
+    yield sse_event("accepted", {"language": output_language})
+    cached = None if bypass_cache else semantic_cache.lookup(question, output_language)
+    if cached:
+        yield sse_event("answer", {"response": cached["answer"]["response"]})
+        yield sse_event("summary", {"summary": cached["answer"]["summary"]})
+        yield sse_event("done", {})
+        return
+    try:
+        answer_future = submit_upstream(generate_agent_answer, question, output_language, bypass_cache)
+        agent_answer = yield from await_upstream(answer_future)
+        # Start the summary before sending the answer so it runs while the
+        # answer travels to the client.
+        summary_future = submit_upstream(
+            generate_summary, question, agent_answer, output_language, bypass_cache
+        )
+        yield sse_event("answer", {"response": agent_answer})
+        summary = yield from await_upstream(summary_future)
+        semantic_cache.store(question, output_language, {"response": agent_answer, "summary": summary})
+        yield sse_event("summary", {"summary": summary})
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+    yield sse_event("done", {})
+
+def answer_question(question, output_language, bypass_cache=False):
+    if not bypass_cache:
+        with stage_timer("semantic_lookup"):
+            cached = semantic_cache.lookup(question, output_language)
+        if cached:
+            return cached["answer"]
+    agent_answer = generate_agent_answer(question, output_language, bypass_cache)
+    summary = generate_summary(question, agent_answer, output_language, bypass_cache)
+    answer = {"response": agent_answer, "summary": summary}
+    with stage_timer("semantic_store"):
+        semantic_cache.store(question, output_language, answer)
+    return answer
 
 @app.route("/ask", methods=["POST"])
+@admission_controller.priority(PRIORITY_NORMAL)
 def ask():
     try:
         data = request.json
         question = data.get("question", "")
         if not question:
             return jsonify({"error": "No question provided"}), 400
-        output_language = detect(question)
-        formatted_query = f"{question} Response in {output_language}"
-        agent_response = main_agent.run(formatted_query)
-        formatted_response = agent_response["data"]["output"]
-        form_response = remove_markdown(formatted_response)
-        agent_answer = format_text(form_response)
-        safe_response = agent_answer.replace("\n", " ").replace('"', '\\"').replace("'", "\\'")
-        summ = summ_model.run({"question": question, "response": f"{safe_response}", "language": output_language})["data"]
-        corrected_text = summ.encode('latin1').decode('utf-8')
-        corr_text = remove_markdown(corrected_text)
-        summary = format_text(corr_text)
-        return jsonify({"response": agent_answer, "summary": summary})
+        with stage_timer("detect"):
+            output_language = detect_language(question)
+        bypass_cache = cache_bypass_requested()
+        if async_requested(data):
+            return submit_job("ask", lambda: answer_question(question, output_language, bypass_cache), data)
+        return jsonify(answer_question(question, output_language, bypass_cache))
+    except Exception as e:
+        return error_response(e)
+
+@app.route("/ask/stream", methods=["POST"])
+@admission_controller.priority(PRIORITY_NORMAL)
+def ask_stream():
+    """Stream the agent answer as soon as it is ready, followed by the summary (SSE)"""
+    try:
+        data = request.json
+        question = data.get("question", "")
+        if not question:
+            return jsonify({"error": "No question provided"}), 400
+        with stage_timer("detect"):
+            output_language = detect_language(question)
+        return Response(
+            stream_with_context(stream_ask_events(question, output_language, cache_bypass_requested())),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    except Exception as e:
+        return error_response(e)
+
+def parse_batch_items(questions):
+    """Normalize batch entries to {"id", "question", "position"}; ids default to the position"""
+    items = []
+    for index, entry in enumerate(questions):
+        if isinstance(entry, dict):
+            item_id, question = entry.get("id", index), entry.get("question", "")
+        else:
+            item_id, question = index, entry
+        items.append({"id": item_id, "question": str(question).strip(), "position": index})
+    return items
+
+def plan_batch(items):
+    """Group items by (normalized question, language) so each distinct question is answered once"""
+    groups = {}
+    for item in items:
+        if not item["question"]:
+            item["error"] = "No question provided"
+            continue
+        with stage_timer("detect"):
+            item["language"] = detect_language(item["question"])
+        key = (normalize_query(item["question"]), item["language"])
+        groups.setdefault(key, []).append(item)
+    return groups
+
+def batch_result(item, answer=None, error=None):
+    result = {"id": item["id"], "question": item["question"]}
+    if "language" in item:
+        result["language"] = item["language"]
+    if error is not None:
+        result["error"] = str(error)
+        if isinstance(error, OverloadedError):
+            result["retry_after"] = error.retry_after
+    else:
+        result.update(answer)
+    return result
+
+def run_batch(groups, bypass_cache):
+    """Submit one answer_question per distinct question; returns {future: items}"""
+    return {
+        batch_executor.submit(contextvars.copy_context().run, answer_question,
+                              items[0]["question"], items[0]["language"], bypass_cache): items
+        for items in groups.values()
+    }
+
+def batch_outcome(future):
+    try:
+        return future.result(), None
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return None, e
+
+def stream_batch_results(items, futures):
+    """NDJSON: one line per item as soon as its question is answered, then a summary line"""
+    errors = 0
+    for item in items:
+        if "error" in item:
+            errors += 1
+            yield json.dumps(batch_result(item, error=item["error"]), ensure_ascii=False) + "\n"
+    for future in as_completed(futures):
+        answer, error = batch_outcome(future)
+        for item in futures[future]:
+            errors += error is not None
+            yield json.dumps(batch_result(item, answer, error), ensure_ascii=False) + "\n"
+    yield json.dumps({"done": True, "count": len(items), "unique": len(futures), "errors": errors}) + "\n"
+
+@app.route("/ask/batch", methods=["POST"])
+@admission_controller.priority(PRIORITY_LOW)
+def ask_batch():
+    """Answer many questions at once, deduplicated and fanned out under the upstream limits"""
+    try:
+        data = request.json or {}
+        questions = data.get("questions") or []
+        if not isinstance(questions, list) or not questions:
+            return jsonify({"error": "questions must be a non-empty list"}), 400
+        if len(questions) > ASK_BATCH_MAX:
+            return jsonify({"error": f"At most {ASK_BATCH_MAX} questions per batch"}), 400
+        items = parse_batch_items(questions)
+        futures = run_batch(plan_batch(items), cache_bypass_requested())
+        if data.get("stream"):
+            return Response(
+                stream_with_context(stream_batch_results(items, futures)),
+                mimetype="application/x-ndjson",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        results = [batch_result(item, error=item["error"]) if "error" in item else None for item in items]
+        for future, group in futures.items():
+            answer, error = batch_outcome(future)
+            for item in group:
+                results[item["position"]] = batch_result(item, answer, error)
+        return jsonify({
+            "results": results,
+            "count": len(results),
+            "unique": len(futures),
+            "errors": sum("error" in r for r in results)
+        })
+    except Exception as e:
+        return error_response(e)
+
+def lookup_doctors(condition, location):
+    key = ("doctors", DOC_MODEL_ID, condition.strip().lower(), location.strip().lower())
+    doctors = coalescer.do(key, lambda: call_upstream(
+        "agent", lambda: doc_model.run({"condition": condition, "location": location}), "doctor_model"))
+    return {"doctors": repair_mojibake(doctors.data)}
 
 @app.route("/doctors", methods=["POST"])
+@admission_controller.priority(PRIORITY_NORMAL)
 def find_doctors():
     try:
         data = request.json
@@ -107,12 +412,14 @@ def find_doctors():
         location = data.get("location", "")
         if not condition or not location:
             return jsonify({"error": "Condition and location required"}), 400
-        doctors = doc_model.run({"condition": condition, "location": location})
-        return jsonify({"doctors": doctors.data.encode('latin1').decode('utf-8')})
+        if async_requested(data):
+            return submit_job("doctors", lambda: lookup_doctors(condition, location), data)
+        return jsonify(lookup_doctors(condition, location))
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/health-centers", methods=["POST"])
+@admission_controller.priority(PRIORITY_HIGH)
 def find_health_centers():
     try:
         data = request.json
@@ -120,30 +427,101 @@ def find_health_centers():
         longitude = data.get("longitude")
         if not latitude or not longitude:
             return jsonify({"error": "Latitude and longitude are required"}), 400
-        health_centers = get_nearest_health_centers(latitude, longitude)
+        with stage_timer("center_lookup"):
+            health_centers = get_nearest_health_centers(latitude, longitude)
         if "error" in health_centers:
             return jsonify(health_centers), 400
-        first_center = health_centers[0]
-        route = get_route(latitude, longitude, first_center["latitude"], first_center["longitude"])
-        return jsonify({"nearest_health_centers": health_centers, "route": route})
+        # Routes to every center are fetched concurrently; the fastest comes first
+        with stage_timer("route_ranking"):
+            ranked_centers = rank_centers_by_travel_time(latitude, longitude, health_centers)
+        return jsonify({"nearest_health_centers": ranked_centers, "route": ranked_centers[0]["route"]})
+    except Exception as e:
+        return error_response(e)
+
+HEALTH_CENTER_BATCH_MAX = int(os.getenv("HEALTH_CENTER_BATCH_MAX", "10000"))
+
+@app.route("/health-centers/batch", methods=["POST"])
+@admission_controller.priority(PRIORITY_LOW)
+def find_health_centers_batch():
+    """Nearest centers for many village coordinates, answered from the local index only"""
+    try:
+        data = request.json or {}
+        locations = data.get("locations") or []
+        k = min(int(data.get("k", 5)), 50)
+        radius_km = data.get("radius_km")
+        if not locations:
+            return jsonify({"error": "locations is required"}), 400
+        if len(locations) > HEALTH_CENTER_BATCH_MAX:
+            return jsonify({"error": f"At most {HEALTH_CENTER_BATCH_MAX} locations per request"}), 400
+        if not len(health_center_index):
+            return jsonify({"error": "Health center index is not loaded"}), 503
+        coordinates = [
+            (loc["latitude"], loc["longitude"]) if isinstance(loc, dict) else tuple(loc)
+            for loc in locations
+        ]
+        with stage_timer("index_query"):
+            results = health_center_index.nearest_batch(
+                coordinates, k, float(radius_km) if radius_km is not None else None)
+        return jsonify({
+            "count": len(results),
+            "results": [
+                {"latitude": lat, "longitude": lon, "nearest_health_centers": centers}
+                for (lat, lon), centers in zip(coordinates, results)
+            ]
+        })
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid locations: {e}"}), 400
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def generate_news_digest(language):
+    key = ("news", NEWS_MODEL_ID, language)
+    # Digest generation never competes with interactive traffic for agent slots
+    with use_priority(PRIORITY_LOW):
+        return coalescer.do(key, lambda: clean_news_response(
+            str(call_upstream("agent", lambda: news_model.run({"language": language}), "news_model"))))
+
+# Digests for these languages are generated in the background; others are added on first request.
+NEWS_LANGUAGES = os.getenv(
+    "NEWS_LANGUAGES", "english,hindi,marathi,bengali,tamil,telugu,gujarati,punjabi,malayalam,kannada"
+).split(",")
+news_digests = NewsDigestStore(
+    generate_news_digest, NEWS_LANGUAGES,
+    refresh_interval=float(os.getenv("NEWS_REFRESH_SECONDS", "1800"))
+)
+if os.getenv("NEWS_PREWARM", "true").lower() in ("1", "true", "yes"):
+    news_digests.start()
 
 @app.route("/news", methods=["POST"])
+@admission_controller.priority(PRIORITY_LOW)
 def get_news():
     try:
         data = request.json
         language = data.get("language", "")
         if not language:
             return jsonify({"error": "Language selection is required"}), 400
-        news = news_model.run({"language": language})
-        return jsonify({"news": clean_and_format_response(str(news))})
+        with stage_timer("digest_lookup"):
+            digest = news_digests.get(language)
+        if digest is None:
+            digest = news_digests.refresh(language)
+        if request.if_none_match.contains(digest["etag"]):
+            response = Response(status=304)
+        else:
+            response = jsonify({
+                "news": digest["news"],
+                "generated_at": digest["generated_at"],
+                **news_digests.staleness(digest)
+            })
+        response.set_etag(digest["etag"])
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 # =================== CHATBOT API ENDPOINTS ===================
 
 @app.route("/chatbot/message", methods=["POST"])
+@admission_controller.priority(PRIORITY_NORMAL)
 def chatbot_message():
     """Handle incoming chatbot messages from web/WhatsApp/SMS"""
     try:
@@ -158,28 +536,59 @@ def chatbot_message():
         
         # Auto-detect language if not specified
         if language == "auto":
-            language = detect(message)
+            with stage_timer("detect"):
+                language = detect_language(message)
         
-        # Process through AI agent with healthcare context
-        healthcare_prompt = f"As a healthcare assistant for rural populations, respond to: {message}. Provide accurate, helpful health information in {language}."
-        agent_response = main_agent.run(healthcare_prompt)
-        formatted_response = agent_response["data"]["output"]
-        clean_response = remove_markdown(formatted_response)
-        final_response = format_text(clean_response)
+        profile = get_profile(channel)
+        # SMS/WhatsApp answers are shortened, so they are cached apart from full web answers
+        cache_language = language if profile.max_chars is None else f"{language}:{profile.name}"
+        with stage_timer("conversation_context"):
+            history = conversation_memory.context(user_id, channel)
+        # Follow-ups depend on the earlier turns, so their answers are neither served from nor stored in the caches
+        bypass_cache = cache_bypass_requested() or bool(history)
+        faq = None
+        if not bypass_cache and not is_emergency(message):
+            with stage_timer("faq_lookup"):
+                faq = faq_bank.lookup(message, language)
+        with stage_timer("semantic_lookup"):
+            cached = None if bypass_cache or faq else semantic_cache.lookup(message, cache_language)
+        if faq:
+            with stage_timer("fit_to_channel"):
+                final_response = fit_to_profile(faq["answer"], profile)
+        elif cached:
+            final_response = cached["answer"]["response"]
+        else:
+            # Process through AI agent with healthcare context
+            healthcare_prompt = f"As a healthcare assistant for rural populations, respond to: {message}. Provide accurate, helpful health information in {language}."
+            if profile.prompt_instruction:
+                healthcare_prompt = f"{healthcare_prompt} {profile.prompt_instruction}"
+            if history:
+                healthcare_prompt = f"{history}\n\n{healthcare_prompt}"
+            formatted_response = run_agent("chatbot_message", healthcare_prompt, language, bypass_cache)
+            with stage_timer("format_answer"):
+                final_response = sanitize(formatted_response)
+            with stage_timer("fit_to_channel"):
+                final_response = fit_to_profile(final_response, profile)
+            if not history:
+                with stage_timer("semantic_store"):
+                    semantic_cache.store(message, cache_language, {"response": final_response})
         
-        # Store conversation for accuracy tracking
-        # TODO: Implement conversation storage
+        conversation_memory.append(user_id, channel, message, final_response)
         
-        return jsonify({
+        result = {
             "response": final_response,
             "language": language,
             "channel": channel,
             "timestamp": request.json.get("timestamp", "")
-        })
+        }
+        if faq:
+            result["faq"] = {"id": faq["id"], "version": faq["version"]}
+        return jsonify(result)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/chatbot/vaccination-schedule", methods=["POST"])
+@admission_controller.priority(PRIORITY_NORMAL)
 def vaccination_schedule():
     """Get vaccination schedule by age/location"""
     try:
@@ -187,22 +596,49 @@ def vaccination_schedule():
         age = data.get("age", "")
         location = data.get("location", "")
         language = data.get("language", "english")
+        date_of_birth = data.get("date_of_birth", "")
+        pregnant = data.get("pregnant", False)
+        pregnancy_start = data.get("pregnancy_start", "")
         
-        if not age:
+        if not age and not date_of_birth and not pregnant and not pregnancy_start:
             return jsonify({"error": "Age is required"}), 400
         
-        vaccination_query = f"Provide vaccination schedule for {age} year old in {location}. Respond in {language}."
-        schedule_response = main_agent.run(vaccination_query)
-        formatted_schedule = remove_markdown(schedule_response["data"]["output"])
+        # Computed locally from the national immunization table; the agent is
+        # only used (and cached) to translate the result.
+        try:
+            with stage_timer("schedule_engine"):
+                schedule = vaccination_engine.build_schedule(
+                    age=age, date_of_birth=date_of_birth, given_doses=data.get("given_doses"),
+                    pregnant=pregnant, pregnancy_start=pregnancy_start, as_of=data.get("as_of")
+                )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        with stage_timer("schedule_format"):
+            schedule_text = format_schedule_text(schedule)
+        translated = False
+        if data.get("translate", True) and language.strip().lower() not in ("english", "en"):
+            translation_query = (
+                f"Translate this vaccination schedule into {language}. Keep vaccine names and dates "
+                f"unchanged and do not add information:\n{schedule_text}"
+            )
+            try:
+                translation = run_agent("vaccination_schedule", translation_query, language, cache_bypass_requested())
+                with stage_timer("format_answer"):
+                    schedule_text = sanitize(translation)
+                translated = True
+            except Exception:
+                pass
         
         return jsonify({
-            "vaccination_schedule": format_text(formatted_schedule),
+            "vaccination_schedule": schedule_text,
+            "schedule": schedule,
+            "translated": translated,
             "age": age,
             "location": location,
             "language": language
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/chatbot/health-alerts/subscribe", methods=["POST"])
 def subscribe_health_alerts():
@@ -227,9 +663,10 @@ def subscribe_health_alerts():
             "location": location
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
 
 @app.route("/chatbot/outbreak-alert", methods=["POST"])
+@admission_controller.priority(PRIORITY_HIGH)
 def send_outbreak_alert():
     """Send outbreak alerts to subscribed users"""
     try:
@@ -253,9 +690,29 @@ def send_outbreak_alert():
             "recipients_count": 0  # TODO: Get actual count from database
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+def assess_symptoms(symptoms, age, language, bypass_cache=False):
+    symptom_query = f"Analyze these symptoms: {symptoms}. Patient age: {age}. Provide preliminary assessment and recommendations. Include when to seek immediate medical help. Respond in {language}."
+    symptom_output = run_agent("symptom_check", symptom_query, language, bypass_cache)
+    with stage_timer("format_answer"):
+        assessment = sanitize(symptom_output)
+    
+    return {
+        "assessment": assessment,
+        "symptoms": symptoms,
+        "age": age,
+        "language": language,
+        "disclaimer": "This is not a substitute for professional medical advice. Consult a doctor for proper diagnosis."
+    }
+
+def symptom_priority():
+    """Emergency symptoms jump ahead of all other traffic"""
+    data = request.get_json(silent=True) or {}
+    return PRIORITY_CRITICAL if is_emergency(str(data.get("symptoms", ""))) else None
 
 @app.route("/chatbot/symptom-check", methods=["POST"])
+@admission_controller.priority(PRIORITY_HIGH, classify=symptom_priority)
 def symptom_check():
     """AI-powered symptom checker"""
     try:
@@ -267,21 +724,88 @@ def symptom_check():
         if not symptoms:
             return jsonify({"error": "Symptoms are required"}), 400
         
-        symptom_query = f"Analyze these symptoms: {symptoms}. Patient age: {age}. Provide preliminary assessment and recommendations. Include when to seek immediate medical help. Respond in {language}."
-        symptom_response = main_agent.run(symptom_query)
-        formatted_response = remove_markdown(symptom_response["data"]["output"])
-        
-        return jsonify({
-            "assessment": format_text(formatted_response),
-            "symptoms": symptoms,
-            "age": age,
-            "language": language,
-            "disclaimer": "This is not a substitute for professional medical advice. Consult a doctor for proper diagnosis."
-        })
+        bypass_cache = cache_bypass_requested()
+        if async_requested(data):
+            return submit_job("symptom_check", lambda: assess_symptoms(symptoms, age, language, bypass_cache), data)
+        return jsonify(assess_symptoms(symptoms, age, language, bypass_cache))
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+COWIN_PREFETCH_MAX_PINCODES = int(os.getenv("COWIN_PREFETCH_MAX_PINCODES", "2000"))
+
+@app.route("/admin/cowin/prefetch", methods=["POST"])
+@admission_controller.priority(PRIORITY_LOW)
+def cowin_prefetch():
+    """Warm the vaccination session cache for many pincodes over the next days (runs as a background job)"""
+    try:
+        data = request.json or {}
+        pincodes = data.get("pincodes")
+        days = data.get("days", 7)
+        if not isinstance(pincodes, list) or not pincodes:
+            return jsonify({"error": "pincodes must be a non-empty list"}), 400
+        if len(pincodes) > COWIN_PREFETCH_MAX_PINCODES:
+            return jsonify({"error": f"At most {COWIN_PREFETCH_MAX_PINCODES} pincodes per request"}), 400
+        pincodes = [str(p).strip() for p in pincodes]
+        invalid = [p for p in pincodes if not (len(p) == 6 and p.isdigit())]
+        if invalid:
+            return jsonify({"error": f"Invalid pincodes: {', '.join(invalid[:10])}"}), 400
+        if not isinstance(days, int) or not 1 <= days <= 14:
+            return jsonify({"error": "days must be between 1 and 14"}), 400
+        return submit_job("cowin_prefetch", lambda: cowin_prefetcher.prefetch(pincodes, days=days), data)
+    except Exception as e:
+        return error_response(e)
+
+SESSION_SEARCH_MAX_RESULTS = int(os.getenv("SESSION_SEARCH_MAX_RESULTS", "200"))
+
+@app.route("/vaccination-sessions/search", methods=["POST"])
+@admission_controller.priority(PRIORITY_NORMAL)
+def search_sessions():
+    """Filter every vaccination session fetched so far, e.g. Covishield, 18+, free, next 3 days near these pincodes"""
+    try:
+        data = request.json or {}
+        pincodes = data.get("pincodes")
+        if pincodes is not None:
+            if not isinstance(pincodes, list) or len(pincodes) > COWIN_PREFETCH_MAX_PINCODES:
+                return jsonify({"error": f"pincodes must be a list of at most {COWIN_PREFETCH_MAX_PINCODES}"}), 400
+            pincodes = [str(p).strip() for p in pincodes]
+            invalid = [p for p in pincodes if not (len(p) == 6 and p.isdigit())]
+            if invalid:
+                return jsonify({"error": f"Invalid pincodes: {', '.join(invalid[:10])}"}), 400
+        filters = {"pincodes": pincodes}
+        for name in ("vaccine", "fee_type", "date_from"):
+            value = data.get(name)
+            if value is not None and not isinstance(value, str):
+                return jsonify({"error": f"{name} must be a string"}), 400
+            filters[name] = value
+        for name in ("age", "min_age_limit", "dose", "days", "min_capacity"):
+            value = data.get(name)
+            if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+                return jsonify({"error": f"{name} must be a non-negative integer"}), 400
+            if value is not None:
+                filters[name] = value
+        if filters.get("dose") not in (None, 1, 2):
+            return jsonify({"error": "dose must be 1 or 2"}), 400
+        limit = data.get("limit", 50)
+        if not isinstance(limit, int) or not 1 <= limit <= SESSION_SEARCH_MAX_RESULTS:
+            return jsonify({"error": f"limit must be between 1 and {SESSION_SEARCH_MAX_RESULTS}"}), 400
+        try:
+            sessions = search_vaccination_sessions(limit=limit, **filters)
+        except ValueError:
+            return jsonify({"error": "date_from must be DD-MM-YYYY"}), 400
+        return jsonify({"sessions": sessions, "count": len(sessions)})
+    except Exception as e:
+        return error_response(e)
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """Poll a background job started with async mode"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job)
 
 @app.route("/admin/chatbot/metrics", methods=["GET"])
+@admission_controller.priority(PRIORITY_LOW)
 def chatbot_metrics():
     """Get chatbot performance analytics"""
     try:
@@ -305,12 +829,64 @@ def chatbot_metrics():
                 "web": 50,
                 "whatsapp": 35,
                 "sms": 15
-            }
+            },
+            "response_cache": response_cache.stats(),
+            "semantic_cache": semantic_cache.stats(),
+            "request_coalescing": coalescer.stats(),
+            "news_digests": news_digests.stats(),
+            "route_cache": route_cache.stats(),
+            "health_center_index": health_center_index.stats(),
+            "jobs": jobs.stats(),
+            "admission_control": admission_controller.stats(),
+            "conversation_memory": conversation_memory.stats(),
+            "faq_bank": faq_bank.stats(),
+            "health_data_cache": health_cache.stats(),
+            "cowin_prefetch": cowin_prefetcher.stats(),
+            "session_index": session_index.stats(),
+            "surveillance_store": surveillance_store.stats()
         }
         
         return jsonify(mock_metrics)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return error_response(e)
+
+stage_metrics.register_stats({
+    "response_cache": response_cache.stats,
+    "semantic_cache": semantic_cache.stats,
+    "request_coalescing": coalescer.stats,
+    "news_digests": news_digests.stats,
+    "route_cache": route_cache.stats,
+    "health_center_index": health_center_index.stats,
+    "jobs": jobs.stats,
+    "admission_control": admission_controller.stats,
+    "conversation_memory": conversation_memory.stats,
+    "faq_bank": faq_bank.stats,
+    "health_data_cache": health_cache.stats,
+    "cowin_prefetch": cowin_prefetcher.stats,
+    "session_index": session_index.stats,
+    "surveillance_store": surveillance_store.stats
+})
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = stage_metrics.exposition()
+    return Response(body, content_type=content_type)
+
+@app.route("/health", methods=["GET"])
+def health():
+    """Liveness check; does not wait for models"""
+    return jsonify({"status": "ok"})
+
+@app.route("/ready", methods=["GET"])
+def ready():
+    """Readiness check reporting which models are loaded"""
+    is_ready = models.is_ready()
+    return jsonify({
+        "ready": is_ready,
+        "models": models.status(),
+        "startup_phases": STARTUP_PHASES
+    }), 200 if is_ready else 503
 
 if __name__ == "__main__":
     app.run(debug=True, port=5000)
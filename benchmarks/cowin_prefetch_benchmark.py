@@ -0,0 +1,77 @@
+# Co-WIN Prefetch Benchmark
+# Bulk-fetches (pincode, date) pairs from the local Co-WIN stub, sequentially and with CowinPrefetcher
+#
+# Usage: python benchmarks/cowin_prefetch_benchmark.py [--pincodes 100] [--days 7] [--concurrency 16]
+#        [--rate 200] [--latency lognormal:0.08,0.3] [--error-rate 0.05]
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# The benchmark uses its own in-memory cache; keep the shared disk tier out of it
+os.environ["HEALTH_CACHE_DB"] = ""
+
+from stubs import Latency, cowin_sessions_response, flaky, start_stub_server
+from cowin_prefetch import CowinPrefetcher, date_range
+from government_health_integration import GovernmentHealthAPI, HealthDataCache
+
+def sequential_fetch(base_url: str, pairs) -> float:
+    """The previous access pattern: one unpooled requests.get per pair"""
+    start = time.perf_counter()
+    for pincode, date in pairs:
+        requests.get(f"{base_url}/v2/appointment/sessions/public/findByPin",
+                     params={"pincode": pincode, "date": date}).raise_for_status()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pincodes", type=int, default=100)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=200, help="token bucket requests per second")
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--latency", default="lognormal:0.08,0.3", help="stub latency spec")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="fraction of stub calls answering 429/503")
+    parser.add_argument("--sequential-sample", type=int, default=50,
+                        help="pairs fetched sequentially to estimate the old throughput")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    server = start_stub_server(Latency(args.latency, seed=args.seed), seed=args.seed)
+    pincodes = [str(110001 + i) for i in range(args.pincodes)]
+    pairs = [(p, d) for p in pincodes for d in date_range(datetime.now(), args.days)]
+
+    sample = pairs[:args.sequential_sample]
+    sequential = sequential_fetch(server.base_url, sample)
+    sequential_rate = len(sample) / sequential
+
+    route = "/v2/appointment/sessions/public/findByPin"
+    handler = lambda q, rng: (200, cowin_sessions_response(q, rng))
+    server.routes[route] = flaky(flaky(handler, args.error_rate / 2, 429), args.error_rate / 2, 503)
+    api = GovernmentHealthAPI(cowin_base_url=server.base_url, pool_size=args.concurrency)
+    cache = HealthDataCache(max_entries=len(pairs) * 2)
+    prefetcher = CowinPrefetcher(api, cache, rate=args.rate, burst=args.burst, concurrency=args.concurrency,
+                                 backoff_base=0.05, backoff_max=1.0)
+    report = prefetcher.prefetch(pincodes, days=args.days)
+    again = prefetcher.prefetch(pincodes, days=args.days)
+
+    print(f"pairs: {len(pairs)} ({args.pincodes} pincodes x {args.days} days), stub latency {args.latency}, "
+          f"error rate {args.error_rate}")
+    print(f"sequential (old):  {sequential_rate:8.1f} pairs/s   (~{len(pairs) / sequential_rate:.1f} s for all pairs)")
+    print(f"prefetch:          {report['pairs_per_second']:8.1f} pairs/s   ({report['elapsed_seconds']:.1f} s, "
+          f"{report['fetched']} fetched, {report['failed']} failed, {report['retries']} retries, "
+          f"{report['rate_limited']} rate-limited)")
+    print(f"speedup:           {report['pairs_per_second'] / sequential_rate:8.1f}x")
+    print(f"second run:        {again['skipped_fresh']} pairs already fresh, {again['requests']} requests")
+    print(f"cache:             {json.dumps({k: cache.stats()[k] for k in ('entries', 'bytes')})}")
+    sys.exit(1 if report["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Co-WIN Session Index Benchmark
+# Times filtered session queries on CowinSessionIndex and checks them against a scan of the raw responses
+#
+# Usage: python benchmarks/cowin_session_index_benchmark.py [--pincodes 2000] [--days 7] [--queries 200]
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import cowin_sessions_response
+from cowin_session_index import CowinSessionIndex
+from cowin_prefetch import date_range
+
+def scan(responses, pincodes, dates, age):
+    """The previous access pattern: walk every cached findByPin response"""
+    found = []
+    for (pincode, date), sessions in responses.items():
+        if (pincodes is not None and pincode not in pincodes) or date not in dates:
+            continue
+        for s in sessions:
+            if (s["vaccine"] == "COVISHIELD" and s["fee_type"] == "Free" and s["min_age_limit"] <= age
+                    and s["available_capacity"] > 0):
+                found.append(s)
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pincodes", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--window", type=int, default=3, help="days searched per query")
+    parser.add_argument("--selected", type=int, default=300, help="pincodes per filtered query")
+    parser.add_argument("--updates", type=int, default=6000, help="pairs re-fetched after the initial load")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    pincodes = [str(110001 + i) for i in range(args.pincodes)]
+    dates = date_range(datetime.now(), args.days)
+    index = CowinSessionIndex()
+    responses = {}
+
+    def fetch(pincode, date):
+        sessions = cowin_sessions_response({"pincode": [pincode], "date": [date]}, rng)["sessions"]
+        responses[(pincode, date)] = sessions
+        index.upsert(pincode, date, sessions)
+
+    start = time.perf_counter()
+    for pincode in pincodes:
+        for date in dates:
+            fetch(pincode, date)
+    load = time.perf_counter() - start
+    start = time.perf_counter()
+    for pincode, date in list(responses)[:args.updates]:
+        fetch(pincode, date)
+    updates = time.perf_counter() - start
+
+    stats = index.stats()
+    print(f"sessions:                {stats['sessions']:,} ({stats['bytes'] / 1024:.0f} KiB of columns)")
+    print(f"initial load:            {load / len(responses) * 1e6:.1f} us/pair")
+    print(f"incremental updates:     {updates / max(args.updates, 1) * 1e6:.1f} us/pair")
+
+    window = set(dates[:args.window])
+    for label, selected in ((f"{args.selected} pincodes", set(pincodes[:args.selected])), ("all pincodes", None)):
+        expected = scan(responses, selected, window, 18)
+        found = index.query(vaccine="covishield", age=18, fee_type="free", pincodes=selected, days=args.window,
+                            limit=len(expected) + 1)
+        match = sorted(map(id, expected)) == sorted(map(id, found))
+
+        start = time.perf_counter()
+        for _ in range(args.queries):
+            index.query(vaccine="covishield", age=18, fee_type="free", pincodes=selected, days=args.window, limit=50)
+        indexed = (time.perf_counter() - start) / args.queries
+        start = time.perf_counter()
+        for _ in range(max(1, args.queries // 20)):
+            scan(responses, selected, window, 18)
+        scanned = (time.perf_counter() - start) / max(1, args.queries // 20)
+        print(f"{label + ':':<25}{indexed * 1e6:8.0f} us/query indexed, {scanned * 1e6:8.0f} us/query scan "
+              f"({scanned / indexed:.1f}x), {len(found)} matches, {'ok' if match else 'MISMATCH'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Health Center Index Benchmark
+# Times local k-nearest and within-radius queries and checks them against brute force
+#
+# Usage: python benchmarks/health_center_index_benchmark.py [--centers 30000] [--queries 5000]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from health_center_index import HealthCenterIndex, haversine_km
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--centers", type=int, default=30_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--radius-km", type=float, default=5.0)
+    parser.add_argument("--check", type=int, default=500)
+    args = parser.parse_args()
+
+    # Roughly India's bounding box; PHC counts are in the tens of thousands
+    rng = np.random.default_rng(7)
+    lats = rng.uniform(8, 35, args.centers)
+    lons = rng.uniform(68, 97, args.centers)
+    centers = [{"name": f"PHC {i}", "latitude": float(lat), "longitude": float(lon)}
+               for i, (lat, lon) in enumerate(zip(lats, lons))]
+    queries = np.column_stack([rng.uniform(8, 35, args.queries), rng.uniform(68, 97, args.queries)])
+
+    index = HealthCenterIndex()
+    start = time.perf_counter()
+    index.build(centers)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = index.nearest_batch(queries, args.k)
+    knn = (time.perf_counter() - start) / args.queries
+
+    start = time.perf_counter()
+    for lat, lon in queries:
+        index.within_radius(lat, lon, args.radius_km)
+    radius = (time.perf_counter() - start) / args.queries
+
+    lat_rad, lon_rad = np.radians(lats), np.radians(lons)
+    sample = min(args.check, args.queries)
+    start = time.perf_counter()
+    mismatches = 0
+    for (lat, lon), found in zip(queries[:sample], results):
+        expected = np.sort(haversine_km(lat, lon, lat_rad, lon_rad))[:args.k]
+        if not np.allclose(expected, [c["distance_km"] for c in found], atol=1e-3):
+            mismatches += 1
+    brute = (time.perf_counter() - start) / sample
+
+    print(f"centers:                 {args.centers:,}")
+    print(f"build:                   {build * 1000:.1f} ms")
+    print(f"k-nearest (k={args.k}):       {knn * 1e6:.1f} us/query")
+    print(f"within {args.radius_km:g} km:           {radius * 1e6:.1f} us/query")
+    print(f"brute force k-nearest:   {brute * 1e6:.1f} us/query")
+    print(f"mismatches vs brute:     {mismatches}/{sample}")
+
+if __name__ == "__main__":
+    main()
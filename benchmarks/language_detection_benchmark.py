@@ -0,0 +1,91 @@
+# Language Detection Benchmark
+# Compares language_detection.detect_language with plain langdetect.detect
+#
+# Usage: python benchmarks/language_detection_benchmark.py [--repeat 20]
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langdetect import detect
+from langdetect.lang_detect_exception import LangDetectException
+
+from language_detection import detect_language, _detect_normalized
+
+# (expected language, message) pairs modelled on /ask and /chatbot/message traffic
+CORPUS = [
+    ("hi", "डेंगू के लक्षण क्या हैं?"),
+    ("hi", "मुझे तीन दिन से बुखार है, क्या करूं?"),
+    ("hi", "बच्चे का टीकाकरण कब करवाना चाहिए"),
+    ("hi", "COVID vaccine के बारे में बताओ"),
+    ("bn", "ডেঙ্গুর লক্ষণ কী?"),
+    ("bn", "আমার মাথা ব্যথা করছে"),
+    ("ta", "டெங்கு அறிகுறிகள் என்ன"),
+    ("ta", "குழந்தைக்கு காய்ச்சல் உள்ளது"),
+    ("te", "డెంగ్యూ లక్షణాలు ఏమిటి"),
+    ("te", "నాకు జ్వరం వచ్చింది"),
+    ("gu", "ડેન્ગ્યુના લક્ષણો શું છે"),
+    ("pa", "ਡੇਂਗੂ ਦੇ ਲੱਛਣ ਕੀ ਹਨ"),
+    ("kn", "ಡೆಂಗ್ಯೂ ಲಕ್ಷಣಗಳು ಯಾವುವು"),
+    ("ml", "ഡെങ്കിപ്പനിയുടെ ലക്ഷണങ്ങൾ എന്തൊക്കെയാണ്"),
+    ("or", "ଡେଙ୍ଗୁର ଲକ୍ଷଣ କଣ"),
+    ("ur", "ڈینگی کی علامات کیا ہیں"),
+    ("hi", "dengue ke lakshan kya hai"),
+    ("hi", "mujhe bukhar hai kya karna chahiye"),
+    ("hi", "bacche ko teeka kab lagana hai"),
+    ("hi", "sir dard ka ilaj kya hai"),
+    ("en", "Fever symptoms?"),
+    ("en", "diabetes diet"),
+    ("en", "What are the symptoms of dengue?"),
+    ("en", "How can I prevent malaria during the monsoon season?"),
+    ("en", "My child has had diarrhoea since yesterday, what should I give him?"),
+    ("en", "When is the next polio vaccination drive in my village?"),
+]
+
+def langdetect_or_default(text):
+    try:
+        return detect(text)
+    except LangDetectException:
+        return "en"
+
+def run(detector, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, text in CORPUS:
+            detector(text)
+    return (time.perf_counter() - start) / (repeat * len(CORPUS))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    langdetect_or_default("warm up the langdetect profiles")
+    profile_load = time.perf_counter() - start
+
+    baseline = run(langdetect_or_default, args.repeat)
+    # Measured before detect_language seeds langdetect's global DetectorFactory
+    unstable = sum(len({langdetect_or_default(t) for _ in range(10)}) > 1 for _, t in CORPUS)
+    baseline_correct = sum(langdetect_or_default(t) == lang for lang, t in CORPUS)
+
+    _detect_normalized.cache_clear()
+    cold = run(detect_language, 1)
+    warm = run(detect_language, args.repeat)
+
+    detector_correct = sum(detect_language(t) == lang for lang, t in CORPUS)
+
+    print(f"corpus size:                  {len(CORPUS)} messages")
+    print(f"langdetect profile load:      {profile_load * 1e3:.1f} ms")
+    print(f"langdetect.detect:            {baseline * 1e6:.1f} us/message")
+    print(f"detect_language (cold cache): {cold * 1e6:.1f} us/message")
+    print(f"detect_language (memoized):   {warm * 1e6:.2f} us/message")
+    print(f"accuracy langdetect:          {baseline_correct}/{len(CORPUS)}")
+    print(f"accuracy detect_language:     {detector_correct}/{len(CORPUS)}")
+    print(f"langdetect unstable messages: {unstable}/{len(CORPUS)} (differ across 10 calls)")
+
+if __name__ == "__main__":
+    main()
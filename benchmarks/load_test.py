@@ -0,0 +1,213 @@
+# Backend Load Test
+# Drives mixed traffic at backend.py running against local aiXplain and Maps stubs
+#
+# Usage: python benchmarks/load_test.py [--duration 30] [--concurrency 32] [--latency-scale 0.1]
+#        [--mix ask=35,chatbot_message=25,symptom_check=10,doctors=10,health_centers=10,news=5,vaccination_schedule=5]
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from stubs import DEFAULT_LATENCIES, Latency, install_stub_aixplain, start_stub_server
+
+DEFAULT_MIX = "ask=35,chatbot_message=25,symptom_check=10,doctors=10,health_centers=10,news=5,vaccination_schedule=5"
+
+DISEASES = ["dengue", "malaria", "typhoid", "diabetes", "tuberculosis", "jaundice", "asthma", "anaemia",
+            "chikungunya", "high blood pressure", "diarrhoea", "common cold"]
+QUESTION_TEMPLATES = [
+    "What are the symptoms of {d}?",
+    "How is {d} treated?",
+    "How can I prevent {d} in my village?",
+    "{d} ke lakshan kya hai",
+    "My child has {d}, what should I do?",
+    "Is {d} contagious?",
+    "What should I eat during {d}?"
+]
+SYMPTOMS = ["fever and headache for {n} days", "cough with mild fever", "stomach pain after meals",
+            "skin rash and itching", "joint pain and fever for {n} days", "severe chest pain and sweating"]
+CITIES = [("Mumbai", 19.0760, 72.8777), ("Patna", 25.5941, 85.1376), ("Jaipur", 26.9124, 75.7873),
+          ("Madurai", 9.9252, 78.1198), ("Nashik", 19.9975, 73.7898)]
+LANGUAGES = ["english", "hindi", "marathi", "tamil", "bengali"]
+
+def question_pool(size: int, rng: random.Random) -> List[str]:
+    pool = [t.format(d=d) for t in QUESTION_TEMPLATES for d in DISEASES]
+    rng.shuffle(pool)
+    return pool[:size]
+
+def zipf_choice(pool: List, rng: random.Random, skew: float):
+    # Popular questions repeat often, as in real traffic, so the caches see a realistic hit rate
+    weights = [1 / (rank + 1) ** skew for rank in range(len(pool))]
+    return rng.choices(pool, weights)[0]
+
+def build_requests(questions: List[str], skew: float) -> Dict[str, Callable[[random.Random], Tuple[str, str, Dict]]]:
+    def ask(rng):
+        return "POST", "/ask", {"question": zipf_choice(questions, rng, skew)}
+
+    def chatbot_message(rng):
+        return "POST", "/chatbot/message", {"message": zipf_choice(questions, rng, skew),
+                                            "channel": rng.choice(["web", "whatsapp", "sms"]),
+                                            "user_id": f"user-{rng.randint(1, 500)}"}
+
+    def symptom_check(rng):
+        return "POST", "/chatbot/symptom-check", {"symptoms": rng.choice(SYMPTOMS).format(n=rng.randint(1, 5)),
+                                                  "age": str(rng.randint(1, 80))}
+
+    def doctors(rng):
+        return "POST", "/doctors", {"condition": rng.choice(DISEASES), "location": rng.choice(CITIES)[0]}
+
+    def health_centers(rng):
+        _, lat, lon = rng.choice(CITIES)
+        return "POST", "/health-centers", {"latitude": lat + rng.uniform(-0.05, 0.05),
+                                           "longitude": lon + rng.uniform(-0.05, 0.05)}
+
+    def news(rng):
+        return "POST", "/news", {"language": rng.choice(LANGUAGES)}
+
+    def vaccination_schedule(rng):
+        return "POST", "/chatbot/vaccination-schedule", {"age": str(rng.choice([0.2, 0.5, 1, 2, 5, 30])),
+                                                         "language": rng.choice(LANGUAGES)}
+
+    return {f.__name__: f for f in (ask, chatbot_message, symptom_check, doctors, health_centers, news,
+                                    vaccination_schedule)}
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+def start_backend():
+    """Import backend (after the stubs are installed) and serve it on a free local port"""
+    from werkzeug.serving import make_server
+    import backend
+    server = make_server("127.0.0.1", 0, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="backend", daemon=True).start()
+    return backend, server, f"http://127.0.0.1:{server.server_port}"
+
+def run_load(base_url: str, generators: Dict, mix: Dict[str, float], duration: float, concurrency: int,
+             seed: int, bypass_rate: float) -> Tuple[Dict[str, List[Tuple[int, float]]], float]:
+    results: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+    lock = threading.Lock()
+    names = [n for n in mix if n in generators]
+    weights = [mix[n] for n in names]
+    stop_at = time.perf_counter() + duration
+
+    def worker(index: int):
+        rng = random.Random(seed + index)
+        session = requests.Session()
+        local = defaultdict(list)
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights)[0]
+            method, path, body = generators[name](rng)
+            headers = {"X-Cache-Bypass": "1"} if rng.random() < bypass_rate else {}
+            start = time.perf_counter()
+            try:
+                status = session.request(method, base_url + path, json=body, headers=headers, timeout=120).status_code
+            except requests.exceptions.RequestException:
+                status = 0
+            local[name].append((status, time.perf_counter() - start))
+        with lock:
+            for name, samples in local.items():
+                results[name].extend(samples)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+def summarize(results: Dict[str, List[Tuple[int, float]]], elapsed: float) -> Dict[str, Dict]:
+    report = {}
+    everything = []
+    for name in sorted(results):
+        samples = results[name]
+        everything.extend(samples)
+        report[name] = _summary(samples, elapsed)
+    report["all"] = _summary(everything, elapsed)
+    return report
+
+def _summary(samples: List[Tuple[int, float]], elapsed: float) -> Dict:
+    latencies = sorted(latency for _, latency in samples)
+    statuses = defaultdict(int)
+    for status, _ in samples:
+        statuses[str(status)] += 1
+    # 503s are load shedding by admission control, reported apart from real failures
+    shed = statuses.get("503", 0)
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3"))) - shed
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "errors": errors,
+        "shed": shed,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "statuses": dict(statuses)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="multiply every stub latency (e.g. 0.1 for a quick run)")
+    for kind in ("agent", "summ", "doc", "news", "maps"):
+        parser.add_argument(f"--{kind}-latency", default=DEFAULT_LATENCIES[kind],
+                            help=f"latency spec for the {kind} stub (default {DEFAULT_LATENCIES[kind]})")
+    parser.add_argument("--questions", type=int, default=60, help="distinct questions in the traffic pool")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf skew of question popularity")
+    parser.add_argument("--bypass-rate", type=float, default=0.0, help="fraction of requests sending X-Cache-Bypass")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    install_stub_aixplain({kind: getattr(args, f"{kind}_latency") for kind in ("agent", "summ", "doc", "news")},
+                          scale=args.latency_scale, seed=args.seed)
+    maps = start_stub_server(Latency(args.maps_latency, args.latency_scale, args.seed), seed=args.seed)
+    os.environ["GOOGLE_MAPS_BASE_URL"] = maps.base_url
+    os.environ.setdefault("GOOGLE_MAPS_API_KEY", "stub")
+    os.environ.setdefault("WARM_MODELS_ON_STARTUP", "true")
+
+    backend, server, base_url = start_backend()
+    generators = build_requests(question_pool(args.questions, random.Random(args.seed)), args.skew)
+    try:
+        results, elapsed = run_load(base_url, generators, parse_mix(args.mix), args.duration,
+                                    args.concurrency, args.seed, args.bypass_rate)
+    finally:
+        server.shutdown()
+    report = summarize(results, elapsed)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"duration {elapsed:.1f} s, concurrency {args.concurrency}, latency scale {args.latency_scale}")
+    print(f"{'endpoint':<22}{'requests':>9}{'rps':>9}{'errors':>8}{'shed':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in report.items():
+        print(f"{name:<22}{row['requests']:>9}{row['throughput_rps']:>9.1f}{row['errors']:>8}{row['shed']:>7}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+    print(f"maps stub requests: {maps.requests}")
+    print(f"response cache hit rate: {backend.response_cache.stats()['hit_rate']:.2f}, "
+          f"semantic cache hit rate: {backend.semantic_cache.stats().get('hit_rate', 0):.2f}")
+
+if __name__ == "__main__":
+    main()
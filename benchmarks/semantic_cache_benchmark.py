@@ -0,0 +1,103 @@
+# Semantic Cache Benchmark
+# Measures similarity lookup latency and recall with 100k stored questions
+#
+# Usage: python benchmarks/semantic_cache_benchmark.py [--entries 100000] [--queries 2000]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semantic_cache import SemanticCache
+
+DISEASES = ["dengue", "malaria", "typhoid", "cholera", "tuberculosis", "diabetes", "hypertension",
+            "asthma", "jaundice", "measles", "chickenpox", "anemia", "covid-19", "influenza",
+            "diarrhoea", "pneumonia", "leprosy", "filariasis", "rabies", "scabies"]
+TEMPLATES = ["what are the symptoms of {d} in {p}", "how to prevent {d} in {p}",
+             "home remedies for {d} for {p}", "is {d} dangerous for {p}",
+             "which doctor treats {d} near {p}", "diet advice for {d} patients in {p}",
+             "can {d} spread from {p}", "medicine for {d} in {p} area"]
+PLACES = ["village", "children", "pregnant women", "elderly", "farmers", "school", "monsoon",
+          "summer", "winter", "district hospital", "anganwadi", "infants", "workers", "tribal areas"]
+
+def synthetic_questions(count: int, rng: random.Random):
+    questions = set()
+    while len(questions) < count:
+        template = rng.choice(TEMPLATES)
+        question = template.format(d=rng.choice(DISEASES), p=rng.choice(PLACES))
+        questions.add(f"{question} {rng.choice(PLACES)} {rng.randrange(10**6):x}")
+    return list(questions)
+
+def percentile(samples, pct):
+    return float(np.percentile(np.asarray(samples), pct))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    cache = SemanticCache(max_entries_per_language=args.entries)
+    questions = synthetic_questions(args.entries, rng)
+
+    start = time.perf_counter()
+    for question in questions:
+        cache.store(question, "en", {"response": question})
+    build_seconds = time.perf_counter() - start
+
+    index = cache._indexes["en"]
+    probes = rng.sample(questions, args.queries)
+    # Near-duplicates: casing, punctuation and a dropped character
+    perturbed = []
+    for question in probes:
+        cut = rng.randrange(len(question))
+        perturbed.append((question[:cut] + question[cut + 1:]).upper() + "?")
+    vectors = [cache.vectorizer.vectorize(q) for q in perturbed]
+
+    search_times = []
+    agree = 0
+    rows = index.matrix[:index.size]
+    for vector in vectors:
+        t0 = time.perf_counter()
+        row, score = index.search(vector)
+        search_times.append(time.perf_counter() - t0)
+        if row == int(np.argmax(rows @ vector)):
+            agree += 1
+
+    lookup_times = []
+    hits = 0
+    for question in perturbed:
+        t0 = time.perf_counter()
+        result = cache.lookup(question, "en")
+        lookup_times.append(time.perf_counter() - t0)
+        hits += result is not None
+
+    brute_times = []
+    for vector in vectors[:200]:
+        t0 = time.perf_counter()
+        int(np.argmax(rows @ vector))
+        brute_times.append(time.perf_counter() - t0)
+
+    print(f"stored questions:        {index.size}")
+    print(f"build time:              {build_seconds:.2f} s")
+    print(f"IVF cells:               {len(index.cells)} (nprobe={index.nprobe})")
+    print(f"similarity search (IVF): p50={percentile(search_times, 50)*1e3:.3f} ms  "
+          f"p99={percentile(search_times, 99)*1e3:.3f} ms")
+    print(f"brute-force search:      p50={percentile(brute_times, 50)*1e3:.3f} ms  "
+          f"p99={percentile(brute_times, 99)*1e3:.3f} ms")
+    print(f"lookup incl. vectorize:  p50={percentile(lookup_times, 50)*1e3:.3f} ms  "
+          f"p99={percentile(lookup_times, 99)*1e3:.3f} ms")
+    print(f"IVF agrees with exact:   {agree / len(vectors):.1%}")
+    print(f"near-duplicate hit rate: {hits / len(perturbed):.1%} (threshold={cache.threshold})")
+    p99 = percentile(search_times, 99)
+    print("sub-millisecond at p99:  " + ("yes" if p99 < 1e-3 else "NO"))
+    return 0 if p99 < 1e-3 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
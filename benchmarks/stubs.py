@@ -0,0 +1,260 @@
+# Benchmark Stubs
+# Local stand-ins for the aiXplain models and the Google Maps APIs, with configurable latency
+#
+# install_stub_aixplain() must run before backend is imported; start_stub_server()
+# serves Places/Directions (GOOGLE_MAPS_BASE_URL) and Co-WIN findByPin (COWIN_BASE_URL)
+# on a local port.
+
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+class Latency:
+    """
+    Latency distribution parsed from a spec string (all values in seconds)
+
+    fixed:0.05               always 50 ms
+    uniform:0.2,1.5          uniform between the bounds
+    lognormal:0.8,0.5        median 0.8 s, sigma 0.5 (long right tail)
+    lognormal:0.8,0.5,0.01   ... additionally with a 1% chance of a 10x stall
+    """
+
+    def __init__(self, spec: str = "fixed:0", scale: float = 1.0, seed: Optional[int] = None):
+        self.spec = spec
+        self.scale = scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.args[0] if self.args else 0.0
+            elif self.kind == "uniform":
+                value = self._random.uniform(self.args[0], self.args[1])
+            else:
+                median, sigma = self.args[0], self.args[1]
+                value = median * math.exp(self._random.gauss(0, sigma))
+                if len(self.args) > 2 and self._random.random() < self.args[2]:
+                    value *= 10
+        return value * self.scale
+
+    def sleep(self) -> None:
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+
+# Default latencies modelled on production aiXplain and Maps response times
+DEFAULT_LATENCIES = {
+    "agent": "lognormal:1.2,0.45,0.01",
+    "summ": "lognormal:0.6,0.35",
+    "doc": "lognormal:1.5,0.4",
+    "news": "lognormal:2.5,0.3",
+    "maps": "lognormal:0.12,0.3"
+}
+
+def _mojibake(text: str) -> str:
+    # The SDK hands back UTF-8 bytes decoded as latin-1; backend reverses this with encode('latin1')
+    return text.encode("utf-8").decode("latin1")
+
+def agent_payload(prompt) -> str:
+    return (
+        f"**Overview**\n\nHere is guidance for: {str(prompt)[:120]}\n\n"
+        "- **Rest** and drink plenty of fluids\n"
+        "- Take paracetamol for fever as advised by a doctor\n"
+        "* Visit the nearest health centre if symptoms last more than 3 days\n\n"
+        "## When to seek help\n\nDifficulty breathing, persistent vomiting or bleeding needs urgent care."
+    )
+
+def summary_payload(payload) -> str:
+    return _mojibake("**Summary** - rest, fluids and see a doctor if it persists. सावधानी रखें।")
+
+def doctors_payload(payload) -> str:
+    condition = payload.get("condition", "") if isinstance(payload, dict) else ""
+    location = payload.get("location", "") if isinstance(payload, dict) else ""
+    return _mojibake(
+        f"1. Dr. Asha Verma - {condition} specialist, City Hospital, {location} - ₹500, 12 years\n"
+        f"2. Dr. Ravi Iyer - General physician, District Hospital, {location} - ₹300, 8 years"
+    )
+
+def news_payload(payload) -> str:
+    # Mirrors the repr-style string the news model returns, which clean_news_response parses
+    body = (
+        "https://example.org/health/dengue-advisory\\nSource: Example Health\\nDate: 2026-10-17\\n\\n"
+        "https://example.org/health/heatwave\\nSource: Example News\\nDate: 2026-10-16\\n\\n"
+        "Dengue cases are rising after the monsoon; remove standing water.\\n\\n\\n\\nStay hydrated."
+    )
+    return f"ModelResponse(status='SUCCESS', completed=True, data='{body}')"
+
+class StubResponse(dict):
+    """Dict-like model response that also exposes .data like the SDK's ModelResponse"""
+
+    @property
+    def data(self):
+        return self["data"]
+
+class StubModel:
+    def __init__(self, model_id: str, kind: str, latency: Latency):
+        self.id = model_id
+        self.kind = kind
+        self.latency = latency
+        self.calls = 0
+
+    def run(self, payload):
+        self.calls += 1
+        self.latency.sleep()
+        if self.kind == "agent":
+            return StubResponse(data={"output": agent_payload(payload)})
+        if self.kind == "summ":
+            return StubResponse(data=summary_payload(payload))
+        if self.kind == "doc":
+            return StubResponse(data=doctors_payload(payload))
+        if self.kind == "news":
+            return news_payload(payload)
+        raise ValueError(f"Unknown stub model kind: {self.kind}")
+
+MODEL_ENV = {"doc": "DOC_MODEL_ID", "summ": "SUMM_MODEL_ID", "news": "NEWS_MODEL_ID", "agent": "AGENT_MODEL_ID"}
+
+def install_stub_aixplain(latencies: Optional[Dict[str, str]] = None, scale: float = 1.0,
+                          seed: int = 0) -> Dict[str, StubModel]:
+    """Register a fake aixplain.factories.ModelFactory in sys.modules and point the model ids at it"""
+    specs = dict(DEFAULT_LATENCIES, **(latencies or {}))
+    models = {}
+    for offset, (kind, env) in enumerate(MODEL_ENV.items()):
+        model_id = os.environ.setdefault(env, f"stub-{kind}")
+        models[model_id] = StubModel(model_id, kind, Latency(specs[kind], scale, seed + offset))
+    os.environ.setdefault("TEAM_API_KEY", "stub")
+
+    class ModelFactory:
+        @staticmethod
+        def get(model_id):
+            if model_id not in models:
+                raise ValueError(f"Unknown model id: {model_id}")
+            return models[model_id]
+
+    package = types.ModuleType("aixplain")
+    factories = types.ModuleType("aixplain.factories")
+    factories.ModelFactory = ModelFactory
+    package.factories = factories
+    sys.modules["aixplain"] = package
+    sys.modules["aixplain.factories"] = factories
+    return models
+
+def places_response(query: Dict, rng: random.Random) -> Dict:
+    lat, lon = (float(v) for v in query["location"][0].split(","))
+    return {
+        "status": "OK",
+        "results": [
+            {
+                "name": f"Primary Health Centre {i + 1}",
+                "vicinity": f"Ward {i + 1}, Block Road",
+                "geometry": {"location": {"lat": lat + rng.uniform(-0.03, 0.03),
+                                          "lng": lon + rng.uniform(-0.03, 0.03)}}
+            }
+            for i in range(rng.randint(3, 8))
+        ]
+    }
+
+def directions_response(query: Dict, rng: random.Random) -> Dict:
+    distance = rng.randint(800, 15000)
+    return {
+        "status": "OK",
+        "routes": [{
+            "overview_polyline": {"points": "a~l~Fjk~uOwHJy@P"},
+            "legs": [{"distance": {"value": distance}, "duration": {"value": int(distance / rng.uniform(6, 12))}}]
+        }]
+    }
+
+def cowin_sessions_response(query: Dict, rng: random.Random) -> Dict:
+    pincode, date = query["pincode"][0], query["date"][0]
+    return {
+        "sessions": [
+            {
+                "center_id": int(pincode) * 10 + i,
+                "name": f"PHC {pincode} Site {i + 1}",
+                "address": f"Ward {i + 1}",
+                "pincode": int(pincode),
+                "date": date,
+                "fee_type": "Free",
+                "available_capacity": rng.randint(0, 200),
+                "min_age_limit": rng.choice([0, 12, 18]),
+                "vaccine": rng.choice(["COVISHIELD", "COVAXIN", "BCG", "MR"]),
+                "slots": ["09:00AM-11:00AM", "11:00AM-01:00PM", "02:00PM-05:00PM"]
+            }
+            for i in range(rng.randint(0, 6))
+        ]
+    }
+
+def flaky(handler: Callable[[Dict, random.Random], Tuple[int, Dict]], error_rate: float,
+          status: int = 429) -> Callable[[Dict, random.Random], Tuple[int, Dict]]:
+    """Wrap a route handler so a fraction of calls fail with `status` (429 or 5xx)"""
+    def wrapped(query, rng):
+        if rng.random() < error_rate:
+            return status, {"error": "stub failure"}
+        return handler(query, rng)
+    return wrapped
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering GET routes registered in `routes` (path suffix -> handler)"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], latency: Latency, seed: int = 0):
+        super().__init__(address, _StubHandler)
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+        self.routes: Dict[str, Callable[[Dict, random.Random], Tuple[int, Dict]]] = {
+            "/place/nearbysearch/json": lambda q, rng: (200, places_response(q, rng)),
+            "/directions/json": lambda q, rng: (200, directions_response(q, rng)),
+            "/v2/appointment/sessions/public/findByPin": lambda q, rng: (200, cowin_sessions_response(q, rng))
+        }
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        server: StubServer = self.server
+        server.requests += 1
+        handler = next((h for suffix, h in server.routes.items() if parsed.path.endswith(suffix)), None)
+        server.latency.sleep()
+        if handler is None:
+            status, body = 404, {"error": "not found"}
+        else:
+            with server.rng_lock:
+                status, body = handler(parse_qs(parsed.query), server.rng)
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+def start_stub_server(latency: Optional[Latency] = None, host: str = "127.0.0.1", port: int = 0,
+                      seed: int = 0) -> StubServer:
+    """Start the stub server on a background thread; port 0 picks a free port"""
+    server = StubServer((host, port), latency or Latency(DEFAULT_LATENCIES["maps"]), seed)
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server
@@ -0,0 +1,81 @@
+# Surveillance Store Benchmark
+# Times one outbreak-detection pass over many districts, from per-day dicts and from SurveillanceStore windows
+#
+# Usage: python benchmarks/surveillance_store_benchmark.py [--regions 3000] [--days 180]
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from real_time_alerts import OutbreakDetectionEngine
+from surveillance_store import SurveillanceStore
+
+DISEASES = ["dengue", "malaria", "covid-19", "typhoid", "cholera"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--regions", type=int, default=3000)
+    parser.add_argument("--days", type=int, default=180)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(5)
+    counts = rng.poisson(3, size=(args.regions, len(DISEASES), args.days)).astype(np.int32)
+    # A few districts with a two-week surge
+    counts[rng.choice(args.regions, args.regions // 100, replace=False), 0, -7:] += 20
+    regions = [f"District {i}" for i in range(args.regions)]
+    start = date.today() - timedelta(days=args.days - 1)
+    days = [(start + timedelta(days=k)).strftime("%Y-%m-%d") for k in range(args.days)]
+    engine = OutbreakDetectionEngine()
+
+    # Previous pattern: per-day dicts rebuilt for every region and disease, every cycle
+    started = time.perf_counter()
+    expected = set()
+    for r, region in enumerate(regions):
+        for d, disease in enumerate(DISEASES):
+            case_data = [{"date": days[k], "cases": int(counts[r, d, k])} for k in range(args.days - 14, args.days)]
+            if engine.analyze_disease_patterns(disease, region, case_data)["outbreak_risk"] in ("high", "critical"):
+                expected.add((region, disease))
+    dicts = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SurveillanceStore(os.path.join(directory, "surveillance.npy"))
+        started = time.perf_counter()
+        for k, day in enumerate(days):
+            store.ingest((regions[r], disease, day, counts[r, d, k])
+                         for r in range(args.regions) for d, disease in enumerate(DISEASES))
+        ingest = (time.perf_counter() - started) / args.days
+
+        started = time.perf_counter()
+        found = set()
+        window = store.window(14)
+        weekly = window[:, :, -7:].sum(axis=2)
+        for d, disease in enumerate(store.disease_names):
+            threshold = engine.get_thresholds(disease)["cases_per_week"]
+            for r in np.flatnonzero(weekly[:, d] >= threshold):
+                if engine.analyze_case_counts(disease, regions[r], window[r, d])["outbreak_risk"] in ("high", "critical"):
+                    found.add((store.region_names[r], disease))
+        stored = time.perf_counter() - started
+
+        started = time.perf_counter()
+        reopened = SurveillanceStore(store.path)
+        season = reopened.window(90).sum(axis=2)
+        reopen = time.perf_counter() - started
+        assert np.array_equal(season, counts[:, :, -90:].sum(axis=2))
+
+        print(f"series:                  {args.regions:,} regions x {len(DISEASES)} diseases x {args.days} days "
+              f"({store.stats()['bytes'] / 2 ** 20:.1f} MiB)")
+        print(f"daily ingest:            {ingest * 1000:.1f} ms per day of reports")
+        print(f"detection, per-day dicts:{dicts * 1000:9.1f} ms")
+        print(f"detection, store window: {stored * 1000:9.1f} ms ({dicts / stored:.0f}x)")
+        print(f"reopen + 90-day totals:  {reopen * 1000:9.1f} ms")
+        print(f"alerts:                  {len(found)} ({'same' if found == expected else 'DIFFERENT'} as per-day dicts)")
+
+if __name__ == "__main__":
+    main()
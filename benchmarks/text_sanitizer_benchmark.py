@@ -0,0 +1,165 @@
+# Text Sanitizer Benchmark
+# Checks text_sanitizer against the previous backend helpers (golden outputs) and times both
+#
+# Usage: python benchmarks/text_sanitizer_benchmark.py [--repeat 200] [--fuzz 20000]
+
+import argparse
+import ast
+import os
+import random
+import re
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_sanitizer import StreamingSanitizer, clean_news_response, repair_mojibake, sanitize
+
+# Previous backend.py implementations, kept verbatim as the reference
+def remove_markdown(text):
+    text = re.sub(r'\*\*.*?\*\*', '', text)
+    text = re.sub(r'[\*\-] ', '', text)
+    text = re.sub(r'[#\*_\[\]()]', '', text)
+    text = re.sub(r'\n+', '\n', text).strip()
+    return text
+
+def format_text(text):
+    sections = text.split("\n")
+    return "\n\n".join(section.strip() for section in sections if section.strip())
+
+def clean_and_format_response(raw_response):
+    if "data=" in raw_response:
+        raw_response = raw_response.split("data=")[-1].strip()
+    raw_response = raw_response.strip("()'")
+    try:
+        raw_response = ast.literal_eval(f"'''{raw_response}'''")
+    except Exception:
+        pass
+    match = re.search(r"https?://\S+\nSource:.*?\nDate: .*?\n\n", raw_response, re.DOTALL)
+    if match:
+        articles_part = raw_response[:match.end()].strip()
+        summary_part = raw_response[match.end():].strip()
+    else:
+        return raw_response.strip()
+    formatted_articles = re.sub(r"\n{3,}", "\n\n", articles_part)
+    formatted_summary = re.sub(r"\n{3,}", "\n\n", summary_part)
+    return f"{formatted_articles}\n\n{'-'*100}\n\n{formatted_summary}"
+
+# Golden inputs: shapes the agent, summarizer and news model actually return
+GOLDEN_MARKDOWN = [
+    "**Dengue** is a viral infection.\n\n- **Fever**: high fever\n- Headache\n* Rash\n\n## Prevention\n"
+    "Use [mosquito nets](https://example.org) and remove stagnant water (coolers, tyres).",
+    "### डेंगू के लक्षण\n\n- तेज़ बुखार\n- **सिरदर्द** और आँखों के पीछे दर्द\n\n_डॉक्टर से मिलें_",
+    "-**Note** take ORS\n-**a****b** c\n-**a**- x\n- - nested\n***x** y\n** b\n*   spaced\n",
+    "plain text without markdown",
+    "   \n\n  \t\n",
+    "",
+    "1. Drink water\n2. Rest (at least 8 hours)\n\n> quoted_text with under_scores\r\n**unclosed bold\n",
+    "মাথাব্যথা হলে **বিশ্রাম** নিন\n* প্রচুর জল পান করুন\n line separator ",
+]
+GOLDEN_NEWS = [
+    "ModelResponse(status='SUCCESS', completed=True, data='https://example.org/a\\nSource: X\\nDate: today"
+    "\\n\\nSummary text\\n\\n\\n\\nMore')",
+    "data='no articles here, just \\u0921\\u0947\\u0902\\u0917\\u0942 text'",
+    "data='bad escape \\x4 keeps raw'",
+    "data='line one\\\\nline two \\N{BULLET} \\'quoted\\' \\q'",
+    "(plain 'text')",
+    "data='has ''' triple quotes'",
+    "data='https://a.org/x\\r\\nSource: S\\nDate: D\\n\\nbody'",
+]
+
+FUZZ_ALPHABET = ["*", "**", "-", " ", "\n", "#", "_", "[", "]", "(", ")", "a", "b", "डें", "\\", "'", "\r",
+                 "\\n", "\\x", "\\u0905", "\t", "- ", "* ", "data=", "\\N{BULLET}", "\\7", "http://x.org/a\nSource: s\nDate: d\n\n"]
+
+def long_response(rng: random.Random, paragraphs: int) -> str:
+    words = ["fever", "बुखार", "জ্বর", "காய்ச்சல்", "rest", "**drink water**", "ORS", "(doctor)", "_mild_",
+             "[link](x)", "dengue", "डेंगू", "paracetamol", "#tag"]
+    lines = []
+    for i in range(paragraphs):
+        prefix = rng.choice(["", "- ", "* ", "## ", "**Step {}** ".format(i)])
+        lines.append(prefix + " ".join(rng.choice(words) for _ in range(rng.randint(8, 30))))
+        if rng.random() < 0.3:
+            lines.append("")
+    return "\n".join(lines)
+
+def check_golden(fuzz: int, seed: int) -> int:
+    failures = 0
+    rng = random.Random(seed)
+    samples = GOLDEN_MARKDOWN + ["".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, 40)))
+                                 for _ in range(fuzz)]
+    for text in samples:
+        expected = format_text(remove_markdown(text))
+        if sanitize(text) != expected:
+            failures += 1
+            print(f"sanitize mismatch: {text!r}")
+        # Streamed in random chunk sizes
+        chunks, i = [], 0
+        while i < len(text):
+            step = rng.randint(1, 7)
+            chunks.append(text[i:i + step])
+            i += step
+        streamer = StreamingSanitizer()
+        if "".join(streamer.iter_sanitized(chunks)) != expected:
+            failures += 1
+            print(f"streaming mismatch: {text!r}")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        news_samples = GOLDEN_NEWS + ["data='" + "".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, 30)))
+                                      for _ in range(fuzz)]
+        for raw in news_samples:
+            if clean_news_response(raw) != clean_and_format_response(raw):
+                failures += 1
+                print(f"news mismatch: {raw!r}")
+
+    for text in ("plain", "सावधानी रखें", "₹500 fee"):
+        garbled = text.encode("utf-8").decode("latin1")
+        if repair_mojibake(garbled) != garbled.encode("latin1").decode("utf-8"):
+            failures += 1
+            print(f"mojibake mismatch: {garbled!r}")
+    # Text that is already proper UTF-8 used to raise; it now passes through
+    if repair_mojibake("सावधानी") != "सावधानी":
+        failures += 1
+    return failures
+
+def timed(fn, inputs, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in inputs:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(inputs))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--fuzz", type=int, default=20_000)
+    parser.add_argument("--paragraphs", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = check_golden(args.fuzz, args.seed)
+    print(f"golden/fuzz mismatches:   {failures}")
+
+    rng = random.Random(args.seed)
+    responses = [long_response(rng, args.paragraphs) for _ in range(20)]
+    summaries = [r.encode("utf-8").decode("latin1") for r in responses]
+    news = [f"ModelResponse(status='SUCCESS', completed=True, data='{r.replace(chr(10), chr(92) + 'n')}')"
+            for r in responses]
+    chars = sum(len(r) for r in responses) / len(responses)
+
+    old_answer = timed(lambda t: format_text(remove_markdown(t)), responses, args.repeat)
+    new_answer = timed(sanitize, responses, args.repeat)
+    old_summary = timed(lambda t: format_text(remove_markdown(t.encode("latin1").decode("utf-8"))), summaries, args.repeat)
+    new_summary = timed(lambda t: sanitize(repair_mojibake(t)), summaries, args.repeat)
+    old_news = timed(clean_and_format_response, news, args.repeat)
+    new_news = timed(clean_news_response, news, args.repeat)
+
+    print(f"average response length:  {chars:,.0f} chars")
+    print(f"answer   old {old_answer * 1e6:8.1f} us   new {new_answer * 1e6:8.1f} us   ({old_answer / new_answer:.1f}x)")
+    print(f"summary  old {old_summary * 1e6:8.1f} us   new {new_summary * 1e6:8.1f} us   ({old_summary / new_summary:.1f}x)")
+    print(f"news     old {old_news * 1e6:8.1f} us   new {new_news * 1e6:8.1f} us   ({old_news / new_news:.1f}x)")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
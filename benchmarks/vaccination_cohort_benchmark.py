@@ -0,0 +1,67 @@
+# Vaccination Cohort Benchmark
+# Times the vectorized cohort due-date calculator against per-child schedules
+#
+# Usage: python benchmarks/vaccination_cohort_benchmark.py [--children 1000000]
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vaccination_schedule import STATUS_NAMES, vaccination_engine
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--children", type=int, default=1_000_000)
+    parser.add_argument("--loop-sample", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    as_of = date(2026, 10, 17)
+    today = np.datetime64(as_of, "D")
+    births = today - rng.integers(0, 7 * 365, args.children).astype("timedelta64[D]")
+    n_doses = len(vaccination_engine.child_vaccines)
+    # Children have received most of the doses already due for their age
+    due_age = (today - births).astype(np.int32)[:, None] >= vaccination_engine._offsets
+    given = due_age & (rng.random((args.children, n_doses)) < 0.85)
+
+    start = time.perf_counter()
+    result = vaccination_engine.cohort_due_dates(births, given, as_of=as_of)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vaccination_engine.cohort_due_dates(births, given, as_of=as_of, include_due_dates=False)
+    status_only = time.perf_counter() - start
+
+    sample = min(args.loop_sample, args.children)
+    vaccines = vaccination_engine.child_vaccines
+    given_lists = [[vaccines[j] for j in np.flatnonzero(given[i])] for i in range(sample)]
+    start = time.perf_counter()
+    loop_results = [
+        vaccination_engine.child_schedule(births[i].astype(date), given_lists[i], as_of)
+        for i in range(sample)
+    ]
+    loop_per_child = (time.perf_counter() - start) / sample
+
+    mismatches = sum(
+        [STATUS_NAMES[code] for code in result["status"][i]] != [d["status"] for d in loop_results[i]["doses"]]
+        for i in range(sample)
+    )
+
+    print(f"children:                       {args.children:,} x {n_doses} doses")
+    print(f"vectorized (with due dates):    {vectorized:.3f} s")
+    print(f"vectorized (status only):       {status_only:.3f} s")
+    print(f"per-child loop (extrapolated):  {loop_per_child * args.children:.1f} s "
+          f"({loop_per_child * 1e6:.0f} us/child over {sample:,})")
+    print(f"speed-up:                       {loop_per_child * args.children / vectorized:.0f}x")
+    print(f"children needing a reminder:    {int(result['needs_reminder'].sum()):,}")
+    print(f"overdue doses:                  {int(result['overdue_count'].sum()):,}")
+    print(f"status mismatches vs loop:      {mismatches}/{sample:,}")
+
+if __name__ == "__main__":
+    main()
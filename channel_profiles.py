@@ -0,0 +1,119 @@
+# Channel Response Profiles
+# Length and format budgets per chatbot channel, with a local extractive summarizer for oversized answers
+
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional
+
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?।])\s+|\n+")
+_WORD_RE = re.compile(r"\w+")
+
+# Sentences that tell the user when to get help are kept ahead of everything else
+SAFETY_TERMS = frozenset([
+    "doctor", "hospital", "emergency", "urgent", "immediately", "centre", "center", "108",
+    "डॉक्टर", "अस्पताल", "तुरंत", "आपातकाल", "स्वास्थ्य"
+])
+SAFETY_BONUS = 2.0
+LEAD_BONUS = 1.0
+# Sentences opening with these refer back to the previous one and are only kept together with it
+CONTINUATION_WORDS = frozenset(["these", "this", "they", "it", "such", "those", "also"])
+
+SUMMARY_STOPWORDS = frozenset([
+    "a", "an", "the", "is", "are", "be", "of", "to", "in", "on", "for", "and", "or", "it", "this", "that",
+    "with", "as", "at", "by", "if", "you", "your", "can", "may", "will", "do", "not", "from",
+    "है", "हैं", "का", "की", "के", "को", "से", "में", "और", "या", "तो", "भी"
+])
+
+@dataclass(frozen=True)
+class ChannelProfile:
+    name: str
+    max_chars: Optional[int]            # budget for GSM-7 (ASCII) text; None means unlimited
+    max_chars_unicode: Optional[int]    # budget for text outside GSM-7, where SMS segments hold 70 characters
+    prompt_instruction: str
+    paragraph_separator: str = "\n\n"
+
+    def budget(self, text: str) -> Optional[int]:
+        return self.max_chars if text.isascii() else self.max_chars_unicode
+
+WEB_PROFILE = ChannelProfile("web", None, None, "")
+
+CHANNEL_PROFILES = {
+    "web": WEB_PROFILE,
+    "whatsapp": ChannelProfile(
+        "whatsapp",
+        int(os.getenv("WHATSAPP_MAX_CHARS", "1000")),
+        int(os.getenv("WHATSAPP_MAX_CHARS", "1000")),
+        "Keep the answer under 120 words in short plain-text paragraphs, without markdown or tables."
+    ),
+    # Two SMSHandler parts of ASCII text, or three 67-character UCS-2 segments otherwise
+    "sms": ChannelProfile(
+        "sms",
+        int(os.getenv("SMS_MAX_CHARS", "300")),
+        int(os.getenv("SMS_MAX_CHARS_UNICODE", "200")),
+        "This is an SMS: answer in at most 3 short sentences (under 50 words), plain text only, "
+        "and say when to see a doctor.",
+        paragraph_separator="\n"
+    )
+}
+
+def get_profile(channel: str) -> ChannelProfile:
+    return CHANNEL_PROFILES.get((channel or "").lower(), WEB_PROFILE)
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_BREAK_RE.split(text) if s.strip()]
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1].rsplit(" ", 1)[0]
+    return (cut or text[:max_chars - 1]) + "…"
+
+def summarize_extractive(text: str, max_chars: int, separator: str = " ") -> str:
+    """
+    Shorten text to max_chars by keeping its most informative sentences
+
+    Sentences are scored by the average frequency of their content words in
+    the whole text, with bonuses for the opening sentence and for advice on
+    when to seek care; the best ones that fit are kept in their original order.
+    """
+    if len(text) <= max_chars:
+        return text
+    sentences = split_sentences(text)
+    if not sentences:
+        return _truncate(text, max_chars)
+    words_per_sentence = [[w for w in _WORD_RE.findall(s.lower()) if w not in SUMMARY_STOPWORDS] for s in sentences]
+    frequencies = Counter(w for words in words_per_sentence for w in words)
+    top = max(frequencies.values(), default=1)
+
+    scores = []
+    for position, words in enumerate(words_per_sentence):
+        score = sum(frequencies[w] for w in words) / (top * len(words)) if words else 0.0
+        if position == 0:
+            score += LEAD_BONUS
+        if any(w in SAFETY_TERMS for w in words):
+            score += SAFETY_BONUS
+        scores.append(score)
+
+    chosen, used = [], 0
+    for position in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        first_word = sentences[position].split(None, 1)[0].lower()
+        if position > 0 and first_word in CONTINUATION_WORDS and position - 1 not in chosen:
+            continue
+        cost = len(sentences[position]) + (len(separator) if chosen else 0)
+        if used + cost <= max_chars:
+            chosen.append(position)
+            used += cost
+    if not chosen:
+        return _truncate(sentences[0], max_chars)
+    return separator.join(sentences[i] for i in sorted(chosen))
+
+def fit_to_profile(text: str, profile: ChannelProfile) -> str:
+    """Lay out text for the channel and shorten it locally if it is over budget"""
+    if profile.paragraph_separator != "\n\n":
+        text = profile.paragraph_separator.join(p for p in text.split("\n\n") if p)
+    budget = profile.budget(text)
+    if budget is None or len(text) <= budget:
+        return text
+    return summarize_extractive(text, budget, separator="\n")
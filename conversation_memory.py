@@ -0,0 +1,210 @@
+# Conversation Memory for the Chatbot
+# Bounded, token-budgeted per-user history with extractive summaries and optional SQLite spill
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?।])\s+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) used for budgeting prompts"""
+    return (len(text) + 3) // 4
+
+def first_sentence(text: str, max_chars: int) -> str:
+    """First sentence of text, cut to max_chars at a word boundary"""
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    sentence = _SENTENCE_END_RE.split(text, 1)[0]
+    if len(sentence) <= max_chars:
+        return sentence
+    cut = sentence[:max_chars].rsplit(" ", 1)[0]
+    return (cut or sentence[:max_chars]) + "…"
+
+class _Conversation:
+    __slots__ = ("turns", "turn_tokens", "summary", "last_seen")
+
+    def __init__(self, turns=(), summary: Optional[List[str]] = None, last_seen: Optional[float] = None):
+        # Each turn is (user message, bot response, tokens)
+        self.turns: deque = deque(turns)
+        self.turn_tokens = sum(t[2] for t in self.turns)
+        self.summary: deque = deque(summary or ())
+        self.last_seen = last_seen if last_seen is not None else time.time()
+
+class ConversationMemory:
+    """
+    Recent chatbot turns per (user_id, channel), bounded in size and prompt cost
+
+    Turns are kept verbatim until they exceed max_turns or token_budget; the
+    oldest ones are then folded into a short extractive summary (first
+    sentence of question and answer) capped at summary_tokens. At most
+    max_conversations are held in memory, least recently used first out;
+    with spill_path set, evicted conversations go to SQLite and are reloaded
+    when the user writes again.
+    """
+
+    def __init__(self, max_conversations: int = 10000, max_turns: int = 6, token_budget: int = 600,
+                 summary_tokens: int = 150, idle_ttl: float = 86400, spill_path: Optional[str] = None):
+        self.max_conversations = max_conversations
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.idle_ttl = idle_ttl
+        self.spill_path = spill_path
+        self._conversations: "OrderedDict[Tuple[str, str], _Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.evictions = 0
+        self.expirations = 0
+        self.spilled = 0
+        self.restored = 0
+        self.summarized_turns = 0
+        if spill_path:
+            self._init_spill()
+
+    def _init_spill(self) -> None:
+        try:
+            self._db = sqlite3.connect(self.spill_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS conversations (
+                    user_id TEXT NOT NULL,
+                    channel TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    last_seen REAL NOT NULL,
+                    PRIMARY KEY (user_id, channel)
+                )
+            """)
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Conversation spill disabled, cannot open {self.spill_path}: {e}")
+            self._db = None
+
+    def _summarize(self, user_text: str, bot_text: str) -> str:
+        return f"User asked: {first_sentence(user_text, 120)} Answer: {first_sentence(bot_text, 160)}"
+
+    def _trim(self, conversation: _Conversation) -> None:
+        while conversation.turns and (len(conversation.turns) > self.max_turns
+                                      or conversation.turn_tokens > self.token_budget):
+            user_text, bot_text, tokens = conversation.turns.popleft()
+            conversation.turn_tokens -= tokens
+            conversation.summary.append(self._summarize(user_text, bot_text))
+            self.summarized_turns += 1
+        # Older summary lines drop out first
+        while len(conversation.summary) > 1 and sum(map(estimate_tokens, conversation.summary)) > self.summary_tokens:
+            conversation.summary.popleft()
+
+    def _spill(self, key: Tuple[str, str], conversation: _Conversation) -> None:
+        if self._db is None:
+            return
+        state = json.dumps({"turns": [list(t) for t in conversation.turns], "summary": list(conversation.summary)},
+                           ensure_ascii=False)
+        try:
+            self._db.execute("INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?)",
+                             (key[0], key[1], state, conversation.last_seen))
+            self._db.commit()
+            self.spilled += 1
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to spill conversation: {e}")
+
+    def _restore(self, key: Tuple[str, str]) -> Optional[_Conversation]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT state, last_seen FROM conversations WHERE user_id = ? AND channel = ?",
+                                   key).fetchone()
+            if row is None:
+                return None
+            self._db.execute("DELETE FROM conversations WHERE user_id = ? AND channel = ?", key)
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to restore conversation: {e}")
+            return None
+        state = json.loads(row[0])
+        self.restored += 1
+        return _Conversation((tuple(t) for t in state["turns"]), state["summary"], row[1])
+
+    def _get(self, key: Tuple[str, str]) -> Optional[_Conversation]:
+        conversation = self._conversations.get(key)
+        if conversation is None:
+            conversation = self._restore(key)
+            if conversation is None:
+                return None
+            self._conversations[key] = conversation
+            self._evict()
+        if time.time() - conversation.last_seen > self.idle_ttl:
+            del self._conversations[key]
+            self.expirations += 1
+            return None
+        self._conversations.move_to_end(key)
+        return conversation
+
+    def _evict(self) -> None:
+        while len(self._conversations) > self.max_conversations:
+            key, conversation = self._conversations.popitem(last=False)
+            self.evictions += 1
+            self._spill(key, conversation)
+
+    def context(self, user_id: str, channel: str) -> str:
+        """Prompt text for the conversation so far, or "" when there is none"""
+        if not user_id:
+            return ""
+        with self._lock:
+            conversation = self._get((user_id, channel))
+            if conversation is None:
+                return ""
+            lines = []
+            if conversation.summary:
+                lines.append("Earlier in this conversation: " + " ".join(conversation.summary))
+            for user_text, bot_text, _ in conversation.turns:
+                lines.append(f"User: {user_text}")
+                lines.append(f"Assistant: {bot_text}")
+            return "\n".join(lines)
+
+    def append(self, user_id: str, channel: str, user_text: str, bot_text: str) -> None:
+        """Record one exchange; older turns are summarized to stay within budget"""
+        if not user_id:
+            return
+        key = (user_id, channel)
+        with self._lock:
+            conversation = self._get(key)
+            if conversation is None:
+                conversation = self._conversations[key] = _Conversation()
+            conversation.turns.append((user_text, bot_text, estimate_tokens(user_text) + estimate_tokens(bot_text)))
+            conversation.turn_tokens += conversation.turns[-1][2]
+            conversation.last_seen = time.time()
+            self._trim(conversation)
+            self._evict()
+
+    def clear(self, user_id: str, channel: str) -> None:
+        with self._lock:
+            self._conversations.pop((user_id, channel), None)
+            if self._db is not None:
+                try:
+                    self._db.execute("DELETE FROM conversations WHERE user_id = ? AND channel = ?", (user_id, channel))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to clear conversation: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            turns = sum(len(c.turns) for c in self._conversations.values())
+            return {
+                "conversations": len(self._conversations),
+                "max_conversations": self.max_conversations,
+                "turns": turns,
+                "token_budget": self.token_budget,
+                "summarized_turns": self.summarized_turns,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "spill_enabled": self._db is not None,
+                "spilled": self.spilled,
+                "restored": self.restored
+            }
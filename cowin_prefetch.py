@@ -0,0 +1,208 @@
+# Co-WIN Bulk Prefetcher
+# Fetches vaccination sessions for many (pincode, date) pairs concurrently into the health data cache
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from government_health_integration import (
+    GovernmentHealthAPI, HealthDataCache, health_api, health_cache, index_vaccination_result, vaccination_cache_key,
+    vaccination_result
+)
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+MAX_REPORTED_FAILURES = 20
+
+class TokenBucket:
+    """
+    Blocking rate limiter shared by all prefetch workers
+
+    Allows `rate` requests per second on average with bursts of up to `burst`.
+    pause() holds every caller back, e.g. after the server answers 429.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+def date_range(start: datetime, days: int) -> List[str]:
+    """Co-WIN dates (DD-MM-YYYY) for `days` consecutive days from start"""
+    return [(start + timedelta(days=offset)).strftime("%d-%m-%Y") for offset in range(days)]
+
+class CowinPrefetcher:
+    """
+    Concurrent bulk fetch of Co-WIN findByPin sessions into the health data cache
+
+    Workers share one pooled session (the API's) and one token bucket. 429 and
+    5xx responses and connection errors are retried with jittered exponential
+    backoff; a 429 also pauses the whole bucket for Retry-After seconds.
+    Pairs that are already fresh in the cache are skipped.
+    """
+
+    def __init__(self, api: GovernmentHealthAPI, cache: HealthDataCache, rate: float = 0.33, burst: int = 10,
+                 concurrency: int = 8, max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 30.0):
+        self.api = api
+        self.cache = cache
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._stats_lock = threading.Lock()
+        self.last_report: Optional[Dict] = None
+        self.runs = 0
+        self.total_fetched = 0
+        self.total_failed = 0
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        try:
+            return float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            return None
+
+    def fetch(self, pincode: str, date: str, counters: Dict[str, int]) -> Optional[str]:
+        """Fetch and cache one pair; returns None on success or the final error"""
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count(counters, "retries")
+            waited = self.bucket.acquire()
+            self._count(counters, "requests")
+            if waited:
+                self._count(counters, "throttled")
+            try:
+                response = self.api.find_sessions_by_pin(pincode, date)
+            except requests.exceptions.RequestException as e:
+                error = f"API Error: {e}"
+                time.sleep(self._backoff(attempt))
+                continue
+            if response.status_code == 200:
+                try:
+                    data = response.json()
+                except ValueError as e:
+                    return f"Invalid response: {e}"
+                result = vaccination_result(data)
+                self.cache.set(vaccination_cache_key(pincode, date), result)
+                index_vaccination_result(pincode, date, result)
+                return None
+            error = f"HTTP {response.status_code}"
+            if response.status_code not in RETRYABLE_STATUSES:
+                return error
+            if response.status_code == 429:
+                self._count(counters, "rate_limited")
+                self.bucket.pause(self._retry_after(response) or self._backoff(attempt))
+            else:
+                time.sleep(self._backoff(attempt))
+        return error
+
+    def _count(self, counters: Dict[str, int], name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            counters[name] += amount
+
+    def prefetch(self, pincodes: Iterable[str], days: int = 7, start: Optional[datetime] = None,
+                 skip_fresh: bool = True) -> Dict:
+        """Fetch sessions for every pincode over `days` days from start (today) and report throughput"""
+        dates = date_range(start or datetime.now(), days)
+        pairs: List[Tuple[str, str]] = [(str(p), d) for p in dict.fromkeys(pincodes) for d in dates]
+        counters = {"requests": 0, "retries": 0, "rate_limited": 0, "throttled": 0}
+        skipped = 0
+        if skip_fresh:
+            todo = [pair for pair in pairs if not self.cache.is_fresh(vaccination_cache_key(*pair))]
+            skipped = len(pairs) - len(todo)
+        else:
+            todo = pairs
+
+        failures = []
+        started = time.perf_counter()
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(todo)),
+                                    thread_name_prefix="cowin-prefetch") as executor:
+                results = executor.map(lambda pair: (pair, self.fetch(pair[0], pair[1], counters)), todo)
+                failures = [(pair, error) for pair, error in results if error is not None]
+        elapsed = time.perf_counter() - started
+
+        fetched = len(todo) - len(failures)
+        report = {
+            "pincodes": len(pairs) // days if days else 0,
+            "days": days,
+            "pairs": len(pairs),
+            "skipped_fresh": skipped,
+            "fetched": fetched,
+            "failed": len(failures),
+            "elapsed_seconds": round(elapsed, 3),
+            "pairs_per_second": round(fetched / elapsed, 2) if elapsed else 0.0,
+            **counters,
+            "failures": [{"pincode": p, "date": d, "error": e} for (p, d), e in failures[:MAX_REPORTED_FAILURES]]
+        }
+        with self._stats_lock:
+            self.runs += 1
+            self.total_fetched += fetched
+            self.total_failed += len(failures)
+            self.last_report = report
+        logger.info(f"Co-WIN prefetch: {fetched}/{len(todo)} pairs in {elapsed:.1f}s "
+                    f"({report['pairs_per_second']}/s), {skipped} already fresh, {len(failures)} failed")
+        return report
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            last = self.last_report or {}
+            return {
+                "runs": self.runs,
+                "fetched": self.total_fetched,
+                "failed": self.total_failed,
+                "rate_per_second": self.bucket.rate,
+                "concurrency": self.concurrency,
+                "last_pairs_per_second": last.get("pairs_per_second", 0.0),
+                "last_elapsed_seconds": last.get("elapsed_seconds", 0.0)
+            }
+
+# Co-WIN's public API allows about 100 calls per 5 minutes per IP
+cowin_prefetcher = CowinPrefetcher(
+    health_api, health_cache,
+    rate=float(os.getenv("COWIN_RATE_PER_SECOND", "0.33")),
+    burst=int(os.getenv("COWIN_RATE_BURST", "10")),
+    concurrency=int(os.getenv("COWIN_PREFETCH_CONCURRENCY", "8")),
+    max_retries=int(os.getenv("COWIN_MAX_RETRIES", "3"))
+)
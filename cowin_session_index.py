@@ -0,0 +1,234 @@
+# Co-WIN Session Index
+# Columnar in-memory store of vaccination sessions with fast filtered queries
+
+import threading
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+COWIN_DATE_FORMAT = "%d-%m-%Y"
+
+def parse_cowin_date(value: str) -> int:
+    """DD-MM-YYYY to a proleptic Gregorian ordinal"""
+    return datetime.strptime(value, COWIN_DATE_FORMAT).toordinal()
+
+def format_cowin_date(ordinal: int) -> str:
+    return datetime.fromordinal(int(ordinal)).strftime(COWIN_DATE_FORMAT)
+
+class _Dictionary:
+    """Encodes repeated strings (vaccine names, fee types) as small integer codes"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> int:
+        return self.codes.get(value, -1)
+
+class CowinSessionIndex:
+    """
+    Vaccination sessions from Co-WIN findByPin responses, stored column by column
+
+    Each numeric attribute lives in its own NumPy array, and vaccine and fee
+    type are dictionary-encoded, so a filtered query is a handful of
+    vectorized comparisons over all sessions. upsert() replaces the sessions
+    of one (pincode, date) as fresh data arrives; replaced rows are masked
+    and reclaimed by compaction.
+    """
+
+    _COLUMNS = {
+        "pincode": np.int32, "date": np.int32, "vaccine": np.int16, "fee_type": np.int16,
+        "min_age": np.int16, "max_age": np.int16, "capacity": np.int32, "capacity_dose1": np.int32,
+        "capacity_dose2": np.int32, "center_id": np.int64, "live": np.bool_
+    }
+    _RECORD_COLUMNS = ("pincode", "date", "vaccine", "fee_type", "min_age", "max_age", "capacity",
+                       "capacity_dose1", "capacity_dose2", "center_id")
+
+    def __init__(self, initial_capacity: int = 1024, compact_ratio: float = 0.3):
+        self.compact_ratio = compact_ratio
+        self._columns = {name: np.zeros(initial_capacity, dtype=dtype) for name, dtype in self._COLUMNS.items()}
+        self._details: List[Optional[Dict]] = []
+        self._size = 0
+        self._dead = 0
+        self._groups: Dict[Tuple[int, int], List[int]] = {}
+        self._pincode_days: Dict[int, Set[int]] = {}
+        self._vaccines = _Dictionary()
+        self._fee_types = _Dictionary()
+        self._lock = threading.Lock()
+        self.upserts = 0
+        self.queries = 0
+        self.compactions = 0
+
+    def __len__(self) -> int:
+        return self._size - self._dead
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._columns["live"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _compact(self) -> None:
+        live = np.flatnonzero(self._columns["live"][:self._size])
+        for name, column in self._columns.items():
+            column[:len(live)] = column[live]
+        self._details = [self._details[i] for i in live]
+        remap = np.full(self._size, -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        self._groups = {key: [int(remap[r]) for r in rows] for key, rows in self._groups.items()}
+        self._size = len(live)
+        self._columns["live"][self._size:] = False
+        self._dead = 0
+        self.compactions += 1
+
+    def _normalize(self, session: Dict, key: Tuple[int, int]) -> Optional[Tuple]:
+        try:
+            return (
+                int(session.get("pincode") or key[0]),
+                parse_cowin_date(session["date"]) if session.get("date") else key[1],
+                str(session.get("vaccine", "")).upper(),
+                str(session.get("fee_type", "")).lower(),
+                int(session.get("min_age_limit") or 0),
+                int(session.get("max_age_limit") or 0),
+                int(session.get("available_capacity") or 0),
+                int(session.get("available_capacity_dose1") or 0),
+                int(session.get("available_capacity_dose2") or 0),
+                int(session.get("center_id") or 0)
+            )
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    def upsert(self, pincode: str, date: str, sessions: Iterable[Dict]) -> int:
+        """Replace the sessions stored for (pincode, date); returns how many were stored"""
+        key = (int(pincode), parse_cowin_date(date))
+        records = []
+        for session in sessions:
+            record = self._normalize(session, key)
+            if record is not None:
+                records.append((record, session))
+        with self._lock:
+            for row in self._groups.pop(key, ()):
+                self._columns["live"][row] = False
+                self._details[row] = None
+                self._dead += 1
+            self._grow(self._size + len(records))
+            start = self._size
+            if records:
+                values = list(zip(*(record for record, _ in records)))
+                values[2] = [self._vaccines.encode(v) for v in values[2]]
+                values[3] = [self._fee_types.encode(v) for v in values[3]]
+                for name, column_values in zip(self._RECORD_COLUMNS, values):
+                    self._columns[name][start:start + len(records)] = column_values
+                self._columns["live"][start:start + len(records)] = True
+                self._details.extend(session for _, session in records)
+                self._size += len(records)
+                self._groups[key] = list(range(start, self._size))
+                self._pincode_days.setdefault(key[0], set()).add(key[1])
+            elif key[0] in self._pincode_days:
+                self._pincode_days[key[0]].discard(key[1])
+            self.upserts += 1
+            if self._dead > self.compact_ratio * max(self._size, 1):
+                self._compact()
+            return len(records)
+
+    def prune(self, before_date: Optional[str] = None) -> int:
+        """Drop sessions dated before before_date (default today); returns how many"""
+        cutoff = parse_cowin_date(before_date) if before_date else datetime.now().toordinal()
+        with self._lock:
+            stale = [key for key in self._groups if key[1] < cutoff]
+            removed = 0
+            for key in stale:
+                self._pincode_days[key[0]].discard(key[1])
+                for row in self._groups.pop(key):
+                    self._columns["live"][row] = False
+                    self._details[row] = None
+                    removed += 1
+            self._dead += removed
+            if removed:
+                self._compact()
+            return removed
+
+    def query(self, vaccine: Optional[str] = None, age: Optional[int] = None, min_age_limit: Optional[int] = None,
+              fee_type: Optional[str] = None, min_capacity: int = 1, dose: Optional[int] = None,
+              pincodes: Optional[Iterable[str]] = None, date_from: Optional[str] = None, days: Optional[int] = None,
+              limit: int = 100) -> List[Dict]:
+        """
+        Sessions matching every given filter, soonest first and then by capacity
+
+        age keeps sessions the person is eligible for (min_age_limit <= age and
+        no max_age_limit below it); min_age_limit matches the limit exactly.
+        min_capacity applies to the dose-specific capacity when dose is 1 or 2.
+        date_from defaults to today; days limits the window.
+        """
+        start = parse_cowin_date(date_from) if date_from else datetime.now().toordinal()
+        end = start + days if days is not None else None
+        with self._lock:
+            self.queries += 1
+            columns = self._columns
+            if pincodes is not None:
+                # Pincode filters gather rows through the (pincode, date) groups instead of scanning
+                groups = []
+                for pincode in {int(p) for p in pincodes}:
+                    window = range(start, end) if end is not None else self._pincode_days.get(pincode, ())
+                    for day in window:
+                        rows = self._groups.get((pincode, day))
+                        if rows and day >= start:
+                            groups.append(rows)
+                rows = np.fromiter(chain.from_iterable(groups), dtype=np.int64)
+                column = lambda name: columns[name][rows]
+                mask = np.ones(len(rows), dtype=bool)
+            else:
+                rows = None
+                column = lambda name: columns[name][:self._size]
+                mask = columns["live"][:self._size].copy()
+            dates = column("date")
+            mask &= dates >= start
+            if end is not None:
+                mask &= dates < end
+            if vaccine is not None:
+                mask &= column("vaccine") == self._vaccines.lookup(vaccine.upper())
+            if fee_type is not None:
+                mask &= column("fee_type") == self._fee_types.lookup(fee_type.lower())
+            if age is not None:
+                max_age = column("max_age")
+                mask &= (column("min_age") <= age) & ((max_age == 0) | (max_age >= age))
+            if min_age_limit is not None:
+                mask &= column("min_age") == min_age_limit
+            capacity = column("capacity_dose1" if dose == 1 else "capacity_dose2" if dose == 2 else "capacity")
+            if min_capacity:
+                mask &= capacity >= min_capacity
+            selected = np.flatnonzero(mask)
+            rows = selected if rows is None else rows[selected]
+            dates, capacity = dates[selected], capacity[selected]
+            if len(rows) > 1:
+                rows = rows[np.lexsort((-capacity, dates))]
+            return [self._details[i] for i in rows[:limit]]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": self._size - self._dead,
+                "pincode_dates": len(self._groups),
+                "dead_rows": self._dead,
+                "bytes": int(sum(column.nbytes for column in self._columns.values())),
+                "vaccines": len(self._vaccines.values),
+                "upserts": self.upserts,
+                "queries": self.queries,
+                "compactions": self.compactions
+            }
+
+session_index = CowinSessionIndex()
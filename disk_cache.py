@@ -0,0 +1,165 @@
+# Disk Cache Tier
+# SQLite-backed second cache level shared by all worker processes on a node
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class DiskCacheTier:
+    """
+    Persistent key/value store for cached API responses
+
+    Values are compact JSON compressed with zlib; each row keeps the wall-clock
+    times until which it is fresh and until which it may still be served
+    stale. The database is opened lazily, one connection per thread, in WAL
+    mode so several gunicorn workers can read while one writes. Any SQLite
+    error is logged and treated as a miss: the disk tier never fails a request.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, prune_interval: int = 500,
+                 compression_level: int = 6):
+        self.path = path
+        self.max_entries = max_entries
+        self.prune_interval = prune_interval
+        self.compression_level = compression_level
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self.disabled = False
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.disabled:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        try:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("""
+                        CREATE TABLE IF NOT EXISTS cache (
+                            key TEXT PRIMARY KEY,
+                            value BLOB NOT NULL,
+                            fresh_until REAL NOT NULL,
+                            stale_until REAL NOT NULL
+                        )
+                    """)
+                    conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_stale_until ON cache (stale_until)")
+                    conn.commit()
+                    self._initialized = True
+        except sqlite3.Error as e:
+            logger.error(f"Disk cache disabled, cannot open {self.path}: {e}")
+            self.disabled = True
+            return None
+        self._local.conn = conn
+        return conn
+
+    def encode(self, data: Dict) -> bytes:
+        return zlib.compress(json.dumps(data, separators=(",", ":"), default=str).encode("utf-8"),
+                             self.compression_level)
+
+    @staticmethod
+    def decode(blob: bytes) -> Dict:
+        return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+    def get(self, key: str) -> Optional[Tuple[Dict, float, float]]:
+        """Return (data, fresh_until, stale_until) in wall-clock seconds, or None"""
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT value, fresh_until, stale_until FROM cache WHERE key = ? AND stale_until > ?",
+                               (key, time.time())).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            data = self.decode(row[0])
+        except (zlib.error, ValueError) as e:
+            self.errors += 1
+            logger.warning(f"Discarding unreadable disk cache entry {key}: {e}")
+            return None
+        self.hits += 1
+        return data, row[1], row[2]
+
+    def iter_prefix(self, prefix: str) -> Iterator[Tuple[str, Dict]]:
+        """(key, data) for every live entry whose key starts with prefix"""
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            rows = conn.execute("SELECT key, value FROM cache WHERE key >= ? AND key < ? AND stale_until > ?",
+                                (prefix, prefix + "\uffff", time.time())).fetchall()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Disk cache scan failed: {e}")
+            return
+        for key, blob in rows:
+            try:
+                yield key, self.decode(blob)
+            except (zlib.error, ValueError):
+                self.errors += 1
+
+    def set(self, key: str, data: Dict, fresh_until: float, stale_until: float) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                         (key, self.encode(data), fresh_until, stale_until))
+            conn.commit()
+            self.writes += 1
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.prune_interval:
+                self._writes_since_prune = 0
+                self.prune()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Disk cache write failed: {e}")
+
+    def prune(self) -> None:
+        """Drop entries past their stale window, then the oldest beyond max_entries"""
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute("DELETE FROM cache WHERE stale_until <= ?", (time.time(),))
+            conn.execute("""
+                DELETE FROM cache WHERE key IN (
+                    SELECT key FROM cache ORDER BY stale_until DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            conn.commit()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Disk cache prune failed: {e}")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "enabled": not self.disabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "errors": self.errors
+        }
@@ -0,0 +1,206 @@
+# Offline FAQ Answer Bank
+# Curated per-language answers for frequent chatbot questions, matched locally without a model call
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from response_cache import normalize_query
+from semantic_cache import numeric_signature
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Language names accepted by the API, mapped to the codes detect_language() returns
+LANGUAGE_ALIASES = {
+    "english": "en", "hindi": "hi", "bengali": "bn", "marathi": "mr", "tamil": "ta", "telugu": "te",
+    "gujarati": "gu", "kannada": "kn", "malayalam": "ml", "punjabi": "pa", "odia": "or", "urdu": "ur"
+}
+
+STOPWORDS = frozenset([
+    "a", "an", "the", "is", "are", "am", "was", "i", "my", "me", "we", "you", "it", "of", "to", "in", "on",
+    "for", "and", "or", "do", "does", "what", "how", "can", "should", "please", "tell", "about", "with",
+    "kya", "hai", "hain", "ka", "ki", "ke", "ko", "se", "mein", "mujhe", "kaise", "aur",
+    "क्या", "है", "हैं", "का", "की", "के", "को", "से", "में", "और", "मुझे", "कैसे"
+])
+
+def normalize_language(language: str) -> str:
+    language = (language or "").strip().lower()
+    return LANGUAGE_ALIASES.get(language, language)
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(normalize_query(text)) if t not in STOPWORDS]
+
+def _deletions(token: str) -> Set[str]:
+    """The token with each single character removed (symmetric-delete fuzzy matching)"""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+class _LanguageIndex:
+    """Inverted token index over one language's question variants"""
+
+    def __init__(self, entries: List[Dict], fuzzy_min_length: int):
+        self.entries = entries
+        self.fuzzy_min_length = fuzzy_min_length
+        # Each variant is (entry position, token set, numeric signature)
+        self.variants: List[Tuple[int, FrozenSet[str], Tuple[str, ...]]] = []
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        for position, entry in enumerate(entries):
+            for question in entry["questions"]:
+                tokens = frozenset(tokenize(question))
+                if not tokens:
+                    continue
+                for token in tokens:
+                    postings[token].add(len(self.variants))
+                self.variants.append((position, tokens, numeric_signature(question)))
+        self.postings = {token: tuple(ids) for token, ids in postings.items()}
+        count = max(len(self.variants), 1)
+        self.idf = {token: math.log(1 + count / len(ids)) for token, ids in self.postings.items()}
+        self.max_idf = math.log(1 + count)
+        self.deletes: Dict[str, Set[str]] = defaultdict(set)
+        for token in self.postings:
+            if len(token) >= fuzzy_min_length:
+                self.deletes[token].add(token)
+                for variant in _deletions(token):
+                    self.deletes[variant].add(token)
+
+    def resolve(self, token: str) -> Optional[str]:
+        """Map a query token to an indexed token, allowing one edit for longer words"""
+        if token in self.postings:
+            return token
+        if len(token) < self.fuzzy_min_length:
+            return None
+        candidates = set(self.deletes.get(token, ()))
+        for variant in _deletions(token):
+            candidates.update(self.deletes.get(variant, ()))
+        if not candidates:
+            return None
+        # Prefer the rarest (most informative) close match
+        return max(sorted(candidates), key=lambda t: self.idf[t])
+
+    def weight(self, token: str) -> float:
+        return self.idf.get(token, self.max_idf)
+
+    def match(self, query: str) -> Tuple[Optional[Dict], float]:
+        raw_tokens = tokenize(query)
+        if not raw_tokens:
+            return None, 0.0
+        tokens = {self.resolve(t) or t for t in raw_tokens}
+        candidates = set()
+        for token in tokens:
+            candidates.update(self.postings.get(token, ()))
+        if not candidates:
+            return None, 0.0
+        numbers = numeric_signature(query)
+        best, best_score = None, 0.0
+        for variant_id in candidates:
+            position, variant_tokens, variant_numbers = self.variants[variant_id]
+            if variant_numbers != numbers:
+                continue
+            # IDF-weighted Jaccard: unmatched words on either side lower the score
+            shared = sum(self.weight(t) for t in tokens & variant_tokens)
+            total = sum(self.weight(t) for t in tokens | variant_tokens)
+            score = shared / total if total else 0.0
+            if score > best_score:
+                best, best_score = self.entries[position], score
+        return best, best_score
+
+class FAQBank:
+    """
+    Versioned FAQ answers per language with a keyword and fuzzy matcher
+
+    The bank file is JSON: {"version": "...", "languages": {"en": [{"id",
+    "questions", "answer"}, ...], ...}}. It is re-read when its mtime
+    changes (checked at most every reload_interval seconds), so edits go
+    live in every worker without a restart.
+    """
+
+    def __init__(self, path: Optional[str] = None, threshold: float = 0.6, reload_interval: float = 10,
+                 fuzzy_min_length: int = 4):
+        self.path = path
+        self.threshold = threshold
+        self.reload_interval = reload_interval
+        self.fuzzy_min_length = fuzzy_min_length
+        self.version: Optional[str] = None
+        self._indexes: Dict[str, _LanguageIndex] = {}
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        if path:
+            self.maybe_reload(force=True)
+
+    def load(self, data: Dict) -> None:
+        """Build the indexes from parsed bank data and swap them in"""
+        indexes = {}
+        for language, entries in data.get("languages", {}).items():
+            valid = [e for e in entries if e.get("id") and e.get("answer") and e.get("questions")]
+            indexes[normalize_language(language)] = _LanguageIndex(valid, self.fuzzy_min_length)
+        self._indexes = indexes
+        self.version = str(data.get("version", ""))
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """Reload the bank file if it changed; returns True when a new version was loaded"""
+        now = time.monotonic()
+        if not self.path or (not force and now < self._next_check):
+            return False
+        with self._lock:
+            if not force and now < self._next_check:
+                return False
+            self._next_check = now + self.reload_interval
+            try:
+                mtime = os.path.getmtime(self.path)
+                if not force and mtime == self._mtime:
+                    return False
+                with open(self.path, encoding="utf-8") as f:
+                    self.load(json.load(f))
+                self._mtime = mtime
+                self.reloads += 1
+                logger.info(f"Loaded FAQ bank version {self.version} from {self.path}")
+                return True
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # Keep serving the previous version
+                self.reload_errors += 1
+                logger.error(f"Failed to load FAQ bank {self.path}: {e}")
+                return False
+
+    def lookup(self, question: str, language: str) -> Optional[Dict]:
+        """Return {"id", "answer", "version", "score"} for a confident match, else None"""
+        self.maybe_reload()
+        index = self._indexes.get(normalize_language(language))
+        self.lookups += 1
+        if index is None:
+            return None
+        entry, score = index.match(question)
+        if entry is None or score < self.threshold:
+            return None
+        self.hits += 1
+        return {"id": entry["id"], "answer": entry["answer"], "version": self.version, "score": round(score, 3)}
+
+    def stats(self) -> Dict:
+        lookups = self.lookups
+        return {
+            "version": self.version,
+            "entries": {language: len(index.entries) for language, index in self._indexes.items()},
+            "lookups": lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors
+        }
+
+FAQ_BANK_FILE = os.getenv("FAQ_BANK_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "faq_bank.json"))
+faq_bank = FAQBank(
+    FAQ_BANK_FILE if os.path.exists(FAQ_BANK_FILE) else None,
+    threshold=float(os.getenv("FAQ_MATCH_THRESHOLD", "0.6")),
+    reload_interval=float(os.getenv("FAQ_RELOAD_SECONDS", "10"))
+)
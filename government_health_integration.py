@@ -1,18 +1,70 @@
 # Government Health Database Integration Configuration
 # For connecting to various Indian government health APIs and databases
 
+import json
+import logging
 import os
+import threading
+import time
 import requests
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from datetime import datetime
+
+from cowin_session_index import session_index
+from disk_cache import DiskCacheTier
+from request_coalescing import SingleFlight
+from surveillance_store import surveillance_store
+
+logger = logging.getLogger(__name__)
+
+COWIN_BASE_URL = os.getenv("COWIN_BASE_URL", "https://cdn-api.co-vin.in/api").rstrip("/")
+COWIN_TIMEOUT = float(os.getenv("COWIN_TIMEOUT", "10"))
+COWIN_POOL_SIZE = int(os.getenv("COWIN_POOL_SIZE", "32"))
+
+# Standard Indian immunization schedule
+NATIONAL_IMMUNIZATION_SCHEDULE = {
+    "infant": {
+        "birth": ["BCG", "OPV-0", "Hepatitis B-1"],
+        "6_weeks": ["DPT-1", "OPV-1", "Hepatitis B-2", "Hib-1", "Rotavirus-1", "PCV-1"],
+        "10_weeks": ["DPT-2", "OPV-2", "Hib-2", "Rotavirus-2", "PCV-2"],
+        "14_weeks": ["DPT-3", "OPV-3", "Hepatitis B-3", "Hib-3", "Rotavirus-3", "PCV-3"],
+        "9_months": ["Measles-1", "Vitamin A-1"],
+        "16_18_months": ["DPT Booster-1", "OPV Booster", "Measles-2", "JE-1"],
+        "5_6_years": ["DPT Booster-2", "JE-2"]
+    },
+    "adult": {
+        "pregnancy": ["TT-1", "TT-2"],
+        "elderly": ["Influenza (annual)", "Pneumococcal"],
+        "high_risk": ["COVID-19", "Hepatitis B"]
+    }
+}
+
+def vaccination_result(data) -> Dict:
+    return {
+        "success": True,
+        "data": data,
+        "source": "Co-WIN API"
+    }
+
+def vaccination_cache_key(pincode: str, date: str) -> str:
+    return f"vaccination_{pincode}_{date}"
 
 class GovernmentHealthAPI:
     """
     Integration class for Indian government health databases and APIs
     """
     
-    def __init__(self):
-        self.cowin_base_url = "https://cdn-api.co-vin.in/api"
+    def __init__(self, cowin_base_url: str = COWIN_BASE_URL, timeout: float = COWIN_TIMEOUT,
+                 pool_size: int = COWIN_POOL_SIZE):
+        self.cowin_base_url = cowin_base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.ayush_base_url = "https://ayush.gov.in/api"  # Placeholder
         self.nrhm_base_url = "https://nrhm.gov.in/api"   # Placeholder
         
@@ -24,20 +76,10 @@ class GovernmentHealthAPI:
             if not date:
                 date = datetime.now().strftime("%d-%m-%Y")
             
-            url = f"{self.cowin_base_url}/v2/appointment/sessions/public/findByPin"
-            params = {
-                "pincode": pincode,
-                "date": date
-            }
-            
-            response = requests.get(url, params=params)
+            response = self.find_sessions_by_pin(pincode, date)
             response.raise_for_status()
             
-            return {
-                "success": True,
-                "data": response.json(),
-                "source": "Co-WIN API"
-            }
+            return vaccination_result(response.json())
             
         except requests.exceptions.RequestException as e:
             return {
@@ -46,27 +88,16 @@ class GovernmentHealthAPI:
                 "data": []
             }
     
+    def find_sessions_by_pin(self, pincode: str, date: str) -> requests.Response:
+        """Raw Co-WIN findByPin call over the pooled session (date as DD-MM-YYYY)"""
+        url = f"{self.cowin_base_url}/v2/appointment/sessions/public/findByPin"
+        return self.session.get(url, params={"pincode": pincode, "date": date}, timeout=self.timeout)
+    
     def get_vaccination_schedule(self, age: int, region: str = "india") -> Dict:
         """
         Get vaccination schedule based on age and region
         """
-        # Standard Indian immunization schedule
-        vaccination_schedule = {
-            "infant": {
-                "birth": ["BCG", "OPV-0", "Hepatitis B-1"],
-                "6_weeks": ["DPT-1", "OPV-1", "Hepatitis B-2", "Hib-1", "Rotavirus-1", "PCV-1"],
-                "10_weeks": ["DPT-2", "OPV-2", "Hib-2", "Rotavirus-2", "PCV-2"],
-                "14_weeks": ["DPT-3", "OPV-3", "Hepatitis B-3", "Hib-3", "Rotavirus-3", "PCV-3"],
-                "9_months": ["Measles-1", "Vitamin A-1"],
-                "16_18_months": ["DPT Booster-1", "OPV Booster", "Measles-2", "JE-1"],
-                "5_6_years": ["DPT Booster-2", "JE-2"]
-            },
-            "adult": {
-                "pregnancy": ["TT-1", "TT-2"],
-                "elderly": ["Influenza (annual)", "Pneumococcal"],
-                "high_risk": ["COVID-19", "Hepatitis B"]
-            }
-        }
+        vaccination_schedule = NATIONAL_IMMUNIZATION_SCHEDULE
         
         if age < 1:
             return {
@@ -96,8 +127,51 @@ class GovernmentHealthAPI:
         """
         Get disease surveillance data for outbreak detection
         """
+        stored_diseases = surveillance_store.region_diseases(region)
+        if stored_diseases:
+            surveillance_data = self._stored_surveillance_data(region, stored_diseases)
+        else:
+            surveillance_data = self._mock_surveillance_data(region)
+        
+        if disease:
+            filtered_data = [d for d in surveillance_data["diseases"] 
+                           if d["name"].lower() == disease.lower()]
+            surveillance_data["diseases"] = filtered_data
+        
+        return {
+            "success": True,
+            "data": surveillance_data,
+            "source": "NCDC Disease Surveillance"
+        }
+    
+    def _stored_surveillance_data(self, region: str, names: List[str]) -> Dict:
+        """Two-week trend per disease from the surveillance store"""
+        diseases = []
+        for name in names:
+            counts = surveillance_store.series(region, name, 14)
+            recent, previous = int(counts[7:].sum()), int(counts[:7].sum())
+            if recent > previous * 1.1:
+                trend = "increasing"
+            elif recent < previous * 0.9:
+                trend = "decreasing"
+            else:
+                trend = "stable"
+            diseases.append({
+                "name": name,
+                "cases": recent,
+                "trend": trend,
+                "severity": "medium" if trend == "increasing" else "low",
+                "last_7_days": counts[7:].tolist()
+            })
+        return {
+            "region": region,
+            "last_updated": datetime.fromordinal(surveillance_store.latest).date().isoformat(),
+            "diseases": diseases
+        }
+    
+    def _mock_surveillance_data(self, region: str) -> Dict:
         # Mock data for demonstration - replace with actual API calls
-        surveillance_data = {
+        return {
             "region": region,
             "last_updated": datetime.now().isoformat(),
             "diseases": [
@@ -124,17 +198,6 @@ class GovernmentHealthAPI:
                 }
             ]
         }
-        
-        if disease:
-            filtered_data = [d for d in surveillance_data["diseases"] 
-                           if d["name"].lower() == disease.lower()]
-            surveillance_data["diseases"] = filtered_data
-        
-        return {
-            "success": True,
-            "data": surveillance_data,
-            "source": "NCDC Disease Surveillance"
-        }
     
     def get_health_schemes(self, state: str = None) -> Dict:
         """
@@ -203,57 +266,257 @@ class GovernmentHealthAPI:
         }
 
 # Health data cache for better performance
+class _CacheEntry:
+    __slots__ = ("data", "size", "fresh_until", "stale_until")
+
+    def __init__(self, data: Dict, size: int, fresh_until: float, stale_until: float):
+        self.data = data
+        self.size = size
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
 class HealthDataCache:
     """
-    Cache system for government health data to reduce API calls
+    Bounded LRU cache for government health data with stale-while-revalidate
+
+    Entries live for a TTL chosen by key prefix ("vaccination_", "outbreak_").
+    After that they may still be served for stale_ttl seconds while a
+    background refresh fetches a new copy, so a request only waits on the
+    upstream API when nothing usable is cached. Size is capped both by entry
+    count and by the approximate serialized size of the cached data.
+
+    With a disk tier, every write also goes to disk and memory misses are
+    looked up there, so a restarted worker starts warm.
     """
-    
-    def __init__(self):
-        self.cache = {}
-        self.cache_duration = timedelta(hours=6)  # Cache for 6 hours
-    
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 default_ttl: float = 6 * 3600, prefix_ttls: Optional[Dict[str, float]] = None,
+                 stale_ttl: float = 3600, refresh_workers: int = 2, disk: Optional[DiskCacheTier] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.prefix_ttls = prefix_ttls or {}
+        self.stale_ttl = stale_ttl
+        self.disk = disk
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="health-cache-refresh")
+        self._loads = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def ttl_for(self, key: str) -> float:
+        matches = [prefix for prefix in self.prefix_ttls if key.startswith(prefix)]
+        return self.prefix_ttls[max(matches, key=len)] if matches else self.default_ttl
+
+    def _lookup(self, key: str) -> Tuple[Optional[Dict], bool]:
+        """Return (data, fresh); expired entries past the stale window are dropped"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now >= entry.stale_until:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self.disk is not None:
+            # Another worker, or this one before a restart, may have stored it
+            stored = self.disk.get(key)
+            if stored is not None:
+                data, fresh_until, stale_until = stored
+                entry = self._store(key, data, len(json.dumps(data, default=str)), fresh_until, stale_until)
+                with self._lock:
+                    self.disk_hits += 1
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None, False
+            if now < entry.fresh_until:
+                self.hits += 1
+                return entry.data, True
+            self.stale_hits += 1
+            return entry.data, False
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def is_fresh(self, key: str) -> bool:
+        """Whether key holds fresh data in memory or on disk (not counted in the stats)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return time.time() < entry.fresh_until
+        if self.disk is None:
+            return False
+        stored = self.disk.get(key)
+        return stored is not None and time.time() < stored[1]
+
     def get(self, key: str) -> Optional[Dict]:
         """Get cached data if not expired"""
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if datetime.now() - timestamp < self.cache_duration:
-                return data
-            else:
-                del self.cache[key]
-        return None
-    
+        data, fresh = self._lookup(key)
+        return data if fresh else None
+
+    def _store(self, key: str, data: Dict, size: int, fresh_until: float, stale_until: float) -> _CacheEntry:
+        entry = _CacheEntry(data, size, fresh_until, stale_until)
+        if size > self.max_bytes:
+            return entry
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
     def set(self, key: str, data: Dict) -> None:
-        """Cache data with timestamp"""
-        self.cache[key] = (data, datetime.now())
+        """Cache data, evicting least recently used entries beyond the count and size limits"""
+        ttl = self.ttl_for(key)
+        now = time.time()
+        fresh_until, stale_until = now + ttl, now + ttl + self.stale_ttl
+        self._store(key, data, len(json.dumps(data, default=str)), fresh_until, stale_until)
+        if self.disk is not None:
+            self.disk.set(key, data, fresh_until, stale_until)
+
+    def _refresh(self, key: str, loader: Callable[[], Dict]) -> None:
+        try:
+            data = loader()
+            if data.get("success"):
+                self.set(key, data)
+                self.refreshes += 1
+            else:
+                self.refresh_failures += 1
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.warning(f"Background refresh of {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_load(self, key: str, loader: Callable[[], Dict]) -> Dict:
+        """
+        Cached data for key, loading it only when nothing usable is cached
+
+        Stale data is returned immediately and refreshed in the background;
+        concurrent misses for one key share a single upstream call. Only
+        successful responses are cached.
+        """
+        data, fresh = self._lookup(key)
+        if data is not None:
+            if not fresh:
+                with self._lock:
+                    start = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start:
+                    self._refresh_executor.submit(self._refresh, key, loader)
+            return data
+
+        def load():
+            loaded = loader()
+            if loaded.get("success"):
+                self.set(key, loaded)
+            return loaded
+        return self._loads.do(key, load)
+
+    def clear(self) -> None:
+        """Empty the in-memory tier (the disk tier is shared with other workers and kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+                "refreshing": len(self._refreshing),
+                "disk": self.disk.stats() if self.disk is not None else None
+            }
 
 # Initialize instances
 health_api = GovernmentHealthAPI()
-health_cache = HealthDataCache()
+HEALTH_CACHE_DB = os.getenv("HEALTH_CACHE_DB", "health_data_cache.db")
+health_cache = HealthDataCache(
+    max_entries=int(os.getenv("HEALTH_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(os.getenv("HEALTH_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    default_ttl=float(os.getenv("HEALTH_CACHE_TTL_DEFAULT", str(6 * 3600))),
+    prefix_ttls={
+        # Slot availability changes through the day; outbreak data is revised far less often
+        "vaccination_": float(os.getenv("HEALTH_CACHE_TTL_VACCINATION", "900")),
+        "outbreak_": float(os.getenv("HEALTH_CACHE_TTL_OUTBREAK", "3600"))
+    },
+    stale_ttl=float(os.getenv("HEALTH_CACHE_STALE_SECONDS", "3600")),
+    # Shared by every worker on the node and kept across restarts; set HEALTH_CACHE_DB="" to disable
+    disk=DiskCacheTier(HEALTH_CACHE_DB) if HEALTH_CACHE_DB else None
+)
+
+def index_vaccination_result(pincode: str, date: str, result: Dict) -> Dict:
+    """Feed the sessions of a successful findByPin result into session_index"""
+    if result.get("success"):
+        data = result.get("data")
+        session_index.upsert(pincode, date, data.get("sessions", []) if isinstance(data, dict) else [])
+    return result
+
+_session_index_warm = threading.Event()
+_session_index_warm_lock = threading.Lock()
+
+def warm_session_index() -> int:
+    """Index the vaccination data another worker or an earlier run left in the disk tier (once)"""
+    if _session_index_warm.is_set():
+        return 0
+    with _session_index_warm_lock:
+        if _session_index_warm.is_set() or health_cache.disk is None:
+            _session_index_warm.set()
+            return 0
+        loaded = 0
+        for key, result in health_cache.disk.iter_prefix("vaccination_"):
+            _, pincode, date = key.split("_", 2)
+            try:
+                index_vaccination_result(pincode, date, result)
+                loaded += 1
+            except (ValueError, AttributeError):
+                continue
+        _session_index_warm.set()
+        logger.info(f"Session index warmed from disk with {loaded} pincode-dates")
+        return loaded
+
+def search_vaccination_sessions(**filters) -> List[Dict]:
+    """Filtered query over every vaccination session fetched so far (see CowinSessionIndex.query)"""
+    warm_session_index()
+    return session_index.query(**filters)
 
 def get_cached_vaccination_data(pincode: str, date: str = None) -> Dict:
     """Get vaccination data with caching"""
-    cache_key = f"vaccination_{pincode}_{date or 'today'}"
-    cached_data = health_cache.get(cache_key)
-    
-    if cached_data:
-        return cached_data
-    
-    fresh_data = health_api.get_vaccination_centers(pincode, date)
-    if fresh_data["success"]:
-        health_cache.set(cache_key, fresh_data)
-    
-    return fresh_data
+    date = date or datetime.now().strftime("%d-%m-%Y")
+    cache_key = vaccination_cache_key(pincode, date)
+    return health_cache.get_or_load(
+        cache_key, lambda: index_vaccination_result(pincode, date, health_api.get_vaccination_centers(pincode, date))
+    )
 
 def get_cached_outbreak_data(region: str) -> Dict:
     """Get outbreak data with caching"""
     cache_key = f"outbreak_{region}"
-    cached_data = health_cache.get(cache_key)
-    
-    if cached_data:
-        return cached_data
-    
-    fresh_data = health_api.check_outbreak_alerts(region)
-    if fresh_data["success"]:
-        health_cache.set(cache_key, fresh_data)
-    
-    return fresh_data
\ No newline at end of file
+    return health_cache.get_or_load(cache_key, lambda: health_api.check_outbreak_alerts(region))
@@ -0,0 +1,217 @@
+# Health Center Geospatial Index
+# Answers nearest-center queries locally from a bulk PHC/CHC file using a lat/lon grid
+
+import csv
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.195
+
+# Accepted column names in the bulk file
+LATITUDE_FIELDS = ("latitude", "lat")
+LONGITUDE_FIELDS = ("longitude", "lng", "lon", "long")
+
+def haversine_km(lat, lon, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point (degrees) to arrays of points (radians)"""
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    a = (np.sin((lats - lat) / 2) ** 2
+         + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def _first_field(row: Dict, names: Sequence[str]):
+    for name in names:
+        if row.get(name) not in (None, ""):
+            return row[name]
+    raise KeyError(names[0])
+
+def load_centers_file(path: str) -> List[Dict]:
+    """Read centers from CSV (header row) or JSON (a list, or {"health_centers": [...]})"""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        rows = data.get("health_centers", []) if isinstance(data, dict) else data
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+    centers = []
+    for row in rows:
+        try:
+            center = {
+                "name": row.get("name") or "Health Center",
+                "address": row.get("address") or row.get("vicinity") or "No address available",
+                "latitude": float(_first_field(row, LATITUDE_FIELDS)),
+                "longitude": float(_first_field(row, LONGITUDE_FIELDS))
+            }
+        except (KeyError, ValueError):
+            continue
+        if row.get("type"):
+            center["type"] = row["type"]
+        centers.append(center)
+    return centers
+
+class HealthCenterIndex:
+    """
+    Grid index over health-center coordinates
+
+    Centers are bucketed into cell_degrees x cell_degrees cells and sorted by
+    cell, so a bounding-box query is a handful of contiguous slices followed by
+    an exact haversine filter over the candidates.
+    """
+
+    def __init__(self, cell_degrees: float = 0.1):
+        self.cell_degrees = cell_degrees
+        self._rows = int(np.ceil(180 / cell_degrees)) + 1
+        self._cols = int(np.ceil(360 / cell_degrees))
+        self._lock = threading.Lock()
+        self._set_arrays([])
+        self.source: Optional[str] = None
+
+    def _cell(self, lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+        row = np.floor((np.asarray(lat) + 90) / self.cell_degrees).astype(np.int64)
+        col = np.floor((np.asarray(lon) + 180) / self.cell_degrees).astype(np.int64) % self._cols
+        return row, col
+
+    def _set_arrays(self, centers: List[Dict]) -> None:
+        lats = np.array([c["latitude"] for c in centers], dtype=np.float64)
+        lons = np.array([c["longitude"] for c in centers], dtype=np.float64)
+        row, col = self._cell(lats, lons)
+        keys = row * self._cols + col
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        cell_keys, starts = np.unique(keys, return_index=True)
+
+        # Centers are stored in cell order so every cell is one contiguous slice
+        self._centers = [centers[i] for i in order]
+        self._lat_deg = lats[order]
+        self._lon_deg = lons[order]
+        self._lat_rad = np.radians(self._lat_deg)
+        self._lon_rad = np.radians(self._lon_deg)
+        self._cell_keys = cell_keys
+        self._cell_starts = starts
+        self._cell_ends = np.append(starts[1:], len(keys)).astype(np.int64)
+
+        # First search radius for k-nearest: roughly one center per circle at average density
+        if len(centers) > 1:
+            lat_extent = (lats.max() - lats.min()) * KM_PER_DEGREE
+            lon_extent = (lons.max() - lons.min()) * KM_PER_DEGREE * np.cos(np.radians(np.median(lats)))
+            area_per_center = max(lat_extent * lon_extent, 1.0) / len(centers)
+            self._seed_radius_km = max(float(np.sqrt(area_per_center / np.pi)), 0.5)
+        else:
+            self._seed_radius_km = self.cell_degrees * KM_PER_DEGREE
+
+    def build(self, centers: List[Dict]) -> int:
+        """Replace the index contents with the given centers"""
+        with self._lock:
+            self._set_arrays(centers)
+        return len(centers)
+
+    def load(self, path: str) -> int:
+        """Load a bulk CSV/JSON file of centers"""
+        count = self.build(load_centers_file(path))
+        self.source = path
+        logger.info(f"Loaded {count} health centers from {path}")
+        return count
+
+    def __len__(self) -> int:
+        return len(self._centers)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Indices of centers in the grid cells covering a radius_km box around the point"""
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = np.cos(np.radians(min(abs(lat) + lat_span, 89.9)))
+        lon_span = min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+
+        row_lo, col_lo = self._cell(max(lat - lat_span, -90.0), lon - lon_span)
+        row_hi, col_hi = self._cell(min(lat + lat_span, 90.0), lon + lon_span)
+        rows = np.arange(row_lo, row_hi + 1)
+        if lon_span >= 180.0:
+            cols = np.arange(self._cols)
+        else:
+            cols = np.arange(col_lo, col_lo + (col_hi - col_lo) % self._cols + 1) % self._cols
+
+        wanted = (rows[:, None] * self._cols + cols[None, :]).ravel()
+        slots = np.searchsorted(self._cell_keys, wanted)
+        found = slots < len(self._cell_keys)
+        found[found] = self._cell_keys[slots[found]] == wanted[found]
+        slots = slots[found]
+        starts = self._cell_starts[slots]
+        lengths = self._cell_ends[slots] - starts
+        # Concatenated ranges start[i]..end[i] without a Python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return offsets + np.arange(lengths.sum())
+
+    def _format(self, index: int, distance_km: float) -> Dict:
+        return dict(self._centers[index], distance_km=round(float(distance_km), 3))
+
+    def within_radius(self, lat: float, lon: float, radius_km: float,
+                      limit: Optional[int] = None) -> List[Dict]:
+        """Centers within radius_km, nearest first"""
+        if not len(self):
+            return []
+        candidates = self._candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self._lat_rad[candidates], self._lon_rad[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")[:limit]
+        return [self._format(candidates[i], distances[i]) for i in order]
+
+    def _nearest_indices(self, lat: float, lon: float, k: int,
+                         max_radius_km: Optional[float]) -> Tuple[np.ndarray, np.ndarray]:
+        # Grow the search box until the k-th nearest candidate is inside the searched circle
+        radius_km = self._seed_radius_km * np.sqrt(k)
+        limit = max_radius_km if max_radius_km is not None else np.pi * EARTH_RADIUS_KM
+        while True:
+            radius_km = min(radius_km, limit)
+            candidates = self._candidates(lat, lon, radius_km)
+            if len(candidates) >= k or radius_km >= limit:
+                distances = haversine_km(lat, lon, self._lat_rad[candidates], self._lon_rad[candidates])
+                order = np.argsort(distances, kind="stable")[:k]
+                if radius_km >= limit:
+                    keep = distances[order] <= limit
+                    return candidates[order][keep], distances[order][keep]
+                if distances[order[-1]] <= radius_km:
+                    return candidates[order], distances[order]
+            radius_km *= 2
+
+    def nearest(self, lat: float, lon: float, k: int = 5,
+                max_radius_km: Optional[float] = None) -> List[Dict]:
+        """The k nearest centers (optionally within max_radius_km), nearest first"""
+        if not len(self):
+            return []
+        indices, distances = self._nearest_indices(lat, lon, k, max_radius_km)
+        return [self._format(i, d) for i, d in zip(indices, distances)]
+
+    def nearest_batch(self, coordinates: Sequence[Sequence[float]], k: int = 5,
+                      max_radius_km: Optional[float] = None) -> List[List[Dict]]:
+        """Nearest centers for many (latitude, longitude) points"""
+        points = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        if not len(self):
+            return [[] for _ in range(len(points))]
+        return [self.nearest(lat, lon, k, max_radius_km) for lat, lon in points]
+
+    def stats(self) -> Dict:
+        return {
+            "centers": len(self),
+            "cells": int(len(self._cell_keys)),
+            "cell_degrees": self.cell_degrees,
+            "source": self.source
+        }
+
+health_center_index = HealthCenterIndex(float(os.getenv("HEALTH_CENTER_CELL_DEGREES", "0.1")))
+
+HEALTH_CENTERS_FILE = os.getenv("HEALTH_CENTERS_FILE")
+if HEALTH_CENTERS_FILE:
+    try:
+        health_center_index.load(HEALTH_CENTERS_FILE)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load health centers from {HEALTH_CENTERS_FILE}: {e}")
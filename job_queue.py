@@ -0,0 +1,183 @@
+# Asynchronous Job Queue
+# Runs slow model calls on a bounded pool; clients poll /jobs/<id> or get a webhook callback
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+class QueueFullError(Exception):
+    """Raised when the number of queued jobs has reached max_pending"""
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+def _latency_summary(samples) -> Dict:
+    if not samples:
+        return {"count": 0, "avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "count": len(ordered),
+        "avg": round(sum(ordered) / len(ordered), 4),
+        "p50": round(pick(0.50), 4),
+        "p95": round(pick(0.95), 4),
+        "max": round(ordered[-1], 4)
+    }
+
+class JobQueue:
+    """
+    Bounded background executor with pollable job records
+
+    At most max_pending jobs wait for a worker; further submissions raise
+    QueueFullError. Finished jobs are kept for result_ttl seconds.
+    """
+
+    def __init__(self, max_workers: int = 8, max_pending: int = 200, result_ttl: float = 3600,
+                 max_jobs: int = 10000, webhook_timeout: float = 5,
+                 webhook_allowed_hosts: Optional[List[str]] = None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.max_jobs = max_jobs
+        self.webhook_timeout = webhook_timeout
+        self.webhook_allowed_hosts = set(webhook_allowed_hosts or [])
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._session = requests.Session()
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._counts = {"submitted": 0, "succeeded": 0, "failed": 0, "rejected": 0,
+                        "webhooks_sent": 0, "webhooks_failed": 0}
+        self._wait_times = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+
+    def validate_webhook(self, url: Optional[str]) -> Optional[str]:
+        """Only http(s) callbacks, restricted to webhook_allowed_hosts when it is set"""
+        if not url:
+            return None
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError("callback_url must be an http(s) URL")
+        if self.webhook_allowed_hosts and parsed.hostname not in self.webhook_allowed_hosts:
+            raise ValueError(f"callback_url host {parsed.hostname} is not allowed")
+        return url
+
+    def submit(self, kind: str, fn: Callable[[], Any], webhook_url: Optional[str] = None) -> Dict:
+        """Queue fn and return the public job record"""
+        webhook_url = self.validate_webhook(webhook_url)
+        now = time.time()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counts["rejected"] += 1
+                raise QueueFullError(f"Job queue is full ({self.max_pending} pending)")
+            self._prune(now)
+            job = {
+                "id": uuid.uuid4().hex,
+                "kind": kind,
+                "status": JOB_QUEUED,
+                "created_ts": now,
+                "started_ts": None,
+                "finished_ts": None,
+                "result": None,
+                "error": None,
+                "webhook_url": webhook_url
+            }
+            self._jobs[job["id"]] = job
+            self._pending += 1
+            self._counts["submitted"] += 1
+            view = self._view(job)
+        self._executor.submit(self._run, job, fn)
+        return view
+
+    def _prune(self, now: float) -> None:
+        # Oldest jobs sit at the front; drop expired finished ones, then enforce max_jobs
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            expired = job["finished_ts"] and now - job["finished_ts"] > self.result_ttl
+            if not expired and len(self._jobs) < self.max_jobs:
+                break
+            if job["finished_ts"] or expired:
+                del self._jobs[job_id]
+
+    def _run(self, job: Dict, fn: Callable[[], Any]) -> None:
+        started = time.time()
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+            job["status"] = JOB_RUNNING
+            job["started_ts"] = started
+            self._wait_times.append(started - job["created_ts"])
+        try:
+            result, error, status = fn(), None, JOB_SUCCEEDED
+        except Exception as e:
+            result, error, status = None, str(e), JOB_FAILED
+            logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}")
+        finished = time.time()
+        with self._lock:
+            self._running -= 1
+            job.update(status=status, result=result, error=error, finished_ts=finished)
+            self._run_times.append(finished - started)
+            self._counts[status] += 1
+            view = self._view(job)
+        if job["webhook_url"]:
+            self._notify(job["webhook_url"], view)
+
+    def _notify(self, url: str, view: Dict) -> None:
+        try:
+            response = self._session.post(url, json=view, timeout=self.webhook_timeout)
+            response.raise_for_status()
+            sent = True
+        except requests.exceptions.RequestException as e:
+            sent = False
+            logger.warning(f"Webhook for job {view['job_id']} failed: {e}")
+        with self._lock:
+            self._counts["webhooks_sent" if sent else "webhooks_failed"] += 1
+
+    def _view(self, job: Dict) -> Dict:
+        view = {
+            "job_id": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "created_at": _iso(job["created_ts"]),
+            "started_at": _iso(job["started_ts"]),
+            "finished_at": _iso(job["finished_ts"])
+        }
+        if job["status"] == JOB_SUCCEEDED:
+            view["result"] = job["result"]
+        elif job["status"] == JOB_FAILED:
+            view["error"] = job["error"]
+        return view
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._view(job) if job else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._counts,
+                "queue_depth": self._pending,
+                "running": self._running,
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "stored_jobs": len(self._jobs),
+                "wait_seconds": _latency_summary(self._wait_times),
+                "run_seconds": _latency_summary(self._run_times)
+            }
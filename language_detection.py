@@ -0,0 +1,96 @@
+# Language Detection for Indian Languages
+# Classifies by Unicode script first and only falls back to langdetect for Latin text
+
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+DEFAULT_LANGUAGE = "en"
+
+# Unicode blocks are 128 code points wide, so ord(char) >> 7 identifies the script.
+SCRIPT_BLOCKS = {
+    0x0600 >> 7: "ur",  # Arabic (Urdu)
+    0x0680 >> 7: "ur",
+    0x0900 >> 7: "hi",  # Devanagari
+    0x0980 >> 7: "bn",  # Bengali
+    0x0A00 >> 7: "pa",  # Gurmukhi
+    0x0A80 >> 7: "gu",  # Gujarati
+    0x0B00 >> 7: "or",  # Odia
+    0x0B80 >> 7: "ta",  # Tamil
+    0x0C00 >> 7: "te",  # Telugu
+    0x0C80 >> 7: "kn",  # Kannada
+    0x0D00 >> 7: "ml",  # Malayalam
+}
+
+_NATIVE_SCRIPT_RE = re.compile("[\u0600-\u06ff\u0900-\u0d7f]")
+_LATIN_WORD_RE = re.compile(r"[a-z]+")
+_MAX_SCRIPT_SAMPLE = 64
+
+# Frequent romanized Hindi words; two or more of them marks a message as Hinglish.
+HINGLISH_MARKERS = frozenset([
+    "hai", "hain", "kya", "kaise", "kyu", "kyon", "kab", "kahan", "mein", "mujhe", "mera",
+    "meri", "nahi", "nahin", "aur", "ko", "ka", "ki", "ke", "se", "hota", "hoti", "hoga",
+    "karna", "karein", "chahiye", "bukhar", "dard", "ilaj", "dawai", "dawa", "lakshan",
+    "bimari", "sardi", "khansi", "pet", "sir", "tika", "teeka", "bachche", "bacche"
+])
+HINGLISH_MIN_MARKERS = 2
+HINGLISH_MIN_RATIO = 0.25
+# langdetect is unreliable on a few Latin words ("Fever symptoms?" comes back as "no").
+MIN_LANGDETECT_WORDS = 4
+
+_langdetect_lock = threading.Lock()
+_langdetect_ready = False
+
+def detect_script_language(text: str) -> Optional[str]:
+    """Return the language of the dominant Indic/Urdu script in text, if any"""
+    blocks = Counter()
+    for match in _NATIVE_SCRIPT_RE.finditer(text):
+        blocks[ord(match.group()) >> 7] += 1
+        if len(blocks) == 1 and sum(blocks.values()) >= _MAX_SCRIPT_SAMPLE:
+            break
+    if not blocks:
+        return None
+    return SCRIPT_BLOCKS.get(blocks.most_common(1)[0][0])
+
+def is_hinglish(text: str) -> bool:
+    """Heuristic check for Hindi written in Latin script"""
+    words = _LATIN_WORD_RE.findall(text.lower())
+    if not words:
+        return False
+    markers = sum(1 for word in words if word in HINGLISH_MARKERS)
+    return markers >= HINGLISH_MIN_MARKERS and markers / len(words) >= HINGLISH_MIN_RATIO
+
+def _langdetect(text: str) -> str:
+    """Seeded langdetect so the same text always gets the same answer"""
+    global _langdetect_ready
+    from langdetect import DetectorFactory, detect
+    from langdetect.lang_detect_exception import LangDetectException
+
+    if not _langdetect_ready:
+        with _langdetect_lock:
+            DetectorFactory.seed = 0
+            _langdetect_ready = True
+    try:
+        return detect(text)
+    except LangDetectException:
+        return DEFAULT_LANGUAGE
+
+@lru_cache(maxsize=8192)
+def _detect_normalized(text: str) -> str:
+    script_language = detect_script_language(text)
+    if script_language:
+        return script_language
+    if is_hinglish(text):
+        return "hi"
+    if len(_LATIN_WORD_RE.findall(text.lower())) < MIN_LANGDETECT_WORDS:
+        return DEFAULT_LANGUAGE
+    return _langdetect(text)
+
+def detect_language(text: str) -> str:
+    """Detect the ISO 639-1 language code of a user message"""
+    return _detect_normalized(" ".join(text.split()))
+
+def cache_info():
+    return _detect_normalized.cache_info()
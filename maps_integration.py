@@ -0,0 +1,144 @@
+# Google Maps Integration
+# Health-center search and routing over a pooled HTTP session with cached routes
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from admission_control import OverloadedError, admission_controller
+from health_center_index import health_center_index
+from response_cache import ResponseCache
+
+GOOGLE_MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
+MAPS_BASE_URL = os.getenv("GOOGLE_MAPS_BASE_URL", "https://maps.googleapis.com/maps/api").rstrip("/")
+MAPS_TIMEOUT = float(os.getenv("GOOGLE_MAPS_TIMEOUT", "5"))
+MAPS_POOL_SIZE = int(os.getenv("GOOGLE_MAPS_POOL_SIZE", "20"))
+
+# Coordinates are rounded to this many decimals (about 110 m at 3) for route cache keys
+ROUTE_CACHE_PRECISION = int(os.getenv("ROUTE_CACHE_PRECISION", "3"))
+ROUTE_CACHE_TTL = float(os.getenv("ROUTE_CACHE_TTL", "86400"))
+
+# Local index lookups: search radius, and how far to widen it when Places also finds nothing
+HEALTH_CENTER_RADIUS_KM = float(os.getenv("HEALTH_CENTER_RADIUS_KM", "5"))
+HEALTH_CENTER_FALLBACK_RADIUS_KM = float(os.getenv("HEALTH_CENTER_FALLBACK_RADIUS_KM", "50"))
+HEALTH_CENTER_RESULTS = 5
+
+def _build_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+maps_session = _build_session(MAPS_POOL_SIZE)
+route_executor = ThreadPoolExecutor(max_workers=MAPS_POOL_SIZE, thread_name_prefix="maps-route")
+route_cache = ResponseCache(max_entries=int(os.getenv("ROUTE_CACHE_MAX_ENTRIES", "20000")),
+                            default_ttl=ROUTE_CACHE_TTL)
+
+def get_nearest_health_centers(latitude, longitude) -> Union[List[Dict], Dict]:
+    """
+    Public health centers near a point
+
+    The local index answers first; Google Places is only asked when the index
+    has nothing within HEALTH_CENTER_RADIUS_KM, and if Places also comes back
+    empty the index search widens to HEALTH_CENTER_FALLBACK_RADIUS_KM.
+    """
+    latitude, longitude = float(latitude), float(longitude)
+    local = health_center_index.within_radius(latitude, longitude, HEALTH_CENTER_RADIUS_KM,
+                                              limit=HEALTH_CENTER_RESULTS)
+    if local:
+        return local
+    try:
+        places = search_places_health_centers(latitude, longitude)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        places = {"error": f"Places lookup failed: {e}"}
+    except OverloadedError:
+        if not len(health_center_index):
+            raise
+        places = {"error": "Places lookup shed under load"}
+    if "error" not in places:
+        return places
+    wider = health_center_index.nearest(latitude, longitude, HEALTH_CENTER_RESULTS,
+                                        max_radius_km=HEALTH_CENTER_FALLBACK_RADIUS_KM)
+    return wider or places
+
+def search_places_health_centers(latitude, longitude) -> Union[List[Dict], Dict]:
+    """Public health centers within 5 km from Google Places"""
+    with admission_controller.slot("maps"):
+        response = maps_session.get(
+            f"{MAPS_BASE_URL}/place/nearbysearch/json",
+            params={
+                "location": f"{latitude},{longitude}",
+                "radius": int(HEALTH_CENTER_RADIUS_KM * 1000),
+                "type": "hospital",
+                "keyword": "public health center",
+                "key": GOOGLE_MAPS_API_KEY
+            },
+            timeout=MAPS_TIMEOUT
+        )
+    results = response.json().get("results", [])
+    if not results:
+        return {"error": "No health centers found nearby"}
+    return [
+        {
+            "name": place["name"],
+            "address": place.get("vicinity", "No address available"),
+            "latitude": place["geometry"]["location"]["lat"],
+            "longitude": place["geometry"]["location"]["lng"]
+        }
+        for place in results[:5]
+    ]
+
+def _route_key(start_lat, start_lon, end_lat, end_lon):
+    return ("route",) + tuple(round(float(c), ROUTE_CACHE_PRECISION) for c in (start_lat, start_lon, end_lat, end_lon))
+
+def get_route(start_lat, start_lon, end_lat, end_lon) -> Dict:
+    """Driving route with travel time; successful routes are cached by rounded coordinates"""
+    key = _route_key(start_lat, start_lon, end_lat, end_lon)
+    cached = route_cache.get(key)
+    if cached is not None:
+        return cached
+    with admission_controller.slot("maps"):
+        response = maps_session.get(
+            f"{MAPS_BASE_URL}/directions/json",
+            params={
+                "origin": f"{start_lat},{start_lon}",
+                "destination": f"{end_lat},{end_lon}",
+                "mode": "driving",
+                "key": GOOGLE_MAPS_API_KEY
+            },
+            timeout=MAPS_TIMEOUT
+        )
+    data = response.json()
+    if "routes" not in data or not data["routes"]:
+        return {"error": "No route found"}
+    route = data["routes"][0]
+    legs = route.get("legs") or [{}]
+    result = {
+        "route_polyline": route["overview_polyline"]["points"],
+        "duration_seconds": legs[0].get("duration", {}).get("value"),
+        "distance_meters": legs[0].get("distance", {}).get("value")
+    }
+    route_cache.set(key, result)
+    return result
+
+def _safe_route(start_lat, start_lon, center: Dict) -> Dict:
+    try:
+        return get_route(start_lat, start_lon, center["latitude"], center["longitude"])
+    except (requests.exceptions.RequestException, OverloadedError, ValueError, KeyError) as e:
+        return {"error": f"Route lookup failed: {e}"}
+
+def rank_centers_by_travel_time(latitude, longitude, centers: List[Dict]) -> List[Dict]:
+    """Fetch routes to all centers concurrently and sort them by driving time"""
+    # Each worker runs in a copy of the caller's context so route lookups keep its priority
+    futures = [route_executor.submit(contextvars.copy_context().run, _safe_route, latitude, longitude, center)
+               for center in centers]
+    routes = [future.result() for future in futures]
+    ranked = [dict(center, route=route) for center, route in zip(centers, routes)]
+    ranked.sort(key=lambda c: (c["route"].get("duration_seconds") is None,
+                               c["route"].get("duration_seconds") or 0))
+    return ranked
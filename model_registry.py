@@ -0,0 +1,132 @@
+# Model Registry for aiXplain Models
+# Resolves model handles lazily or warms them concurrently in the background
+
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ModelUnavailableError(RuntimeError):
+    """Raised when a model handle could not be resolved"""
+
+class ModelRegistry:
+    """
+    Lazily resolved, thread-safe registry of model handles
+
+    A model that fails to load does not block the others; it is retried on
+    the next use once retry_after seconds have passed.
+    """
+
+    def __init__(self, loader: Callable[[str], Any], retry_after: float = 30.0):
+        self.loader = loader
+        self.retry_after = retry_after
+        self._model_ids: Dict[str, Optional[str]] = {}
+        self._models: Dict[str, Any] = {}
+        self._errors: Dict[str, str] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, model_id: Optional[str]) -> "LazyModel":
+        """Register a model id under a short name and return a lazy handle to it"""
+        self._model_ids[name] = model_id
+        self._locks[name] = threading.Lock()
+        return LazyModel(self, name)
+
+    def model_id(self, name: str) -> Optional[str]:
+        return self._model_ids.get(name)
+
+    def get(self, name: str) -> Any:
+        """Return the model handle, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is not None:
+                return model
+            failed_at = self._failed_at.get(name)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+                raise ModelUnavailableError(f"Model '{name}' unavailable: {self._errors[name]}")
+            return self._load(name)
+
+    def _load(self, name: str) -> Any:
+        model_id = self._model_ids[name]
+        start = time.perf_counter()
+        try:
+            if not model_id:
+                raise ValueError("model id is not configured")
+            model = self.loader(model_id)
+        except Exception as e:
+            self._errors[name] = str(e)
+            self._failed_at[name] = time.monotonic()
+            logger.error(f"Loading model '{name}' ({model_id}) failed after "
+                         f"{time.perf_counter() - start:.2f}s: {e}")
+            raise ModelUnavailableError(f"Model '{name}' unavailable: {e}") from e
+        self._load_seconds[name] = time.perf_counter() - start
+        self._models[name] = model
+        self._errors.pop(name, None)
+        self._failed_at.pop(name, None)
+        logger.info(f"Loaded model '{name}' ({model_id}) in {self._load_seconds[name]:.2f}s")
+        return model
+
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """Load every registered model concurrently"""
+        def load_all():
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, len(self._model_ids)),
+                                    thread_name_prefix="model-warmup") as executor:
+                for name in self._model_ids:
+                    executor.submit(self._warm_one, name)
+            logger.info(f"Model warm-up finished in {time.perf_counter() - start:.2f}s "
+                        f"({len(self._models)}/{len(self._model_ids)} loaded)")
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def _warm_one(self, name: str) -> None:
+        try:
+            self.get(name)
+        except ModelUnavailableError:
+            pass
+
+    def is_ready(self) -> bool:
+        return all(name in self._models for name in self._model_ids)
+
+    def status(self) -> Dict[str, Dict]:
+        """Per-model load state for readiness checks"""
+        return {
+            name: {
+                "model_id": model_id,
+                "loaded": name in self._models,
+                "load_seconds": self._load_seconds.get(name),
+                "error": self._errors.get(name)
+            }
+            for name, model_id in self._model_ids.items()
+        }
+
+class LazyModel:
+    """
+    Stand-in for a model handle that resolves through the registry on use
+    """
+
+    def __init__(self, registry: ModelRegistry, name: str):
+        self._registry = registry
+        self._name = name
+
+    @property
+    def model_id(self) -> Optional[str]:
+        return self._registry.model_id(self._name)
+
+    def run(self, *args, **kwargs):
+        return self._registry.get(self._name).run(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
@@ -0,0 +1,115 @@
+# Pre-warmed Health News Digests
+# Generates and cleans the news digest per language on a schedule so /news serves it instantly
+
+import hashlib
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class NewsDigestStore:
+    """
+    Stores one cleaned news digest per language and refreshes them in the background
+    """
+
+    def __init__(self, generate: Callable[[str], str], languages: List[str],
+                 refresh_interval: float = 1800, max_languages: int = 32,
+                 refresh_workers: int = 2):
+        self.generate = generate
+        self.refresh_interval = refresh_interval
+        self.max_languages = max_languages
+        self.languages = [self.normalize_language(lang) for lang in languages if lang.strip()]
+        self._digests: Dict[str, Dict] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="news-refresh")
+        self.refresh_failures = 0
+
+    @staticmethod
+    def normalize_language(language: str) -> str:
+        return language.strip().lower()
+
+    def get(self, language: str) -> Optional[Dict]:
+        """Return the stored digest, scheduling a background refresh if it is stale"""
+        language = self.normalize_language(language)
+        with self._lock:
+            digest = self._digests.get(language)
+        if digest and time.time() - digest["generated_ts"] > self.refresh_interval:
+            self.refresh_async(language)
+        return digest
+
+    def refresh(self, language: str) -> Dict:
+        """Generate, clean and store the digest for a language"""
+        language = self.normalize_language(language)
+        news = self.generate(language)
+        generated_ts = time.time()
+        digest = {
+            "language": language,
+            "news": news,
+            "generated_ts": generated_ts,
+            "generated_at": datetime.fromtimestamp(generated_ts).isoformat(),
+            "etag": hashlib.sha1(f"{language}\n{news}".encode("utf-8")).hexdigest()
+        }
+        with self._lock:
+            if language not in self.languages and len(self.languages) < self.max_languages:
+                self.languages.append(language)
+            self._digests[language] = digest
+        return digest
+
+    def refresh_async(self, language: str) -> None:
+        """Refresh a language in the background unless a refresh is already running"""
+        with self._lock:
+            if language in self._refreshing:
+                return
+            self._refreshing.add(language)
+        self._executor.submit(self._refresh_quietly, language)
+
+    def _refresh_quietly(self, language: str) -> None:
+        try:
+            self.refresh(language)
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.error(f"Refreshing news digest for {language} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(language)
+
+    def staleness(self, digest: Dict) -> Dict:
+        age = time.time() - digest["generated_ts"]
+        return {"age_seconds": round(age, 1), "stale": age > self.refresh_interval}
+
+    def start(self) -> None:
+        """Start the background refresher"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="news-digests", daemon=True)
+        self._thread.start()
+        logger.info(f"News digest refresher started for {len(self.languages)} languages")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.is_set():
+            for language in list(self.languages):
+                self.refresh_async(language)
+            self._stop.wait(self.refresh_interval)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            now = time.time()
+            return {
+                "languages": list(self.languages),
+                "age_seconds": {lang: round(now - d["generated_ts"], 1) for lang, d in self._digests.items()},
+                "refreshing": sorted(self._refreshing),
+                "refresh_failures": self.refresh_failures
+            }
@@ -13,6 +13,10 @@ import threading
 import time
 import logging
 
+import numpy as np
+
+from surveillance_store import SurveillanceStore, surveillance_store
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -65,10 +69,23 @@ class OutbreakDetectionEngine:
         """
         if not case_data or len(case_data) < 7:
             return {"outbreak_risk": "insufficient_data"}
+        return self.analyze_case_counts(disease, region, np.array([day["cases"] for day in case_data]))
+    
+    def get_thresholds(self, disease: str) -> Dict:
+        return self.thresholds.get(disease.lower(), {
+            "cases_per_week": 20, "growth_rate": 0.25
+        })
+    
+    def analyze_case_counts(self, disease: str, region: str, counts: np.ndarray) -> Dict:
+        """
+        Analyze daily case counts (oldest first, at least 7 days) for potential outbreaks
+        """
+        if len(counts) < 7:
+            return {"outbreak_risk": "insufficient_data"}
         
         # Calculate weekly case count
-        recent_cases = sum(day["cases"] for day in case_data[-7:])
-        previous_cases = sum(day["cases"] for day in case_data[-14:-7]) if len(case_data) >= 14 else 0
+        recent_cases = int(counts[-7:].sum())
+        previous_cases = int(counts[-14:-7].sum()) if len(counts) >= 14 else 0
         
         # Calculate growth rate
         growth_rate = 0
@@ -76,9 +93,7 @@ class OutbreakDetectionEngine:
             growth_rate = (recent_cases - previous_cases) / previous_cases
         
         # Get thresholds for disease
-        thresholds = self.thresholds.get(disease.lower(), {
-            "cases_per_week": 20, "growth_rate": 0.25
-        })
+        thresholds = self.get_thresholds(disease)
         
         # Determine outbreak risk
         risk_level = "low"
@@ -391,9 +406,10 @@ class RealTimeAlertSystem:
     Main alert system that monitors data and sends notifications
     """
     
-    def __init__(self):
+    def __init__(self, surveillance: SurveillanceStore = None):
         self.outbreak_engine = OutbreakDetectionEngine()
         self.database = AlertDatabase()
+        self.surveillance = surveillance or surveillance_store
         self.monitoring_active = False
         self.monitoring_thread = None
     
@@ -437,22 +453,34 @@ class RealTimeAlertSystem:
     
     def _check_disease_outbreaks(self):
         """Check for disease outbreaks and create alerts"""
-        regions = ["Delhi", "Mumbai", "Bangalore", "Chennai", "Kolkata"]  # Add more regions
-        diseases = ["dengue", "malaria", "covid-19", "typhoid", "cholera"]
-        
-        for region in regions:
-            for disease in diseases:
-                # Get disease data (mock data for demonstration)
-                case_data = self._get_mock_disease_data(disease, region)
-                
-                # Analyze patterns
-                analysis = self.outbreak_engine.analyze_disease_patterns(
-                    disease, region, case_data
-                )
+        if not self.surveillance.region_names:
+            # No surveillance feed yet: seed the store with mock data for demonstration
+            self._seed_mock_surveillance()
+        
+        # Two weeks of every region and disease as one (region, disease, day) array
+        counts = self.surveillance.window(14)
+        weekly = counts[:, :, -7:].sum(axis=2)
+        regions = self.surveillance.region_names
+        
+        for d, disease in enumerate(self.surveillance.disease_names):
+            # High and critical risk both need a weekly count at or above the threshold
+            threshold = self.outbreak_engine.get_thresholds(disease)["cases_per_week"]
+            for r in np.flatnonzero(weekly[:, d] >= threshold):
+                analysis = self.outbreak_engine.analyze_case_counts(disease, regions[r], counts[r, d])
                 
                 # Create alert if outbreak detected
                 if analysis["outbreak_risk"] in ["high", "critical"]:
-                    self._create_outbreak_alert(disease, region, analysis)
+                    self._create_outbreak_alert(disease, regions[r], analysis)
+    
+    def _seed_mock_surveillance(self):
+        """Fill the surveillance store with mock data (replace with actual data source)"""
+        regions = ["Delhi", "Mumbai", "Bangalore", "Chennai", "Kolkata"]
+        diseases = ["dengue", "malaria", "covid-19", "typhoid", "cholera"]
+        self.surveillance.ingest(
+            (region, disease, day["date"], day["cases"])
+            for region in regions for disease in diseases
+            for day in self._get_mock_disease_data(disease, region)
+        )
     
     def _get_mock_disease_data(self, disease: str, region: str) -> List[Dict]:
         """Get mock disease data (replace with actual data source)"""
@@ -0,0 +1,79 @@
+# Request Coalescing for Upstream Calls
+# Concurrent identical requests share one in-flight call (single-flight)
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable
+
+class _InFlightCall:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into a single execution
+
+    The first caller runs the function; callers arriving while it is in flight
+    wait for it and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._lock = threading.Lock()
+        self._executions = defaultdict(int)
+        self._collapsed = defaultdict(int)
+
+    def _group(self, key: Hashable) -> str:
+        return str(key[0]) if isinstance(key, tuple) and key else "default"
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        group = self._group(key)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self._executions[group] += 1
+            else:
+                call.waiters += 1
+                self._collapsed[group] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict:
+        """Executed vs collapsed call counts, overall and per key group"""
+        with self._lock:
+            groups = sorted(set(self._executions) | set(self._collapsed))
+            executions = sum(self._executions.values())
+            collapsed = sum(self._collapsed.values())
+            return {
+                "executions": executions,
+                "collapsed": collapsed,
+                "collapse_rate": collapsed / (executions + collapsed) if executions + collapsed else 0.0,
+                "in_flight": len(self._calls),
+                "by_group": {
+                    group: {"executions": self._executions[group], "collapsed": self._collapsed[group]}
+                    for group in groups
+                }
+            }
@@ -0,0 +1,105 @@
+# Response Cache for aiXplain Model Calls
+# Bounded LRU cache with per-endpoint TTLs so repeated questions skip the model
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION_RE = re.compile(r"[\s?.!।,;:]+$")
+
+def normalize_query(text: str) -> str:
+    """Normalize prompt text so trivially different questions share a cache key"""
+    text = _WHITESPACE_RE.sub(" ", text.casefold()).strip()
+    return _TRAILING_PUNCTUATION_RE.sub("", text)
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with per-entry expiry for model responses
+    """
+
+    def __init__(self, max_entries: int = 5000, default_ttl: float = 3600,
+                 endpoint_ttls: Optional[Dict[str, float]] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.endpoint_ttls = endpoint_ttls or {}
+        self._entries: "OrderedDict[Tuple, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bypasses = 0
+
+    def make_key(self, endpoint: str, model_id: str, prompt: str, language: str = "") -> Tuple:
+        """Build a cache key from endpoint, model id, normalized prompt and language"""
+        return (endpoint, model_id or "", normalize_query(prompt), (language or "").lower())
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.endpoint_ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Get cached value if present and not expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Tuple, value: Any, ttl: Optional[float] = None) -> None:
+        """Store value, evicting least recently used entries beyond max_entries"""
+        if ttl is None:
+            ttl = self.ttl_for(key[0])
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any],
+                       bypass: bool = False) -> Any:
+        """Return the cached value for key, computing and storing it on a miss"""
+        if bypass:
+            with self._lock:
+                self.bypasses += 1
+            return compute()
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = compute()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "bypasses": self.bypasses
+            }
@@ -0,0 +1,239 @@
+# Semantic Answer Cache
+# Serves stored answers for near-duplicate questions using local char n-gram vectors
+
+import math
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from response_cache import normalize_query
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+def numeric_signature(text: str) -> Tuple[str, ...]:
+    """Numbers in a question (ages, doses, days) must match exactly for a cache hit"""
+    return tuple(_NUMBER_RE.findall(text))
+
+class QuestionVectorizer:
+    """
+    Hashed character n-gram vectorizer (sublinear TF, L2-normalized)
+
+    Signed feature hashing projects the sparse n-gram space straight into a
+    small dense vector, so no vocabulary has to be fitted or stored.
+    """
+
+    def __init__(self, dim: int = 128, ngram_range: Tuple[int, int] = (2, 4)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def ngrams(self, text: str) -> Counter:
+        grams = Counter()
+        low, high = self.ngram_range
+        for word in normalize_query(text).split():
+            padded = f" {word} "
+            for n in range(low, high + 1):
+                for i in range(len(padded) - n + 1):
+                    grams[padded[i:i + n]] += 1
+        return grams
+
+    def vectorize(self, text: str) -> np.ndarray:
+        grams = self.ngrams(text)
+        if not grams:
+            return np.zeros(self.dim, dtype=np.float32)
+        hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint32, count=len(grams))
+        counts = np.fromiter(grams.values(), dtype=np.float32, count=len(grams))
+        weights = 1.0 + np.log(counts)
+        weights[hashes < 0x80000000] *= -1.0
+        vector = np.bincount(hashes % self.dim, weights=weights, minlength=self.dim).astype(np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+class VectorIndex:
+    """
+    Fixed-capacity matrix of unit vectors with an inverted-file (IVF) index
+
+    Below train_threshold rows every lookup is a single matrix-vector product.
+    Past it, rows are clustered with spherical k-means and a lookup only scores
+    the rows of the nprobe closest clusters. Clusters are retrained each time
+    the row count doubles and once more at capacity. When full, the oldest row
+    is overwritten.
+    """
+
+    def __init__(self, dim: int, capacity: int = 100000, train_threshold: int = 4096,
+                 nprobe: int = 8, kmeans_iterations: int = 6, kmeans_sample: int = 16384):
+        self.dim = dim
+        self.capacity = capacity
+        self.train_threshold = train_threshold
+        self.nprobe = nprobe
+        self.kmeans_iterations = kmeans_iterations
+        self.kmeans_sample = kmeans_sample
+        self.matrix = np.zeros((min(capacity, 1024), dim), dtype=np.float32)
+        self.size = 0
+        self.next_row = 0
+        self.centroids: Optional[np.ndarray] = None
+        self.cells: List[List[int]] = []
+        self._cell_arrays: Dict[int, np.ndarray] = {}
+        self._row_cell = np.full(self.matrix.shape[0], -1, dtype=np.int32)
+        self._next_training = train_threshold
+        self._rng = np.random.default_rng(0)
+
+    def _grow(self) -> None:
+        new_rows = min(self.capacity, self.matrix.shape[0] * 2)
+        matrix = np.zeros((new_rows, self.dim), dtype=np.float32)
+        matrix[:self.size] = self.matrix[:self.size]
+        row_cell = np.full(new_rows, -1, dtype=np.int32)
+        row_cell[:self.size] = self._row_cell[:self.size]
+        self.matrix, self._row_cell = matrix, row_cell
+
+    def add(self, vector: np.ndarray) -> int:
+        """Store a vector and return its row id"""
+        if self.size < self.capacity and self.size == self.matrix.shape[0]:
+            self._grow()
+        row = self.next_row
+        if self.size == self.capacity:
+            self._remove_from_cell(row)
+        else:
+            self.size += 1
+        self.matrix[row] = vector
+        self.next_row = (row + 1) % self.capacity
+        if self.centroids is not None:
+            self._assign(row)
+        if self.size >= self._next_training:
+            self.train()
+        return row
+
+    def _assign(self, row: int) -> None:
+        cell = int(np.argmax(self.centroids @ self.matrix[row]))
+        self.cells[cell].append(row)
+        self._row_cell[row] = cell
+        self._cell_arrays.pop(cell, None)
+
+    def _remove_from_cell(self, row: int) -> None:
+        cell = int(self._row_cell[row])
+        if cell >= 0:
+            self.cells[cell].remove(row)
+            self._cell_arrays.pop(cell, None)
+            self._row_cell[row] = -1
+
+    def train(self) -> None:
+        """Cluster stored rows with spherical k-means and rebuild the cells"""
+        rows = self.matrix[:self.size]
+        nlist = int(min(2048, max(16, 2 * math.sqrt(self.size))))
+        sample_size = min(self.size, self.kmeans_sample)
+        sample = rows[self._rng.choice(self.size, sample_size, replace=False)]
+        centroids = sample[self._rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            filled = norms[:, 0] > 0
+            centroids[filled] = sums[filled] / norms[filled]
+
+        labels = np.empty(self.size, dtype=np.int32)
+        for start in range(0, self.size, 8192):
+            block = rows[start:start + 8192]
+            labels[start:start + 8192] = np.argmax(block @ centroids.T, axis=1)
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(nlist + 1))
+        self.cells = [order[bounds[c]:bounds[c + 1]].tolist() for c in range(nlist)]
+        self._cell_arrays = {}
+        self._row_cell[:self.size] = labels
+        self.centroids = centroids
+        self._next_training = min(self.size * 2, self.capacity) if self.size < self.capacity else float("inf")
+
+    def _cell_rows(self, cell: int) -> np.ndarray:
+        rows = self._cell_arrays.get(cell)
+        if rows is None:
+            rows = np.fromiter(self.cells[cell], dtype=np.int64, count=len(self.cells[cell]))
+            self._cell_arrays[cell] = rows
+        return rows
+
+    def search(self, vector: np.ndarray) -> Tuple[int, float]:
+        """Return (row, cosine similarity) of the best match, or (-1, 0.0)"""
+        if self.size == 0:
+            return -1, 0.0
+        if self.centroids is None:
+            scores = self.matrix[:self.size] @ vector
+            row = int(np.argmax(scores))
+            return row, float(scores[row])
+        centroid_scores = self.centroids @ vector
+        nprobe = min(self.nprobe, len(self.cells))
+        probe = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+        candidates = np.concatenate([self._cell_rows(int(c)) for c in probe])
+        if candidates.size == 0:
+            return -1, 0.0
+        scores = self.matrix[candidates] @ vector
+        best = int(np.argmax(scores))
+        return int(candidates[best]), float(scores[best])
+
+class SemanticCache:
+    """
+    Per-language near-duplicate answer cache for chatbot questions
+    """
+
+    def __init__(self, threshold: float = 0.92, dim: int = 128,
+                 max_entries_per_language: int = 100000, ttl: float = 86400):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries_per_language = max_entries_per_language
+        self.vectorizer = QuestionVectorizer(dim=dim)
+        self._indexes: Dict[str, VectorIndex] = {}
+        self._entries: Dict[str, List[Optional[Tuple[str, Tuple[str, ...], Any, float]]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _language_key(self, language: str) -> str:
+        return (language or "").lower()
+
+    def lookup(self, question: str, language: str) -> Optional[Dict]:
+        """Return the stored answer for the most similar past question, if similar enough"""
+        vector = self.vectorizer.vectorize(question)
+        lang = self._language_key(language)
+        with self._lock:
+            index = self._indexes.get(lang)
+            row, similarity = index.search(vector) if index else (-1, 0.0)
+            entry = self._entries[lang][row] if row >= 0 else None
+            if (entry is None or similarity < self.threshold
+                    or entry[1] != numeric_signature(question)
+                    or time.time() - entry[3] > self.ttl):
+                self.misses += 1
+                return None
+            self.hits += 1
+        matched_question, _, answer, _ = entry
+        return {"answer": answer, "similarity": similarity, "matched_question": matched_question}
+
+    def store(self, question: str, language: str, answer: Any) -> None:
+        """Remember an answer for a question"""
+        vector = self.vectorizer.vectorize(question)
+        lang = self._language_key(language)
+        with self._lock:
+            index = self._indexes.get(lang)
+            if index is None:
+                index = VectorIndex(self.vectorizer.dim, capacity=self.max_entries_per_language)
+                self._indexes[lang] = index
+                self._entries[lang] = []
+            row = index.add(vector)
+            entries = self._entries[lang]
+            if row == len(entries):
+                entries.append(None)
+            entries[row] = (question, numeric_signature(question), answer, time.time())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "threshold": self.threshold,
+                "entries": {lang: index.size for lang, index in self._indexes.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
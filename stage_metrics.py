@@ -0,0 +1,122 @@
+# Per-Stage Latency Metrics
+# Prometheus histograms for request stages plus a per-request timing breakdown
+
+import contextvars
+import re
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+DEBUG_TIMINGS_HEADER = "X-Debug-Timings"
+STAGE_TIMINGS_HEADER = "X-Stage-Timings"
+
+# Buckets span sub-millisecond regex passes up to minute-long model calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Stages recorded by the current request (shared with worker threads through copied contexts)
+_request_stages: contextvars.ContextVar = contextvars.ContextVar("request_stages", default=None)
+
+_METRIC_NAME_RE = re.compile(r"[^a-zA-Z0-9_]+")
+
+class StatsCollector:
+    """
+    Exposes existing stats() dictionaries as Prometheus gauges
+
+    Numeric leaves become arogya_<source>_<path>; strings and lists are skipped.
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[], Dict]]):
+        self.sources = sources
+
+    def _flatten(self, prefix: str, value, out: List[Tuple[str, float]]) -> None:
+        if isinstance(value, bool):
+            out.append((prefix, float(value)))
+        elif isinstance(value, (int, float)):
+            out.append((prefix, value))
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                self._flatten(f"{prefix}_{_METRIC_NAME_RE.sub('_', str(key)).strip('_')}", item, out)
+
+    def collect(self):
+        for source, stats in self.sources.items():
+            values: List[Tuple[str, float]] = []
+            try:
+                self._flatten(f"arogya_{source}", stats(), values)
+            except Exception:
+                continue
+            for name, value in values:
+                gauge = GaugeMetricFamily(name.lower(), f"{source} stat")
+                gauge.add_metric([], value)
+                yield gauge
+
+class StageMetrics:
+    """
+    Request and stage latency histograms for a Flask app
+
+    Wrap hot-path work in stage_timer("name"); the time lands in the
+    arogya_stage_duration_seconds histogram under the current endpoint and in
+    the request's breakdown, which clients can ask for with X-Debug-Timings: 1.
+    """
+
+    def __init__(self, registry: Optional[CollectorRegistry] = None, debug_header_enabled: bool = True):
+        self.registry = registry or CollectorRegistry()
+        self.debug_header_enabled = debug_header_enabled
+        self.request_seconds = Histogram(
+            "arogya_request_duration_seconds", "End-to-end request latency",
+            ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.stage_seconds = Histogram(
+            "arogya_stage_duration_seconds", "Latency of individual request stages",
+            ["endpoint", "stage"], buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+
+    def register_stats(self, sources: Dict[str, Callable[[], Dict]]) -> None:
+        self.registry.register(StatsCollector(sources))
+
+    @contextmanager
+    def stage_timer(self, stage: str):
+        """Time a block as one stage of the current request"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        current = _request_stages.get()
+        endpoint = current["endpoint"] if current else "background"
+        self.stage_seconds.labels(endpoint, stage).observe(seconds)
+        if current is not None:
+            current["stages"].append((stage, seconds))
+
+    def init_app(self, app) -> None:
+        from flask import request
+
+        @app.before_request
+        def _start_request_timer():
+            rule = request.url_rule.rule if request.url_rule else "unmatched"
+            _request_stages.set({"endpoint": rule, "start": time.perf_counter(), "stages": []})
+
+        @app.after_request
+        def _record_request(response):
+            current = _request_stages.get()
+            if current is None:
+                return response
+            elapsed = time.perf_counter() - current["start"]
+            self.request_seconds.labels(current["endpoint"], request.method, str(response.status_code)).observe(elapsed)
+            if self.debug_header_enabled and request.headers.get(DEBUG_TIMINGS_HEADER, "").lower() in ("1", "true", "yes"):
+                response.headers[STAGE_TIMINGS_HEADER] = format_stage_timings(current["stages"], elapsed)
+            return response
+
+    def exposition(self) -> Tuple[bytes, str]:
+        return generate_latest(self.registry), CONTENT_TYPE_LATEST
+
+def format_stage_timings(stages: List[Tuple[str, float]], total: float) -> str:
+    """Server-Timing style breakdown: "detect;dur=0.41, agent;dur=812.30, total;dur=815.02" (ms)"""
+    parts = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in stages]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
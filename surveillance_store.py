@@ -0,0 +1,240 @@
+# Disease Surveillance Store
+# Daily case counts per (region, disease, day) in a NumPy array, persisted as a memory-mapped file
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, date, int]
+
+def day_ordinal(value: DateLike) -> int:
+    """YYYY-MM-DD strings, dates and datetimes to a proleptic Gregorian ordinal (ints pass through)"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, date):
+        return value.toordinal()
+    return datetime.strptime(value, "%Y-%m-%d").toordinal()
+
+class SurveillanceStore:
+    """
+    Daily case counts for every region and disease, one int32 cell per day
+
+    Counts live in a (region, disease, day) array with the day axis last, so a
+    rolling window of one series is a contiguous slice and the same window
+    over every series is a single 3-D view. Ingestion only writes cells; new
+    regions, diseases and days grow the array by doubling. With a path the
+    array is a .npy file opened as a memmap and the names and first day sit in
+    a JSON sidecar. Other processes see cell writes at once and reload the
+    sidecar when it changes; one process should do the ingesting.
+    """
+
+    def __init__(self, path: Optional[str] = None, initial_regions: int = 64, initial_diseases: int = 8,
+                 initial_days: int = 64, reload_interval: float = 5.0):
+        self.path = path
+        self.meta_path = f"{path}.json" if path else None
+        self.initial_shape = (initial_regions, initial_diseases, initial_days)
+        self.reload_interval = reload_interval
+        self._lock = threading.RLock()
+        self._counts: Optional[np.ndarray] = None
+        self._regions: Dict[str, int] = {}
+        self._diseases: Dict[str, int] = {}
+        self.region_names: List[str] = []
+        self.disease_names: List[str] = []
+        self.origin: Optional[int] = None
+        self.latest: Optional[int] = None
+        self._meta_mtime = 0.0
+        self._checked_at = 0.0
+        self.ingested = 0
+        self.resizes = 0
+        if path and os.path.exists(path) and os.path.exists(self.meta_path):
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            counts = np.load(self.path, mmap_mode="r+")
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load surveillance store {self.path}: {e}")
+            return
+        self._counts = counts
+        self.region_names = meta["regions"]
+        self.disease_names = meta["diseases"]
+        self._regions = {name.lower(): i for i, name in enumerate(self.region_names)}
+        self._diseases = {name.lower(): i for i, name in enumerate(self.disease_names)}
+        self.origin = meta["origin"]
+        self.latest = meta["latest"]
+        self._meta_mtime = os.path.getmtime(self.meta_path)
+
+    def _maybe_reload(self) -> None:
+        """Pick up regions, diseases and days another process added"""
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.meta_path)
+        except OSError:
+            return
+        if mtime != self._meta_mtime:
+            with self._lock:
+                self._load()
+
+    def _save_meta(self) -> None:
+        meta = {"regions": self.region_names, "diseases": self.disease_names, "origin": self.origin,
+                "latest": self.latest, "shape": list(self._counts.shape)}
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+        self._meta_mtime = os.path.getmtime(self.meta_path)
+
+    def _resize(self, shape: Tuple[int, int, int], origin: int) -> None:
+        """Reallocate with a new shape and first day, copying the existing counts across"""
+        if self.path:
+            tmp_path = f"{self.path}.tmp.npy"
+            counts = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.int32, shape=shape)
+        else:
+            counts = np.zeros(shape, dtype=np.int32)
+        if self._counts is not None:
+            regions, diseases, days = self._counts.shape
+            offset = self.origin - origin
+            counts[:regions, :diseases, offset:offset + days] = self._counts
+        if self.path:
+            counts.flush()
+            del counts
+            os.replace(tmp_path, self.path)
+            counts = np.load(self.path, mmap_mode="r+")
+        self._counts = counts
+        self.origin = origin
+        self.resizes += 1
+
+    def _ensure_capacity(self, first_day: int, last_day: int) -> None:
+        regions, diseases, days = self._counts.shape if self._counts is not None else self.initial_shape
+        if self.origin is None:
+            origin, end = first_day, last_day
+        else:
+            origin, end = min(self.origin, first_day), max(last_day, self.origin + days - 1)
+        needed = (len(self.region_names), len(self.disease_names), end - origin + 1)
+        if self._counts is not None and origin == self.origin and \
+                all(n <= c for n, c in zip(needed, (regions, diseases, days))):
+            return
+        while regions < needed[0]:
+            regions *= 2
+        while diseases < needed[1]:
+            diseases *= 2
+        while days < needed[2]:
+            days *= 2
+        self._resize((regions, diseases, days), origin)
+
+    @staticmethod
+    def _index(names: Dict[str, int], display: List[str], name: str) -> int:
+        key = name.strip().lower()
+        index = names.get(key)
+        if index is None:
+            index = names[key] = len(display)
+            display.append(name.strip())
+        return index
+
+    def ingest(self, records: Iterable[Tuple[str, str, DateLike, int]], accumulate: bool = False) -> int:
+        """
+        Write (region, disease, date, cases) records; returns how many were written
+
+        A record replaces that day's count, or adds to it with accumulate.
+        """
+        with self._lock:
+            # Parse every record before registering any new names so a bad one leaves the store untouched
+            parsed = [(region, disease, day_ordinal(day), int(cases)) for region, disease, day, cases in records]
+            rows = [(self._index(self._regions, self.region_names, region),
+                     self._index(self._diseases, self.disease_names, disease), day, cases)
+                    for region, disease, day, cases in parsed]
+            if not rows:
+                return 0
+            regions, diseases, days, cases = (np.array(column, dtype=np.int64) for column in zip(*rows))
+            self._ensure_capacity(int(days.min()), int(days.max()))
+            offsets = days - self.origin
+            if accumulate:
+                np.add.at(self._counts, (regions, diseases, offsets), cases)
+            else:
+                self._counts[regions, diseases, offsets] = cases
+            self.latest = max(int(days.max()), self.latest or 0)
+            self.ingested += len(rows)
+            if self.path:
+                self._counts.flush()
+                self._save_meta()
+            return len(rows)
+
+    def record(self, region: str, disease: str, day: DateLike, cases: int) -> None:
+        self.ingest([(region, disease, day, cases)])
+
+    def _slice(self, block: np.ndarray, days: int, end: Optional[DateLike]) -> np.ndarray:
+        """The last axis of block over the `days` days ending at end, zero-padded outside the array"""
+        last = day_ordinal(end) if end is not None else self.latest
+        high = last - self.origin + 1
+        low = high - days
+        if 0 <= low and high <= block.shape[-1]:
+            return block[..., low:high]
+        window = np.zeros(block.shape[:-1] + (days,), dtype=block.dtype)
+        src_low, src_high = max(low, 0), min(high, block.shape[-1])
+        if src_low < src_high:
+            window[..., src_low - low:src_high - low] = block[..., src_low:src_high]
+        return window
+
+    def window(self, days: int, end: Optional[DateLike] = None) -> np.ndarray:
+        """
+        (regions, diseases, days) counts for the `days` days ending at end
+
+        end defaults to the latest day ingested. Axes follow region_names and
+        disease_names. The result is a view into the store where possible:
+        read it, do not write to it.
+        """
+        self._maybe_reload()
+        with self._lock:
+            if self._counts is None:
+                return np.zeros((0, 0, days), dtype=np.int32)
+            block = self._counts[:len(self.region_names), :len(self.disease_names)]
+            return self._slice(block, days, end)
+
+    def series(self, region: str, disease: str, days: int, end: Optional[DateLike] = None) -> Optional[np.ndarray]:
+        """Daily counts of one region and disease for the `days` days ending at end; None if unknown"""
+        self._maybe_reload()
+        with self._lock:
+            r = self._regions.get(region.strip().lower())
+            d = self._diseases.get(disease.strip().lower())
+            if r is None or d is None or self._counts is None:
+                return None
+            return self._slice(self._counts[r, d], days, end)
+
+    def region_diseases(self, region: str) -> List[str]:
+        """Diseases with any cases recorded in region"""
+        self._maybe_reload()
+        with self._lock:
+            r = self._regions.get(region.strip().lower())
+            if r is None or self._counts is None:
+                return []
+            present = self._counts[r, :len(self.disease_names)].any(axis=-1)
+            return [self.disease_names[d] for d in np.flatnonzero(present)]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "regions": len(self.region_names),
+                "diseases": len(self.disease_names),
+                "days": (self.latest - self.origin + 1) if self.origin is not None else 0,
+                "bytes": int(self._counts.nbytes) if self._counts is not None else 0,
+                "ingested": self.ingested,
+                "resizes": self.resizes
+            }
+
+surveillance_store = SurveillanceStore(os.getenv("SURVEILLANCE_STORE_PATH", "surveillance_counts.npy") or None)
@@ -0,0 +1,153 @@
+# Text Sanitizer for Model Responses
+# Precompiled markdown stripping, whitespace normalization, mojibake repair and news cleanup
+
+import ast
+import re
+import unicodedata
+from typing import Iterator, List, Optional
+
+# Bold spans, then list markers, then stray markdown characters. Each pattern starts
+# with a literal or character set, so the regex engine scans for it quickly; three such
+# passes measured faster than one combined alternation. None of them crosses a newline.
+_BOLD_RE = re.compile(r"\*\*.*?\*\*")
+_LIST_MARKER_RE = re.compile(r"[*-] ")
+_MARKDOWN_CHARS_RE = re.compile(r"[#*_\[\]()]")
+
+_NEWS_HEADER_RE = re.compile(r"https?://\S+\nSource:.*?\nDate: .*?\n\n", re.DOTALL)
+_BLANK_RUN_RE = re.compile(r"\n{3,}")
+_ESCAPE_RE = re.compile(
+    r"\\(?:(\n)|([\\'\"abfnrtv])|([0-7]{1,3})|x([0-9a-fA-F]{2})|u([0-9a-fA-F]{4})|U([0-9a-fA-F]{8})"
+    r"|N\{([^}\n]*)\}|(.|\Z))",
+    re.DOTALL
+)
+_SIMPLE_ESCAPES = {"\\": "\\", "'": "'", '"': '"', "a": "\a", "b": "\b", "f": "\f",
+                   "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+PARAGRAPH_SEPARATOR = "\n\n"
+
+def strip_markdown(text: str) -> str:
+    return _MARKDOWN_CHARS_RE.sub("", _LIST_MARKER_RE.sub("", _BOLD_RE.sub("", text)))
+
+def sanitize_lines(text: str) -> List[str]:
+    """Non-empty lines of text with markdown removed"""
+    return [line for line in map(str.strip, strip_markdown(text).split("\n")) if line]
+
+def sanitize(text: str) -> str:
+    """Strip markdown and put each remaining line in its own paragraph"""
+    return PARAGRAPH_SEPARATOR.join(sanitize_lines(text))
+
+def repair_mojibake(text: str) -> str:
+    """Undo UTF-8 text that was decoded as latin-1; text that is not mojibake is returned as is"""
+    if text.isascii():
+        return text
+    try:
+        return text.encode("latin1").decode("utf-8")
+    except UnicodeError:
+        return text
+
+def sanitize_model_text(text: str, repair: bool = False) -> str:
+    """sanitize(), optionally repairing mojibake first (summarizer and doctor model output)"""
+    return sanitize(repair_mojibake(text) if repair else text)
+
+class _InvalidEscape(Exception):
+    pass
+
+def _replace_escape(match) -> str:
+    continuation, simple, octal, hex2, hex4, hex8, name, other = match.groups()
+    if continuation is not None:
+        return ""
+    if simple is not None:
+        return _SIMPLE_ESCAPES[simple]
+    if octal is not None:
+        return chr(int(octal, 8))
+    code = hex2 or hex4 or hex8
+    if code is not None:
+        value = int(code, 16)
+        if value > 0x10FFFF:
+            raise _InvalidEscape(code)
+        return chr(value)
+    if name is not None:
+        try:
+            return unicodedata.lookup(name)
+        except KeyError:
+            raise _InvalidEscape(name)
+    if other in ("", "x", "u", "U", "N"):
+        raise _InvalidEscape(other)
+    return "\\" + other
+
+def unescape_literal(text: str) -> Optional[str]:
+    """
+    Interpret Python string escapes the way ast.literal_eval("'''" + text + "'''") does
+
+    Returns None where that would raise (bad escapes, a trailing backslash).
+    """
+    if "'''" in text or "\x00" in text:
+        # Rare; let the parser decide how the quotes split the literal
+        try:
+            return ast.literal_eval(f"'''{text}'''")
+        except Exception:
+            return None
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if "\\" not in text:
+        return text
+    try:
+        return _ESCAPE_RE.sub(_replace_escape, text)
+    except _InvalidEscape:
+        return None
+
+def clean_news_response(raw_response: str) -> str:
+    """Extract and lay out the news digest from the news model's repr-style response"""
+    if "data=" in raw_response:
+        raw_response = raw_response.split("data=")[-1].strip()
+    raw_response = raw_response.strip("()'")
+    unescaped = unescape_literal(raw_response)
+    if unescaped is not None:
+        raw_response = unescaped
+    match = _NEWS_HEADER_RE.search(raw_response)
+    if not match:
+        return raw_response.strip()
+    articles_part = _BLANK_RUN_RE.sub("\n\n", raw_response[:match.end()].strip())
+    summary_part = _BLANK_RUN_RE.sub("\n\n", raw_response[match.end():].strip())
+    return f"{articles_part}\n\n{'-'*100}\n\n{summary_part}"
+
+class StreamingSanitizer:
+    """
+    Incremental sanitize() for text that arrives in chunks
+
+    Every markdown pattern is confined to one line, so complete lines can be
+    cleaned as soon as their newline arrives. Concatenating everything
+    returned by feed() and finish() equals sanitize() of the whole text.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self._emitted = False
+
+    def _emit(self, lines: List[str]) -> str:
+        if not lines:
+            return ""
+        prefix = PARAGRAPH_SEPARATOR if self._emitted else ""
+        self._emitted = True
+        return prefix + PARAGRAPH_SEPARATOR.join(lines)
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; returns the sanitized text of the lines it completed"""
+        self._pending += chunk
+        if "\n" not in chunk:
+            return ""
+        complete, _, self._pending = self._pending.rpartition("\n")
+        return self._emit(sanitize_lines(complete))
+
+    def finish(self) -> str:
+        """Flush the last (unterminated) line"""
+        line, self._pending = strip_markdown(self._pending).strip(), ""
+        return self._emit([line] if line else [])
+
+    def iter_sanitized(self, chunks) -> Iterator[str]:
+        for chunk in chunks:
+            piece = self.feed(chunk)
+            if piece:
+                yield piece
+        tail = self.finish()
+        if tail:
+            yield tail
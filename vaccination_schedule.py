@@ -0,0 +1,275 @@
+# Vaccination Schedule Engine
+# Computes due, overdue and upcoming doses locally from the national immunization table
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from government_health_integration import NATIONAL_IMMUNIZATION_SCHEDULE, health_api
+
+# Slot -> (days after birth the dose is due, days of grace before it counts as overdue)
+SLOT_TIMING = {
+    "birth": (0, 15),
+    "6_weeks": (42, 28),
+    "10_weeks": (70, 28),
+    "14_weeks": (98, 28),
+    "9_months": (274, 91),
+    "16_18_months": (487, 61),
+    "5_6_years": (1826, 365)
+}
+
+SLOT_LABELS = {
+    "birth": "At birth",
+    "6_weeks": "6 weeks",
+    "10_weeks": "10 weeks",
+    "14_weeks": "14 weeks",
+    "9_months": "9 months",
+    "16_18_months": "16-18 months",
+    "5_6_years": "5-6 years",
+    "pregnancy": "Pregnancy"
+}
+
+# TT-1 is due at the first antenatal contact; TT-2 four weeks after TT-1
+TT_INTERVAL_DAYS = 28
+TT_GRACE_DAYS = 28
+
+# Children older than this get age-group recommendations instead of dated doses
+CHILD_SCHEDULE_MAX_DAYS = SLOT_TIMING["5_6_years"][0] + SLOT_TIMING["5_6_years"][1]
+
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y")
+
+# Status codes used by the cohort calculator
+STATUS_UPCOMING = 0
+STATUS_DUE = 1
+STATUS_OVERDUE = 2
+STATUS_GIVEN = 3
+STATUS_NAMES = ("upcoming", "due", "overdue", "given")
+
+def parse_date(value: Union[str, date, None]) -> Optional[date]:
+    """Parse ISO (YYYY-MM-DD) or Co-WIN style (DD-MM-YYYY) dates"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized date: {value}")
+
+def _normalize_given(given_doses: Union[Iterable[str], Dict[str, str], None]) -> Dict[str, Optional[date]]:
+    """Map lower-cased vaccine names to the date they were given (if known)"""
+    if not given_doses:
+        return {}
+    if isinstance(given_doses, dict):
+        return {name.strip().lower(): parse_date(given) for name, given in given_doses.items()}
+    return {name.strip().lower(): None for name in given_doses}
+
+def _dose_status(due: date, due_by: date, given: bool, as_of: date) -> str:
+    if given:
+        return "given"
+    if as_of > due_by:
+        return "overdue"
+    if as_of >= due:
+        return "due"
+    return "upcoming"
+
+class VaccinationScheduleEngine:
+    """
+    Deterministic schedule calculator for the national immunization schedule
+    """
+
+    def __init__(self, schedule: Dict = None):
+        schedule = schedule or NATIONAL_IMMUNIZATION_SCHEDULE
+        self.child_doses = [
+            (vaccine, slot, SLOT_TIMING[slot][0], SLOT_TIMING[slot][1])
+            for slot, vaccines in schedule["infant"].items()
+            for vaccine in vaccines
+        ]
+        self.pregnancy_doses = list(schedule["adult"]["pregnancy"])
+        self.child_vaccines = [vaccine for vaccine, _, _, _ in self.child_doses]
+        self._offsets = np.array([offset for _, _, offset, _ in self.child_doses], dtype=np.int32)
+        self._overdue_after = np.array([offset + grace for _, _, offset, grace in self.child_doses],
+                                       dtype=np.int32)
+
+    def child_schedule(self, date_of_birth: date, given_doses=None,
+                       as_of: Optional[date] = None) -> Dict:
+        """Due dates and status of every childhood dose for one child"""
+        as_of = as_of or date.today()
+        given = _normalize_given(given_doses)
+        doses = []
+        for vaccine, slot, offset, grace in self.child_doses:
+            due = date_of_birth + timedelta(days=offset)
+            due_by = due + timedelta(days=grace)
+            doses.append({
+                "vaccine": vaccine,
+                "slot": slot,
+                "due_date": due.isoformat(),
+                "due_by": due_by.isoformat(),
+                "status": _dose_status(due, due_by, vaccine.lower() in given, as_of)
+            })
+        return self._summarize(doses, {"date_of_birth": date_of_birth.isoformat()}, as_of)
+
+    def pregnancy_schedule(self, pregnancy_start: Optional[date] = None, given_doses=None,
+                           as_of: Optional[date] = None) -> Dict:
+        """TT doses for a pregnant woman registered on pregnancy_start (default: today)"""
+        as_of = as_of or date.today()
+        given = _normalize_given(given_doses)
+        previous = pregnancy_start or as_of
+        doses = []
+        for index, vaccine in enumerate(self.pregnancy_doses):
+            due = previous if index == 0 else previous + timedelta(days=TT_INTERVAL_DAYS)
+            due_by = due + timedelta(days=TT_GRACE_DAYS)
+            is_given = vaccine.lower() in given
+            doses.append({
+                "vaccine": vaccine,
+                "slot": "pregnancy",
+                "due_date": due.isoformat(),
+                "due_by": due_by.isoformat(),
+                "status": _dose_status(due, due_by, is_given, as_of)
+            })
+            # The next TT dose counts from when this one was actually given
+            previous = given.get(vaccine.lower()) or due
+        return self._summarize(doses, {"pregnancy_start": (pregnancy_start or as_of).isoformat()}, as_of)
+
+    def _summarize(self, doses: List[Dict], extra: Dict, as_of: date) -> Dict:
+        pending = [d for d in doses if d["status"] in ("due", "upcoming")]
+        next_date = min((d["due_date"] for d in pending), default=None)
+        return {
+            **extra,
+            "as_of": as_of.isoformat(),
+            "doses": doses,
+            "overdue": [d["vaccine"] for d in doses if d["status"] == "overdue"],
+            "due_now": [d["vaccine"] for d in doses if d["status"] == "due"],
+            "next_due": {
+                "date": next_date,
+                "vaccines": [d["vaccine"] for d in pending if d["due_date"] == next_date]
+            } if next_date else None
+        }
+
+    def given_matrix(self, given_lists: Sequence[Iterable[str]]) -> np.ndarray:
+        """Convert per-child lists of given vaccine names to the (children, doses) mask"""
+        columns = {vaccine.lower(): i for i, vaccine in enumerate(self.child_vaccines)}
+        given = np.zeros((len(given_lists), len(columns)), dtype=bool)
+        for row, names in enumerate(given_lists):
+            for name in names:
+                column = columns.get(name.strip().lower())
+                if column is not None:
+                    given[row, column] = True
+        return given
+
+    def cohort_due_dates(self, birth_dates, given: Optional[np.ndarray] = None, as_of=None,
+                         reminder_window_days: int = 7, include_due_dates: bool = True) -> Dict:
+        """
+        Vectorized due-date calculation for many children at once
+
+        birth_dates is an array of datetime64[D] (or ISO strings); given is an
+        optional boolean mask of shape (children, doses) in child_vaccines order.
+        Returns due dates and status codes per dose plus per-child summaries.
+        """
+        births = np.asarray(birth_dates, dtype="datetime64[D]")
+        as_of = np.datetime64(parse_date(as_of) or date.today(), "D")
+        age_days = (as_of - births).astype(np.int32)[:, None]
+
+        # Overdue implies due, so the two comparisons add up to the status code
+        status = (age_days >= self._offsets).view(np.int8) + (age_days > self._overdue_after).view(np.int8)
+        if given is not None:
+            given = np.asarray(given, dtype=bool)
+            if given.shape != status.shape:
+                raise ValueError(f"given must have shape {status.shape}, got {given.shape}")
+            np.putmask(status, given, STATUS_GIVEN)
+
+        # Days from today until each pending dose; a large sentinel for the rest
+        days_until = self._offsets - age_days
+        no_dose = np.iinfo(np.int32).max
+        days_until[status >= STATUS_OVERDUE] = no_dose
+        next_in = days_until.min(axis=1)
+        has_next = next_in != no_dose
+        next_due = np.full(births.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        next_due[has_next] = as_of + next_in[has_next].astype("timedelta64[D]")
+
+        overdue_count = (status == STATUS_OVERDUE).sum(axis=1, dtype=np.int32)
+        result = {
+            "vaccines": self.child_vaccines,
+            "as_of": as_of,
+            "status": status,
+            "overdue_count": overdue_count,
+            "next_due_date": next_due,
+            "needs_reminder": (overdue_count > 0) | (has_next & (next_in <= reminder_window_days))
+        }
+        if include_due_dates:
+            result["due_dates"] = births[:, None] + self._offsets.astype("timedelta64[D]")
+        return result
+
+    def build_schedule(self, age: Union[str, float, None] = None, date_of_birth=None,
+                       given_doses=None, pregnant: bool = False, pregnancy_start=None,
+                       as_of=None, region: str = "india") -> Dict:
+        """Schedule for a request: dated child doses, pregnancy TT doses or age-group advice"""
+        as_of = parse_date(as_of) or date.today()
+        dob = parse_date(date_of_birth)
+        approximate = False
+        if dob is None and age not in (None, ""):
+            age_years = float(age)
+            if age_years < 0:
+                raise ValueError("Age cannot be negative")
+            dob = as_of - timedelta(days=round(age_years * 365.25))
+            approximate = True
+
+        result = {"region": region, "as_of": as_of.isoformat()}
+        if pregnant or pregnancy_start:
+            result["pregnancy"] = self.pregnancy_schedule(parse_date(pregnancy_start), given_doses, as_of)
+        if dob is not None:
+            age_days = (as_of - dob).days
+            if age_days < 0:
+                raise ValueError("Date of birth is in the future")
+            if age_days <= CHILD_SCHEDULE_MAX_DAYS:
+                result["age_group"] = "infant"
+                result["child"] = self.child_schedule(dob, given_doses, as_of)
+                result["child"]["date_of_birth_approximate"] = approximate
+            else:
+                group = health_api.get_vaccination_schedule(int(age_days // 365.25), region)
+                result["age_group"] = group["age_group"]
+                result["recommended"] = group["data"]
+        elif "pregnancy" in result:
+            result["age_group"] = "adult"
+        else:
+            raise ValueError("Age, date of birth or pregnancy details are required")
+        return result
+
+def _format_doses(schedule: Dict) -> List[str]:
+    lines = []
+    slots: Dict[str, List[Dict]] = {}
+    for dose in schedule["doses"]:
+        slots.setdefault(dose["slot"], []).append(dose)
+    for slot, doses in slots.items():
+        vaccines = ", ".join(f"{d['vaccine']} ({d['status']})" for d in doses)
+        due_dates = sorted({d["due_date"] for d in doses})
+        lines.append(f"{SLOT_LABELS.get(slot, slot)} - due {' / '.join(due_dates)}: {vaccines}")
+    if schedule["overdue"]:
+        lines.append(f"Overdue now: {', '.join(schedule['overdue'])}. Please visit the nearest health centre.")
+    if schedule["next_due"]:
+        lines.append(f"Next due on {schedule['next_due']['date']}: {', '.join(schedule['next_due']['vaccines'])}")
+    return lines
+
+def format_schedule_text(result: Dict) -> str:
+    """Plain-text rendering of build_schedule output"""
+    sections = []
+    if "child" in result:
+        child = result["child"]
+        born = "about " + child["date_of_birth"] if child["date_of_birth_approximate"] else child["date_of_birth"]
+        sections.append(f"Child immunization schedule (born {born}, as of {result['as_of']})")
+        sections.extend(_format_doses(child))
+    if "recommended" in result:
+        sections.append(f"Recommended vaccines for age group '{result['age_group']}':")
+        for group, vaccines in result["recommended"].items():
+            sections.append(f"{group.replace('_', ' ').title()}: {', '.join(vaccines)}")
+    if "pregnancy" in result:
+        sections.append("Pregnancy (TT) schedule")
+        sections.extend(_format_doses(result["pregnancy"]))
+    return "\n\n".join(sections)
+
+vaccination_engine = VaccinationScheduleEngine()